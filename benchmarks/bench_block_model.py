@@ -0,0 +1,76 @@
+"""Compare allocations and throughput of Block (pydantic) and BlockHeader.
+
+Usage: python -m benchmarks.bench_block_model [--blocks N]
+Prints one JSON object per model.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from web3.datastructures import AttributeDict
+
+from models.block import Block, BlockHeader
+
+
+def make_raw_block(number: int) -> AttributeDict:
+    """A mainnet-shaped header with 150 transaction hashes."""
+    return AttributeDict(
+        {
+            "number": number,
+            "timestamp": 1_700_000_000 + number * 12,
+            "hash": bytes(32),
+            "parentHash": bytes(32),
+            "miner": "0x" + "00" * 20,
+            "gasLimit": 30_000_000,
+            "gasUsed": 15_000_000,
+            "baseFeePerGas": 20_000_000_000,
+            "logsBloom": bytes(256),
+            "extraData": bytes(32),
+            "transactions": [bytes(32) for _ in range(150)],
+        }
+    )
+
+
+def bench(name, build, count):
+    raw_blocks = [make_raw_block(n) for n in range(count)]
+    start = time.perf_counter()
+    for raw_block in raw_blocks:
+        build(raw_block)
+    elapsed = time.perf_counter() - start
+    del raw_blocks
+
+    # Retained memory: keep every object alive, as a downstream buffer would.
+    # Each payload is built inside the traced region and dropped unless the
+    # model keeps a reference to it, so retaining `raw` shows up here
+    tracemalloc.start()
+    kept = [build(make_raw_block(n)) for n in range(count)]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return {
+        "model": name,
+        "blocks": count,
+        "blocks_per_sec": round(count / elapsed),
+        "retained_bytes_per_block": retained // count,
+        "peak_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for name, build in (
+        ("Block", Block.from_raw),
+        ("BlockHeader", BlockHeader.from_raw),
+        ("BlockHeader(keep_raw)", lambda r: BlockHeader.from_raw(r, keep_raw=True)),
+    ):
+        print(json.dumps(bench(name, build, args.blocks)))
+
+
+if __name__ == "__main__":
+    main()
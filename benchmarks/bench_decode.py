@@ -0,0 +1,80 @@
+"""Compare inline, thread-pool and process-pool decoding of heavy batches.
+
+Usage: python -m benchmarks.bench_decode [--batches N] [--txs N] [--workers N]
+Prints one JSON object per mode. Each batch is 50 full-transaction blocks.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from core.decode import DecodePool, decode_batch
+
+
+def make_payload(first: int, txs: int) -> bytes:
+    transaction = {
+        "hash": "0x" + "ab" * 32,
+        "from": "0x" + "11" * 20,
+        "to": "0x" + "22" * 20,
+        "input": "0x" + "00" * 132,
+        "value": "0x0",
+        "gas": "0x5208",
+    }
+    return json.dumps(
+        [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "result": {
+                    "number": hex(first + i),
+                    "timestamp": hex(1_700_000_000 + i),
+                    "hash": f"0x{first + i:064x}",
+                    "parentHash": f"0x{first + i - 1:064x}",
+                    "transactions": [transaction] * txs,
+                },
+            }
+            for i in range(50)
+        ]
+    ).encode()
+
+
+def run(mode: str, payloads, workers: int) -> float:
+    start = time.perf_counter()
+    if mode == "inline":
+        for payload in payloads:
+            decode_batch(payload)
+    else:
+        pool = DecodePool(mode, workers)
+        try:
+            for future in [pool.submit(payload) for payload in payloads]:
+                future.result()
+        finally:
+            pool.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--txs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    payloads = [make_payload(1 + n * 50, args.txs) for n in range(args.batches)]
+    for mode in ("inline", "thread", "process"):
+        elapsed = run(mode, payloads, args.workers)
+        print(
+            json.dumps(
+                {
+                    "mode": mode,
+                    "workers": 1 if mode == "inline" else args.workers,
+                    "blocks": args.batches * 50,
+                    "blocks_per_sec": round(args.batches * 50 / elapsed),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure cold-start cost: module imports and provider initialization.
+
+Usage: python -m benchmarks.bench_startup [--dead-timeout S]
+Prints one JSON object per measurement:
+
+- imports: seconds to import main (web3 deferred) and web3 itself, each
+  in a fresh interpreter
+- init:    seconds until HotswapManager is ready to stream and until every
+  provider has settled, with an unresponsive endpoint listed first
+"""
+
+import argparse
+import json
+import logging
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.simchain import ChainServer, SimulatedChain
+from core.hotswap import HotswapManager
+from models.provider import PoolConfig, Provider
+
+
+def import_seconds(module: str) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def bench_imports() -> dict:
+    return {
+        "measurement": "imports",
+        "main_s": round(import_seconds("main"), 3),
+        "web3_s": round(import_seconds("web3"), 3),
+    }
+
+
+def bench_init(dead_timeout: float) -> dict:
+    # Accepts connections but never answers, like a hung endpoint
+    dead = socket.socket()
+    dead.bind(("127.0.0.1", 0))
+    dead.listen(16)
+
+    chain = SimulatedChain()
+    servers = [ChainServer(chain).start() for _ in range(2)]
+    pool = PoolConfig(connect_timeout=dead_timeout, read_timeout=dead_timeout)
+    providers = [
+        Provider(
+            name="DEAD", url=f"http://127.0.0.1:{dead.getsockname()[1]}", pool=pool
+        )
+    ] + [Provider(name=f"SIM{i}", url=s.url, pool=pool) for i, s in enumerate(servers)]
+
+    try:
+        start = time.monotonic()
+        manager = HotswapManager(providers)
+        ready = time.monotonic() - start
+        manager.wait_for_providers()
+        settled = time.monotonic() - start
+    finally:
+        for server in servers:
+            server.stop()
+        dead.close()
+
+    return {
+        "measurement": "init",
+        "providers": len(providers),
+        "dead_timeout_s": dead_timeout,
+        "ready_s": round(ready, 3),
+        "all_settled_s": round(settled, 3),
+        "primary": manager.current_provider,
+        "connected": list(manager.clients),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--dead-timeout", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(json.dumps(bench_imports()), flush=True)
+    print(json.dumps(bench_init(args.dead_timeout)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Run the real BlockStreamer and HotswapManager against a simulated chain.
+
+Usage: python -m benchmarks.bench_streamer [--scenario NAME ...] [--verbose]
+Prints one JSON object per scenario:
+
+- catchup:  blocks/sec ingesting a prefilled backlog (parallel backfill)
+- live:     p50/p99 delay from block production to delivery, with faults
+- failover: seconds from a primary outage to the swap and the next block,
+            and from its return until its breaker closes again
+- reorg:    delivery delay and reorgs handled on a chain that keeps forking
+- bulk:     blocks/sec of a --from bulk backfill over the catchup backlog
+            while the chain keeps producing, then whether live streaming
+            continued from it without a gap or duplicate
+- leased:   blocks/sec ingesting the catchup backlog with --workers streamers
+            coordinating through a shared lease store, one of them leading
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.simchain import ChainServer, Faults, SimulatedChain
+from core.coordination import Coordinator, SqliteLeaseStore
+from core.hotswap import HotswapManager
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+from models.provider import PoolConfig, Provider
+
+
+class RecordingStreamer(BlockStreamer):
+    """BlockStreamer that records when each block is delivered."""
+
+    def __init__(
+        self, manager: HotswapManager, coordinator: Optional[Coordinator] = None
+    ):
+        super().__init__(manager, coordinator=coordinator)
+        self.delivered: Dict[int, float] = {}
+        self.reverted = 0
+
+    def _process(self, client, block: BlockHeader):
+        self.delivered.setdefault(block.number, time.monotonic())
+
+    def _revert(self, client, number: int, block_hash: Optional[str]):
+        self.reverted += 1
+        self.delivered.pop(number, None)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def provider(server: ChainServer, name: str) -> Provider:
+    # Short read timeout so injected timeouts surface as errors
+    return Provider(
+        name=name, url=server.url, pool=PoolConfig(connect_timeout=1, read_timeout=2)
+    )
+
+
+class Harness:
+    """A chain, its simulated providers and a streamer running on a thread."""
+
+    def __init__(self, chain: SimulatedChain, faults: List[Faults]):
+        self.chain = chain
+        self.servers = [ChainServer(chain, f).start() for f in faults]
+        self.manager = HotswapManager(
+            [provider(s, f"SIM{i}") for i, s in enumerate(self.servers)]
+        )
+        self.streamer = RecordingStreamer(self.manager)
+        self._thread = threading.Thread(target=self.streamer.stream, daemon=True)
+
+    def __enter__(self) -> "Harness":
+        self.chain.start()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.streamer.stop()
+        self.chain.stop()
+        self._thread.join(timeout=10)
+        for client in self.manager.clients.values():
+            client.close()
+        for server in self.servers:
+            server.stop()
+
+    def wait_for(self, condition, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def delays(self, since: float) -> List[float]:
+        """Production-to-delivery delay of blocks produced after `since`."""
+        produced = self.chain.produced_at
+        return [
+            delivered - produced[number]
+            for number, delivered in list(self.streamer.delivered.items())
+            if produced.get(number, 0) >= since
+        ]
+
+    def latency_report(self, since: float) -> dict:
+        delays = self.delays(since)
+        return {
+            "blocks": len(delays),
+            "p50_ms": round(percentile(delays, 50) * 1000, 1) if delays else None,
+            "p99_ms": round(percentile(delays, 99) * 1000, 1) if delays else None,
+        }
+
+
+def bench_catchup(args) -> dict:
+    chain = SimulatedChain(block_time=3600, prefill=args.blocks)
+    harness = Harness(chain, [Faults(), Faults()])
+    target = chain.head
+    # Start from the bottom of the backlog instead of just below the head
+    harness.streamer.last_block = target - args.blocks
+    with harness:
+        start = time.monotonic()
+        finished = harness.wait_for(
+            lambda: harness.streamer.last_block == target, args.timeout
+        )
+        elapsed = time.monotonic() - start
+
+    return {
+        "scenario": "catchup",
+        "blocks": args.blocks,
+        "completed": finished,
+        "seconds": round(elapsed, 3),
+        "blocks_per_sec": round(args.blocks / elapsed, 1),
+    }
+
+
+def bench_live(args) -> dict:
+    chain = SimulatedChain(block_time=args.block_time)
+    faults = Faults(latency_ms=20, error_rate=0.01, timeout_rate=0.005)
+    with Harness(chain, [faults, Faults(latency_ms=40)]) as harness:
+        start = time.monotonic()
+        time.sleep(args.duration)
+        report = harness.latency_report(start)
+
+    return {"scenario": "live", "block_time": args.block_time, **report}
+
+
+def bench_failover(args) -> dict:
+    chain = SimulatedChain(block_time=args.block_time)
+    with Harness(chain, [Faults(), Faults()]) as harness:
+        primary = harness.manager.current_provider
+        harness.wait_for(lambda: len(harness.streamer.delivered) >= 3, args.timeout)
+
+        head = chain.head
+        killed = time.monotonic()
+        # Providers connect concurrently, so either server may be the primary
+        server = harness.servers[int(primary.removeprefix("SIM"))]
+        server.faults.down = True
+
+        swapped = harness.wait_for(
+            lambda: harness.manager.current_provider != primary, args.timeout
+        )
+        swap_seconds = time.monotonic() - killed
+        resumed = harness.wait_for(
+            lambda: any(n > head for n in list(harness.streamer.delivered)),
+            args.timeout,
+        )
+        resume_seconds = time.monotonic() - killed
+
+        # Bring the old primary back; its breaker closes on the next probe
+        restored = time.monotonic()
+        server.faults.down = False
+        health = harness.manager.clients[primary].health
+        recovered = harness.wait_for(lambda: health.is_healthy, args.timeout)
+        recover_seconds = time.monotonic() - restored
+
+    return {
+        "scenario": "failover",
+        "block_time": args.block_time,
+        "swapped": swapped,
+        "time_to_failover_s": round(swap_seconds, 3),
+        "time_to_next_block_s": round(resume_seconds, 3) if resumed else None,
+        "time_to_recover_s": round(recover_seconds, 3) if recovered else None,
+    }
+
+
+def bench_reorg(args) -> dict:
+    chain = SimulatedChain(block_time=args.block_time, reorg_every=5, reorg_depth=2)
+    with Harness(chain, [Faults(), Faults()]) as harness:
+        start = time.monotonic()
+        time.sleep(args.duration)
+        report = harness.latency_report(start)
+        reverted = harness.streamer.reverted
+
+    return {
+        "scenario": "reorg",
+        "block_time": args.block_time,
+        "chain_reorgs": chain.reorgs,
+        "blocks_reverted": reverted,
+        **report,
+    }
+
+
+def bench_bulk(args) -> dict:
+    chain = SimulatedChain(block_time=args.block_time, prefill=args.blocks)
+    harness = Harness(chain, [Faults(), Faults()])
+    first = chain.head - args.blocks
+    delivered: List[int] = []
+    process = harness.streamer._process
+
+    def record(client, block):
+        delivered.append(block.number)
+        process(client, block)
+
+    harness.streamer._process = record
+    handed_over: List[float] = []
+
+    def backfill_then_stream():
+        harness.streamer.bulk_backfill(first)
+        handed_over.append(time.monotonic())
+        harness.streamer.stream()
+
+    harness._thread = threading.Thread(target=backfill_then_stream, daemon=True)
+    with harness:
+        start = time.monotonic()
+        harness.wait_for(lambda: handed_over, args.timeout)
+        bulk_seconds = time.monotonic() - start
+        backfilled = len(delivered)
+        # Let a few blocks arrive through the live path
+        handoff = harness.streamer.last_block
+        harness.wait_for(
+            lambda: harness.streamer.last_block > handoff + 2, args.timeout
+        )
+
+    return {
+        "scenario": "bulk",
+        "blocks": backfilled,
+        "seconds": round(bulk_seconds, 3),
+        "blocks_per_sec": round(backfilled / bulk_seconds, 1),
+        "live_blocks": len(delivered) - backfilled,
+        "contiguous": delivered == list(range(first, first + len(delivered))),
+    }
+
+
+def bench_leased(args) -> dict:
+    chain = SimulatedChain(block_time=3600, prefill=args.blocks)
+    servers = [ChainServer(chain).start() for _ in range(2)]
+    target = chain.head
+    path = os.path.join(tempfile.mkdtemp(), "leases.db")
+    range_size = max(1, args.blocks // (args.workers * 4))
+
+    workers = []
+    for i in range(args.workers):
+        manager = HotswapManager(
+            [provider(s, f"SIM{j}") for j, s in enumerate(servers)]
+        )
+        coordinator = Coordinator(SqliteLeaseStore(path, range_size), f"worker{i}")
+        workers.append(RecordingStreamer(manager, coordinator.start()))
+    leader = workers[0]
+    leader.last_block = target - args.blocks
+    store = leader.coordinator.store
+
+    threads = [threading.Thread(target=w.stream, daemon=True) for w in workers]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    deadline = start + args.timeout
+    finished = False
+    while not finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+        finished = leader.last_block == target and store.remaining() == 0
+    elapsed = time.monotonic() - start
+
+    delivered = set()
+    for worker in workers:
+        worker.stop()
+    for worker, thread in zip(workers, threads, strict=True):
+        thread.join(timeout=10)
+        worker.coordinator.close()
+        delivered.update(worker.delivered)
+        for client in worker.manager.clients.values():
+            client.close()
+    for server in servers:
+        server.stop()
+
+    return {
+        "scenario": "leased",
+        "blocks": args.blocks,
+        "workers": args.workers,
+        "range_size": range_size,
+        "completed": finished,
+        "delivered": len(delivered),
+        "seconds": round(elapsed, 3),
+        "blocks_per_sec": round(args.blocks / elapsed, 1),
+    }
+
+
+SCENARIOS = {
+    "catchup": bench_catchup,
+    "live": bench_live,
+    "failover": bench_failover,
+    "reorg": bench_reorg,
+    "bulk": bench_bulk,
+    "leased": bench_leased,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenario", choices=SCENARIOS, action="append", help="Default: all"
+    )
+    parser.add_argument("--blocks", type=int, default=2000, help="catchup backlog")
+    parser.add_argument("--workers", type=int, default=2, help="leased workers")
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    for name in args.scenario or SCENARIOS:
+        print(json.dumps(SCENARIOS[name](args)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
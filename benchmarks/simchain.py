@@ -0,0 +1,232 @@
+"""A local JSON-RPC server simulating a growing chain, for benchmarks.
+
+SimulatedChain mines a block every `block_time` seconds and can replace its
+tip every `reorg_every` blocks. ChainServer serves it over HTTP the way a
+provider would (eth_blockNumber, eth_getBlockByNumber, batches) and injects
+faults per request: latency, errors, timeouts, rate limits and outages.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+def _block_hash(number: int, fork: int) -> str:
+    return "0x" + hashlib.sha256(f"{number}:{fork}".encode()).hexdigest()
+
+
+class SimulatedChain:
+    """A chain whose head advances in real time on a background thread."""
+
+    def __init__(
+        self,
+        block_time: float = 1.0,
+        start_block: int = 1_000_000,
+        prefill: int = 0,
+        reorg_every: int = 0,
+        reorg_depth: int = 2,
+    ):
+        self.block_time = block_time
+        self.reorg_every = reorg_every
+        self.reorg_depth = reorg_depth
+        self.reorgs = 0
+
+        # First production time of each block number, for delivery latency
+        self.produced_at: Dict[int, float] = {}
+
+        self._blocks: List[dict] = []
+        self._start = start_block
+        self._fork = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        timestamp = int(time.time()) - prefill
+        for _ in range(prefill + 1):
+            self._append(timestamp)
+            timestamp += 1
+
+        self._thread = threading.Thread(target=self._run, name="chain", daemon=True)
+
+    @property
+    def head(self) -> int:
+        with self._lock:
+            return self._start + len(self._blocks) - 1
+
+    def block(self, number: int) -> Optional[dict]:
+        with self._lock:
+            index = number - self._start
+            if 0 <= index < len(self._blocks):
+                return self._blocks[index]
+            return None
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.block_time):
+            with self._lock:
+                number = self._start + len(self._blocks)
+                if self.reorg_every and number % self.reorg_every == 0:
+                    self._reorg()
+                self._append(max(int(time.time()), self._blocks[-1]["timestamp"] + 1))
+
+    def _reorg(self):
+        """Replace the last reorg_depth blocks with a competing branch."""
+        self._fork += 1
+        self.reorgs += 1
+        replaced = self._blocks[-self.reorg_depth :]
+        del self._blocks[-self.reorg_depth :]
+        for block in replaced:
+            self._append(block["timestamp"])
+
+    def _append(self, timestamp: int):
+        number = self._start + len(self._blocks)
+        parent = self._blocks[-1]["hash"] if self._blocks else "0x" + "00" * 32
+        self._blocks.append(
+            {
+                "number": number,
+                "hash": _block_hash(number, self._fork),
+                "parentHash": parent,
+                "timestamp": timestamp,
+                "gasUsed": 15_000_000,
+                "gasLimit": 30_000_000,
+                "baseFeePerGas": 20_000_000_000,
+                "transactions": [],
+            }
+        )
+        self.produced_at.setdefault(number, time.monotonic())
+
+
+def _encode_block(block: dict) -> dict:
+    return {
+        key: hex(value) if isinstance(value, int) else value
+        for key, value in block.items()
+    }
+
+
+@dataclass
+class Faults:
+    """Per-request fault injection for one simulated provider."""
+
+    latency_ms: float = 5.0  # median of a log-normal latency
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0  # JSON-RPC error responses
+    timeout_rate: float = 0.0  # requests held for timeout_seconds
+    timeout_seconds: float = 5.0
+    rate_limit: float = 0.0  # requests per second, 0 for unlimited
+    down: bool = False  # answer every request with HTTP 503
+
+
+class _RateLimiter:
+    def __init__(self):
+        self._window = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def allow(self, limit: float) -> bool:
+        if not limit:
+            return True
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._count = window, 0
+            self._count += 1
+            return self._count <= limit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ChainServer"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        faults = self.server.faults
+        self.server.requests += 1
+
+        if faults.down:
+            self._send(503, {"error": "unavailable"})
+            return
+        if not self.server.limiter.allow(faults.rate_limit):
+            self._send(429, {"error": "rate limited"})
+            return
+
+        if random.random() < faults.timeout_rate:
+            time.sleep(faults.timeout_seconds)
+        elif faults.latency_ms:
+            time.sleep(
+                random.lognormvariate(0, faults.latency_sigma)
+                * faults.latency_ms
+                / 1000
+            )
+
+        request = json.loads(body)
+        if isinstance(request, list):
+            self._send(200, [self.server.dispatch(item) for item in request])
+        else:
+            self._send(200, self.server.dispatch(request))
+
+    def _send(self, status: int, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ChainServer(ThreadingHTTPServer):
+    """JSON-RPC endpoint for a SimulatedChain on 127.0.0.1."""
+
+    daemon_threads = True
+
+    def __init__(self, chain: SimulatedChain, faults: Optional[Faults] = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.chain = chain
+        self.faults = faults or Faults()
+        self.limiter = _RateLimiter()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "ChainServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def dispatch(self, request: dict) -> dict:
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if random.random() < self.faults.error_rate:
+            response["error"] = {"code": -32000, "message": "injected error"}
+            return response
+
+        method, params = request.get("method"), request.get("params") or []
+        if method == "web3_clientVersion":
+            response["result"] = "simchain/1.0"
+        elif method in ("eth_chainId", "net_version"):
+            response["result"] = "0x1" if method == "eth_chainId" else "1"
+        elif method == "eth_blockNumber":
+            response["result"] = hex(self.chain.head)
+        elif method == "eth_getBlockByNumber":
+            tag = params[0]
+            number = self.chain.head if tag == "latest" else int(tag, 16)
+            block = self.chain.block(number)
+            response["result"] = _encode_block(block) if block else None
+        else:
+            response["error"] = {"code": -32601, "message": f"{method} not found"}
+        return response
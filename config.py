@@ -1,13 +1,14 @@
 import logging
+import os
 
 # Time in seconds before an unhealthy provider becomes eligible for recovery
 PROVIDER_TIMEOUT = 30
 
-# Minimum seconds between health checks for a single provider
-HEALTH_CHECK_MIN_INTERVAL = 5
+# Number of recent response times kept for percentile estimates
+RESPONSE_TIME_WINDOW = 128
 
-# Number of response times to keep for average calculation
-RESPONSE_TIME_WINDOW = 5
+# Smoothing factor for the response-time and error-rate EWMAs
+EWMA_ALPHA = 0.2
 
 # Number of network failures before marked unhealthy
 NETWORK_FAILURE_THRESHOLD = 2
@@ -18,13 +19,182 @@ CONNECTION_FAILURE_THRESHOLD = 2
 # Number of block failures before marked unhealthy
 BLOCK_FAILURE_THRESHOLD = 2
 
-# Time in seconds before an unhealthy provider becomes eligible for recovery
+# Seconds before a chain whose providers all failed to connect is retried
 PROVIDER_RECOVERY_TIME = 30
 
+# Circuit breaker: seconds an open provider waits before a probe, doubled
+# after every failed probe up to the maximum
+BREAKER_OPEN_MIN = 2
+BREAKER_OPEN_MAX = 120
+
+
+# Seconds between re-evaluations of the best provider to route to
+ROUTING_INTERVAL = 10
+
+# A provider must score this fraction better than the current one to take over
+ROUTING_HYSTERESIS = 0.2
+
 
 # Streamer settings
 POLL_INTERVAL = 2
 
+# Poll interval bounds once the block cadence has been learned
+POLL_MIN_INTERVAL = 0.25
+POLL_MAX_INTERVAL = 6
+
+# Exponential backoff after a failed streaming iteration
+ERROR_BACKOFF_BASE = 0.5
+ERROR_BACKOFF_MAX = 30
+
+# Seconds to wait before reopening a dropped newHeads subscription
+WS_RECONNECT_INTERVAL = 5
+
+# Number of recent blocks kept in the in-process block cache
+BLOCK_CACHE_SIZE = 256
+
+# Number of recent (number, hash, parentHash) entries kept for reorg detection
+REORG_HISTORY_SIZE = 128
+
+# Maximum number of blocks requested in a single JSON-RPC batch
+BATCH_SIZE = 50
+
+# Seconds of single calls after a batch fails for a reason other than the
+# provider rejecting batches outright (which disables them for good)
+BATCH_RETRY_COOLDOWN = 60
+
+# Fetch full transaction bodies, decoding each block response incrementally
+FULL_TRANSACTIONS = False
+
+# Bytes read per chunk when decoding a full block response
+FULL_BLOCK_CHUNK_SIZE = 64 * 1024
+
+# Decode and validate block batches in a "process" or "thread" worker pool
+# instead of on the fetch thread (None)
+DECODE_POOL = None
+DECODE_WORKERS = os.cpu_count() or 1
+
+# Event logs streamed alongside blocks; disabled while both are empty
+LOG_ADDRESSES = []
+LOG_TOPICS = []
+
+# eth_getLogs block ranges: halved when a provider rejects them as too
+# large, doubled while a call returns fewer than half of LOG_RANGE_TARGET logs
+LOG_RANGE_INITIAL = 100
+LOG_RANGE_MIN = 1
+LOG_RANGE_MAX = 5000
+LOG_RANGE_TARGET = 1000
+
+# Successful range calls after a rejection before the range may grow past
+# the rejected size again (doubling the ceiling, up to LOG_RANGE_MAX)
+LOG_RANGE_REGROW = 50
+
+# Blocks this close to the head get their logs by block hash: a range call
+# may have answered from a branch that has since been replaced
+LOG_CONFIRMATIONS = 12
+
+# Blocks per backfill chunk for the fastest provider (slower ones get less)
+BACKFILL_CHUNK_SIZE = 100
+
+# Attempts per backfill chunk before the backfill gives up
+BACKFILL_MAX_ATTEMPTS = 3
+
+# Maximum blocks fetched ahead of the next block to be emitted in order
+BACKFILL_WINDOW = 2000
+
+# Gap (in blocks) above which the streamer switches to parallel backfill
+BACKFILL_THRESHOLD = 200
+
+# Bulk backfill (--from/--to): blocks per chunk for the fastest provider and
+# blocks fetched ahead of the emit cursor
+BULK_CHUNK_SIZE = 500
+BULK_WINDOW = 10_000
+
+# Distance from the head at which an open-ended bulk backfill hands over to
+# live streaming
+BULK_HANDOFF_DISTANCE = 5
+
+# Seconds between bulk backfill progress log lines
+BULK_PROGRESS_INTERVAL = 10
+
+# Checkpoint backend ("sqlite", "file" or None to disable) and its location
+CHECKPOINT_BACKEND = "sqlite"
+CHECKPOINT_PATH = "checkpoint.db"
+
+# Group commit: flush the checkpoint every N blocks or T milliseconds
+CHECKPOINT_COMMIT_BLOCKS = 100
+CHECKPOINT_COMMIT_INTERVAL_MS = 1000
+
+# Shared lease store coordinating several streamer workers (None runs alone)
+COORDINATION_PATH = None
+
+# Worker identity in the lease store; None uses hostname-pid
+WORKER_ID = None
+
+# Seconds a range lease or the leadership survives without a heartbeat
+LEASE_TTL = 30
+
+# Blocks per backfill range handed out as one lease
+LEASE_RANGE_SIZE = 1000
+
+# Request hedging: re-issue a slow read to the next healthy provider
+HEDGING_ENABLED = False
+
+# Primary response-time percentile after which a hedge is sent
+HEDGE_PERCENTILE = 95
+
+# Hedge delay bounds (seconds); the default applies before any samples exist
+HEDGE_MIN_DELAY = 0.05
+HEDGE_DEFAULT_DELAY = 1.0
+
+# Hedges each primary may issue: earns RATIO per call it makes, capped at BURST
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_BUDGET_BURST = 10
+
+# Threads used to run hedged calls
+HEDGE_MAX_WORKERS = 8
+
+# Sinks fed by the processing pipeline ("jsonl", "topic", "archive");
+# empty processes inline with logging only
+SINKS = []
+
+# Output file of the newline-delimited JSON sink
+JSONL_SINK_PATH = "blocks.jsonl"
+
+# Directory of the columnar block-header archive
+ARCHIVE_PATH = "archive"
+
+# Records kept by the in-process topic before the oldest are dropped
+TOPIC_RETENTION = 100_000
+
+# Blocks buffered between fetching and sinks; fetching blocks when full
+SINK_QUEUE_SIZE = 1000
+
+# Micro-batch flush triggers: N items (blocks, logs or transactions) or T
+# milliseconds, whichever first
+SINK_BATCH_SIZE = 100
+SINK_BATCH_INTERVAL_MS = 500
+
+# Seconds between retries of a failed sink write, and the attempts a write
+# gets before the pipeline gives up and stops the streamer
+SINK_RETRY_DELAY = 1
+SINK_MAX_ATTEMPTS = 10
+
+# Providers whose rate-limit bucket (providers.yml rate_limit) is below this
+# fraction of its burst are routed around while others have headroom, and
+# count as having headroom again only once refilled to RATE_LIMIT_RESUME
+RATE_LIMIT_RESERVE = 0.1
+RATE_LIMIT_RESUME = 0.3
+
+# Prometheus /metrics and /health endpoint (disabled when METRICS_PORT is None)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 8080
+
+# Streaming engine used by main.py ("sync" or "async")
+STREAM_ENGINE = "sync"
+
+# Maximum number of concurrent block fetches in the async engine
+MAX_IN_FLIGHT = 10
+
 # Logging
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
 LOG_LEVEL = "INFO"
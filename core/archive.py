@@ -0,0 +1,267 @@
+import json
+import logging
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+import config
+from core.sinks import Sink
+from models.block import BlockHeader
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("archive")
+
+# Column name -> (array typecode, numpy dtype); all little-endian, fixed width
+COLUMNS = {
+    "number": ("Q", "<u8"),
+    "timestamp": ("Q", "<u8"),
+    "tx_count": ("I", "<u4"),
+    "gas_used": ("Q", "<u8"),
+    "gas_limit": ("Q", "<u8"),
+    "base_fee": ("Q", "<u8"),
+}
+
+# The index maps (number - base) to a row; -1 marks blocks not archived
+INDEX_FILE = "index.i64"
+META_FILE = "meta.json"
+
+
+def _column_file(name: str) -> str:
+    return f"{name}.{COLUMNS[name][1][1:]}"
+
+
+def _width(name: str) -> int:
+    return int(COLUMNS[name][1][2:])
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read(file_path: str, typecode: str, start: int = 0, count: int = -1) -> array:
+    """Read fixed-width little-endian values, ignoring a torn trailing one."""
+    width = array(typecode).itemsize
+    with open(file_path, "rb") as f:
+        f.seek(start * width)
+        data = f.read(count * width if count >= 0 else -1)
+    values = array(typecode, data[: len(data) // width * width])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _cut(file_path: str, size: int) -> None:
+    """Truncate a file to `size` bytes and fsync it."""
+    with open(file_path, "r+b") as f:
+        f.truncate(size)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class ArchiveWriter:
+    """Appends block headers to fixed-width column files plus a number index."""
+
+    def __init__(self, path: str = config.ARCHIVE_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.base: Optional[int] = None
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.base = json.load(f)["base"]
+
+        self.rows = self._recover()
+        self._files = {
+            name: open(os.path.join(path, _column_file(name)), "ab") for name in COLUMNS
+        }
+        self._index = open(os.path.join(path, INDEX_FILE), "r+b")
+
+    def _recover(self) -> int:
+        """Bring columns and index back in line after a crash.
+
+        Columns are cut to the last row every one of them holds. The index
+        keeps only entries for those rows; rows the columns hold beyond the
+        index get their entries rebuilt from the number column. Both are
+        fsynced before appending resumes.
+        """
+        for name in [*COLUMNS, "index"]:
+            if not os.path.exists(self._file_path(name)):
+                open(self._file_path(name), "wb").close()
+        rows = min(
+            os.path.getsize(self._file_path(name)) // _width(name) for name in COLUMNS
+        )
+        if self.base is None:
+            rows = 0
+
+        # Drop entries for rows the columns never got, and the gap before them
+        index = _read(self._file_path("index"), "q")
+        while index and not 0 <= index[-1] < rows:
+            index.pop()
+        kept = len(index)
+        rows = self._rebuild_index(index, rows)
+
+        for name in COLUMNS:
+            _cut(self._file_path(name), rows * _width(name))
+        with open(self._file_path("index"), "r+b") as f:
+            f.seek(kept * 8)
+            f.write(_to_bytes(index[kept:]))
+            f.truncate(len(index) * 8)
+            f.flush()
+            os.fsync(f.fileno())
+        return rows
+
+    def _rebuild_index(self, index: array, rows: int) -> int:
+        """Index the rows past the last indexed one; returns the rows kept."""
+        indexed = index[-1] + 1 if index else 0
+        numbers = _read(self._file_path("number"), "Q", indexed, rows - indexed)
+        for row, number in enumerate(numbers, start=indexed):
+            slot = number - self.base
+            if slot < len(index):
+                # Not past the indexed tip, so not a row append() wrote
+                rows = row
+                break
+            index.extend([-1] * (slot - len(index)))
+            index.append(row)
+        if rows > indexed:
+            logger.warning(f"Rebuilt the archive index for {rows - indexed} rows")
+        return rows
+
+    def _file_path(self, name: str) -> str:
+        file_name = INDEX_FILE if name == "index" else _column_file(name)
+        return os.path.join(self.path, file_name)
+
+    def append(self, blocks: List[BlockHeader]) -> None:
+        """Append blocks past the archive tip; already archived ones are skipped."""
+        if self.base is None and blocks:
+            self.base = blocks[0].number
+            with open(os.path.join(self.path, META_FILE), "w") as f:
+                json.dump({"base": self.base, "columns": list(COLUMNS)}, f)
+
+        below = [b.number for b in blocks if b.number < self.base]
+        if below:
+            raise ValueError(
+                f"Block #{below[0]} is below the archive base #{self.base}"
+            )
+
+        # Re-emitted after a restart (delivery is at-least-once)
+        index_len = self.index_length
+        blocks = [b for b in blocks if b.number - self.base >= index_len]
+        if not blocks:
+            return
+
+        index = array("q")
+        for row, block in enumerate(blocks, start=self.rows):
+            slot = block.number - self.base
+            if slot < index_len + len(index):
+                raise ValueError(f"Block #{block.number} is out of order")
+            index.extend([-1] * (slot - index_len - len(index)))
+            index.append(row)
+
+        for name, (typecode, _) in COLUMNS.items():
+            values = array(typecode, [getattr(block, name) for block in blocks])
+            self._files[name].write(_to_bytes(values))
+        self._index.write(_to_bytes(index))
+        self.rows += len(blocks)
+
+    def truncate_from(self, number: int) -> None:
+        """Drop `number` and everything after it (reorg revert)."""
+        if self.base is None or number - self.base >= self.index_length:
+            return
+
+        self.flush()
+        slot = max(0, number - self.base)
+        self._index.seek(0)
+        index = array("q", self._index.read(self.index_length * 8))
+        if sys.byteorder == "big":
+            index.byteswap()
+        rows = next((r for r in index[slot:] if r >= 0), self.rows)
+
+        for name in COLUMNS:
+            self._files[name].truncate(rows * _width(name))
+        self._index.truncate(slot * 8)
+        self.rows = rows
+
+    @property
+    def index_length(self) -> int:
+        self._index.seek(0, os.SEEK_END)
+        return self._index.tell() // 8
+
+    def flush(self) -> None:
+        for f in self._files.values():
+            f.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._index.close()
+
+
+class ArchiveReader:
+    """Range queries over an archive, returned as NumPy arrays.
+
+    Column and index files are memory-mapped, so a range query reads only
+    the pages it touches and never calls a provider.
+    """
+
+    def __init__(self, path: str = config.ARCHIVE_PATH):
+        import numpy as np
+
+        self.np = np
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.base = json.load(f)["base"]
+
+    def _map(self, file_name: str, dtype: str):
+        file_path = os.path.join(self.path, file_name)
+        if os.path.getsize(file_path) == 0:
+            return self.np.empty(0, dtype=dtype)
+        return self.np.memmap(file_path, dtype=dtype, mode="r")
+
+    def rows(self, start: int, end: int):
+        """Row offsets of archived blocks in [start, end]."""
+        index = self._map(INDEX_FILE, "<i8")
+        lo = max(0, start - self.base)
+        hi = max(lo, min(len(index), end - self.base + 1))
+        rows = index[lo:hi]
+        return rows[rows >= 0]
+
+    def has_range(self, start: int, end: int) -> bool:
+        """True when every block in [start, end] is archived."""
+        return len(self.rows(start, end)) == end - start + 1
+
+    def range(self, start: int, end: int, columns=None) -> Dict[str, "object"]:
+        """Columns for archived blocks in [start, end], keyed by column name."""
+        rows = self.rows(start, end)
+        contiguous = len(rows) and rows[-1] - rows[0] + 1 == len(rows)
+
+        result = {}
+        for name in columns or COLUMNS:
+            column = self._map(_column_file(name), COLUMNS[name][1])
+            if contiguous:
+                result[name] = self.np.array(column[rows[0] : rows[-1] + 1])
+            else:
+                result[name] = column[rows]
+        return result
+
+
+class ArchiveSink(Sink):
+    """Writes streamed blocks into the columnar archive."""
+
+    def __init__(self, path: str = config.ARCHIVE_PATH):
+        self.writer = ArchiveWriter(path)
+
+    def write(self, blocks: List[BlockHeader]) -> None:
+        self.writer.append(blocks)
+        self.writer.flush()
+
+    def revert(self, number: int, block_hash: Optional[str]) -> None:
+        self.writer.truncate_from(number)
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from typing import List
+
+import config
+from core.async_w3_client import AsyncW3Client
+from core.hotswap import HotswapManager
+from models.provider import Provider
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("async_manager")
+
+
+class AsyncHotswapManager(HotswapManager):
+    """HotswapManager whose clients connect concurrently on the event loop."""
+
+    def __init__(self, *args, **kwargs):
+        # Probe and refresh tasks in flight, referenced so they are not
+        # collected early
+        self._probes = set()
+        super().__init__(*args, **kwargs)
+
+    def _initialize_clients(self):
+        """Clients are connected on the event loop by create()."""
+
+    @classmethod
+    async def create(cls, providers: List[Provider]) -> "AsyncHotswapManager":
+        """Build a manager and connect all of its clients."""
+        manager = cls(providers, hedging=False)
+        await manager._initialize_clients_async()
+        return manager
+
+    async def _connect(self, provider: Provider):
+        client = AsyncW3Client(provider)
+        try:
+            await client.connect()
+        except Exception as e:
+            logger.warning(f"Failed to initialize {provider.name}: {e}")
+            return None
+
+        self._add_client(provider, client)
+        return client
+
+    def _probe(self, client: AsyncW3Client) -> None:
+        """Send a half-open probe as a task on the running loop."""
+        if client.health.begin_probe():
+            task = asyncio.ensure_future(self._send_probe_async(client))
+            self._probes.add(task)
+            task.add_done_callback(self._probes.discard)
+
+    async def _send_probe_async(self, client: AsyncW3Client) -> None:
+        start = time.monotonic()
+        try:
+            await client.get_latest_block_number()
+        except Exception as e:
+            logger.debug(f"Probe to {client.provider.name} failed: {str(e)}")
+            client.health.probe_failed()
+            return
+        client.health.probe_succeeded(time.monotonic() - start)
+
+    def _refresh(self, client: AsyncW3Client) -> None:
+        """Refresh an idle provider's score as a task on the running loop."""
+        task = asyncio.ensure_future(self._send_refresh_async(client))
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    async def _send_refresh_async(self, client: AsyncW3Client) -> None:
+        try:
+            await client.get_latest_block_number()
+        except Exception as e:
+            logger.debug(f"Refresh of {client.provider.name} failed: {str(e)}")
+        finally:
+            self._refreshing.discard(client.provider.name)
+
+    async def _initialize_clients_async(self):
+        """Connect all clients concurrently; return once one is healthy.
+
+        The remaining connections keep running on the loop and join
+        self.clients as they finish.
+        """
+        self._connecting = [
+            asyncio.ensure_future(self._connect(p)) for p in self.providers
+        ]
+        for next_done in asyncio.as_completed(self._connecting):
+            await next_done
+            if self.current_provider:
+                return
+
+        raise RuntimeError("No healthy providers available")
+
+    async def wait_for_providers_async(self) -> None:
+        """Wait until every provider has finished connecting (or failed)."""
+        await asyncio.gather(*self._connecting)
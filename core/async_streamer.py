@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+import config
+from core.async_hotswap import AsyncHotswapManager
+from core.async_w3_client import AsyncW3Client
+from core.checkpoint import CheckpointStore
+from core.metrics import REGISTRY, rate_of
+from core.reorg import BlockHistory, ReorgTooDeep
+from core.scheduler import PollScheduler
+from models.block import BlockHeader
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("async_streamer")
+
+
+class AsyncBlockStreamer:
+    def __init__(
+        self,
+        hotswap_manager: AsyncHotswapManager,
+        max_in_flight: int = config.MAX_IN_FLIGHT,
+        checkpoint: Optional[CheckpointStore] = None,
+        chain: str = "default",
+    ):
+        self.manager = hotswap_manager
+        self.chain = chain
+        self.max_in_flight = max_in_flight
+        self.checkpoint = checkpoint
+        self.history = BlockHistory()
+        self.scheduler = PollScheduler()
+        self.last_block = None
+
+        self.blocks = REGISTRY.counter(
+            "streamer_blocks_total", "Blocks emitted", chain=chain
+        )
+        self.reorgs = REGISTRY.counter(
+            "streamer_reorgs_total", "Reorgs handled", chain=chain
+        )
+        self.head_lag = REGISTRY.gauge(
+            "streamer_head_lag_blocks",
+            "Blocks between the chain head and the cursor",
+            chain=chain,
+        )
+        REGISTRY.gauge(
+            "streamer_blocks_per_second",
+            "Emit rate since the previous scrape",
+            fn=rate_of(self.blocks),
+            chain=chain,
+        )
+
+    async def stream(self):
+        """Stream blocks from the blockchain."""
+        logger.info("Streaming (async)...")
+        while True:
+            try:
+                client: AsyncW3Client = self.manager.get_client()
+
+                current_block = await client.get_latest_block_number()
+                if self.last_block is None:
+                    self.last_block = self._resume_point(current_block)
+                    logger.info(
+                        f"{client.provider.name} Initialized at "
+                        f"Block #{self.last_block}"
+                    )
+
+                self.head_lag.set(current_block - self.last_block)
+                if current_block > self.last_block:
+                    logger.info(f"Found {current_block - self.last_block} new blocks")
+                    await self._fetch_range(client, current_block)
+
+                if self.checkpoint is not None:
+                    self.checkpoint.flush_if_due()
+
+                self.scheduler.success()
+                await asyncio.sleep(self.scheduler.poll_delay())
+            except ReorgTooDeep as e:
+                logger.critical(f"Stopping: {str(e)}")
+                raise
+            except Exception as e:
+                delay = self.scheduler.error_delay()
+                logger.warning(f"Streaming error, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def _fetch_range(self, client: AsyncW3Client, current_block: int):
+        """Fetch up to current_block with bounded concurrency, processing in order."""
+        pending = deque()
+        next_number = self.last_block + 1
+        try:
+            while next_number <= current_block or pending:
+                while (
+                    next_number <= current_block and len(pending) < self.max_in_flight
+                ):
+                    pending.append(asyncio.ensure_future(client.get_block(next_number)))
+                    next_number += 1
+
+                block_data = await pending.popleft()
+                block = client.validate_block(block_data)
+                if not self.history.links(block):
+                    await self._rewind(client, block)
+
+                client.process_block(block)
+                self.history.push(block)
+                self.last_block = block.number
+                self.blocks.inc()
+                self.scheduler.observe(block.number, block.timestamp)
+                client.health.last_block_time = block.timestamp
+                if self.checkpoint is not None:
+                    self.checkpoint.commit(block.number)
+        finally:
+            for task in pending:
+                task.cancel()
+            # Retrieve failures of tasks that finished before the cancel
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _rewind(self, client: AsyncW3Client, block: BlockHeader):
+        """Revert the stale branch below `block` and re-emit the canonical one.
+
+        Same walk as BlockStreamer._rewind: one canonical block is fetched per
+        step until its parentHash matches the recorded history.
+        """
+        canonical = []
+        number, parent_hash = block.number - 1, block.parent_hash
+        while True:
+            entry = self.history.get(number)
+            if entry is None:
+                raise ReorgTooDeep(
+                    f"Reorg at #{block.number} is deeper than "
+                    f"{self.history.size} recorded blocks; raise REORG_HISTORY_SIZE "
+                    f"and resync from a checkpoint below the fork"
+                )
+            if entry.hash == parent_hash:
+                break
+
+            parent_data = await client.get_block(number, use_cache=False)
+            parent = client.validate_block(parent_data)
+            canonical.append(parent)
+            number, parent_hash = number - 1, parent.parent_hash
+
+        logger.warning(
+            f"Reorg detected at #{block.number}, fork point #{number}, "
+            f"depth {len(canonical)}"
+        )
+        self.reorgs.inc()
+        for entry in self.history.truncate_above(number):
+            client.revert_block(entry.number, entry.hash)
+
+        for parent in reversed(canonical):
+            client.process_block(parent)
+            self.history.push(parent)
+            self.last_block = parent.number
+            self.blocks.inc()
+
+    def _resume_point(self, current_block: int) -> int:
+        """Last committed block if there is a checkpoint, else just below the head."""
+        if self.checkpoint is not None:
+            committed = self.checkpoint.load()
+            if committed is not None:
+                logger.info(f"Resuming from checkpoint at Block #{committed}")
+                return committed
+        return current_block - 1
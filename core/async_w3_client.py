@@ -0,0 +1,99 @@
+import logging
+from typing import Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncWeb3
+
+import config
+from core.health import measure_time_async
+from core.w3_client import W3Client
+from models.provider import Provider
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("async_w3_client")
+
+
+class AsyncW3Client(W3Client):
+    """W3Client counterpart whose network calls are coroutines."""
+
+    def __init__(self, provider: Provider):
+        super().__init__(provider)
+        self.async_session: Optional[ClientSession] = None
+
+    async def close(self):
+        """Release pooled connections."""
+        if self.async_session is not None:
+            await self.async_session.close()
+        self.session.close()
+
+    @measure_time_async
+    async def connect(self):
+        """Connect to the provider."""
+        try:
+            pool = self.provider.pool
+            timeout = ClientTimeout(
+                sock_connect=pool.connect_timeout, sock_read=pool.read_timeout
+            )
+            http_provider = AsyncWeb3.AsyncHTTPProvider(
+                self.provider.url, request_kwargs={"timeout": timeout}
+            )
+
+            # Reused across reconnects so a swap back finds warm connections
+            if self.async_session is None or self.async_session.closed:
+                self.async_session = ClientSession(
+                    connector=TCPConnector(
+                        limit=pool.pool_size, force_close=not pool.keep_alive
+                    ),
+                    timeout=timeout,
+                )
+            await http_provider.cache_async_session(self.async_session)
+            self.w3 = AsyncWeb3(http_provider)
+
+            if not await self.w3.is_connected():
+                raise ConnectionError(
+                    f"Failed to connect to provider: {self.provider.name}"
+                )
+
+            logger.info(f"Connected to provider: {self.provider.name}")
+
+        except Exception as e:
+            logger.error(f"Connection error for {self.provider.name}: {str(e)}")
+            self.health.connection_failures += 1
+            raise
+
+    @measure_time_async
+    async def get_latest_block_number(self):
+        """Get the latest block number."""
+        try:
+            return await self.w3.eth.block_number
+        except Exception as e:
+            self.health.block_failures += 1
+            logger.error(
+                f"Error getting latest block from {self.provider.name}: {str(e)}"
+            )
+            raise
+
+    async def get_block(self, block_number: int, use_cache: bool = True):
+        """Get block data, from the cache when possible"""
+        if use_cache and self.cache is not None:
+            block_data = self.cache.get(block_number)
+            if block_data is not None:
+                return block_data
+
+        block_data = await self._get_block_timed(block_number)
+        if self.cache is not None:
+            self.cache.put(block_data)
+        return block_data
+
+    @measure_time_async
+    async def _get_block_timed(self, block_number: int):
+        try:
+            return await self.w3.eth.get_block(block_number, full_transactions=False)
+
+        except Exception as e:
+            self.health.block_failures += 1
+            logger.error(
+                f"Error getting Block #{block_number} "
+                f"from {self.provider.name}: {str(e)}"
+            )
+            raise
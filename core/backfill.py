@@ -0,0 +1,222 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Set
+
+import config
+from core.hotswap import HotswapManager
+from core.w3_client import W3Client
+from models.block import BlockHeader
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("backfill")
+
+
+@dataclass
+class Chunk:
+    start: int
+    end: int
+    attempts: int = 0
+    failed_on: Set[str] = field(default_factory=set)
+
+    @property
+    def numbers(self) -> List[int]:
+        return list(range(self.start, self.end + 1))
+
+
+class ParallelBackfiller:
+    """Shards a block range across every healthy client and re-orders the output."""
+
+    def __init__(
+        self,
+        hotswap_manager: HotswapManager,
+        chunk_size: Optional[int] = None,
+        window: Optional[int] = None,
+    ):
+        self.manager = hotswap_manager
+        # None follows BACKFILL_CHUNK_SIZE / BACKFILL_WINDOW
+        self.base_chunk_size = chunk_size
+        self.window = window
+
+    def chunk_size(self, client: W3Client, clients: Dict[str, W3Client]) -> int:
+        """Chunk size scaled by the client's latency relative to the fastest one."""
+        latencies = [c.health.avg_response_time for c in clients.values()]
+        fastest = min((t for t in latencies if t > 0), default=0)
+        latency = client.health.avg_response_time
+        base = self.base_chunk_size or config.BACKFILL_CHUNK_SIZE
+        if fastest <= 0 or latency <= 0:
+            return base
+        return max(1, int(base * fastest / latency))
+
+    def backfill(self, start_block: int, end_block: int) -> Iterator[BlockHeader]:
+        """Yield validated blocks start_block..end_block in order."""
+        clients = {
+            name: client
+            for name, client in self.manager.clients.items()
+            if client.health.is_healthy
+        }
+        if not clients:
+            raise RuntimeError("No healthy providers available")
+
+        logger.info(
+            f"Backfilling #{start_block}-#{end_block} across {len(clients)} providers"
+        )
+
+        window = self.window or config.BACKFILL_WINDOW
+        next_start = start_block
+        next_emit = start_block
+        retries: List[Chunk] = []
+        ready: Dict[int, tuple] = {}
+        in_flight = {}
+        idle = set(clients)
+
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            while next_emit <= end_block:
+                next_start = self._dispatch(
+                    executor,
+                    clients,
+                    idle,
+                    retries,
+                    in_flight,
+                    next_start,
+                    min(end_block, next_emit + window),
+                    end_block,
+                )
+                if not in_flight:
+                    raise RuntimeError("No healthy providers available")
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                self._collect(done, clients, idle, retries, in_flight, ready)
+
+                while next_emit in ready:
+                    blocks, client = ready.pop(next_emit)
+                    for block_data in blocks:
+                        yield client.validate_block(block_data)
+                    next_emit += len(blocks)
+
+    def _dispatch(
+        self,
+        executor: ThreadPoolExecutor,
+        clients: Dict[str, W3Client],
+        idle: Set[str],
+        retries: List[Chunk],
+        in_flight: Dict,
+        next_start: int,
+        limit: int,
+        end_block: int,
+    ) -> int:
+        """Hand each idle client a retry or a new chunk starting at or before limit.
+
+        Returns the first block not yet assigned to any chunk.
+        """
+        for name in sorted(idle):
+            client = clients[name]
+            chunk = self._next_chunk(name, retries, clients)
+            if chunk is None:
+                if next_start > limit:
+                    continue
+                size = self.chunk_size(client, clients)
+                chunk = Chunk(next_start, min(next_start + size - 1, end_block))
+                next_start = chunk.end + 1
+
+            chunk.attempts += 1
+            future = executor.submit(client.get_blocks, chunk.numbers)
+            in_flight[future] = (chunk, name)
+            idle.discard(name)
+        return next_start
+
+    def _collect(
+        self,
+        done: Set,
+        clients: Dict[str, W3Client],
+        idle: Set[str],
+        retries: List[Chunk],
+        in_flight: Dict,
+        ready: Dict[int, tuple],
+    ) -> None:
+        """Stash finished chunks by start block and requeue the failed ones."""
+        for future in done:
+            chunk, name = in_flight.pop(future)
+            try:
+                ready[chunk.start] = (future.result(), clients[name])
+                idle.add(name)
+            except Exception as e:
+                self._requeue(chunk, name, retries, e)
+                if clients[name].health.is_healthy:
+                    idle.add(name)
+                else:
+                    logger.warning(f"Dropping {name} from backfill")
+                    del clients[name]
+
+    def _next_chunk(self, name: str, retries: List[Chunk], clients: Dict):
+        """Pop the first retry chunk that has not already failed on this client."""
+        for i, chunk in enumerate(retries):
+            # Once every remaining client has failed it, any of them may retry
+            if name not in chunk.failed_on or chunk.failed_on.issuperset(clients):
+                return retries.pop(i)
+        return None
+
+    def _requeue(self, chunk: Chunk, name: str, retries: List[Chunk], error) -> None:
+        logger.warning(
+            f"Chunk #{chunk.start}-#{chunk.end} failed on {name}: {str(error)}"
+        )
+        if chunk.attempts >= config.BACKFILL_MAX_ATTEMPTS:
+            raise RuntimeError(
+                f"Chunk #{chunk.start}-#{chunk.end} failed "
+                f"after {chunk.attempts} attempts"
+            ) from error
+
+        chunk.failed_on.add(name)
+        retries.append(chunk)
+
+
+class BackfillProgress:
+    """Throughput and ETA of a bulk backfill, logged every few seconds."""
+
+    def __init__(
+        self, start_block: int, interval: float = config.BULK_PROGRESS_INTERVAL
+    ):
+        self.start_block = start_block
+        self.interval = interval
+        self.last_block = start_block - 1
+        self.end_block = start_block - 1
+        self.started = time.monotonic()
+        self._last_log = self.started
+
+    def update(self, block_number: int, end_block: int) -> None:
+        """Record the last ingested block; end_block may move with the head."""
+        self.last_block = block_number
+        self.end_block = end_block
+        now = time.monotonic()
+        if now - self._last_log >= self.interval:
+            self._last_log = now
+            logger.info(self.summary())
+
+    @property
+    def done(self) -> int:
+        return self.last_block - self.start_block + 1
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.end_block - self.last_block)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the average rate so far, None before any progress."""
+        return self.remaining / self.rate if self.rate > 0 else None
+
+    def summary(self) -> str:
+        total = self.end_block - self.start_block + 1
+        percent = 100 * self.done / total if total > 0 else 100.0
+        eta = "?" if self.eta is None else str(timedelta(seconds=int(self.eta)))
+        return (
+            f"Backfill #{self.last_block}/#{self.end_block} ({percent:.1f}%) "
+            f"{self.rate:,.0f} blocks/s, ETA {eta}"
+        )
@@ -0,0 +1,96 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import config
+from models.block import to_hex
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("cache")
+
+
+class BlockCache:
+    """Bounded LRU of recent raw blocks, indexed by number and by hash.
+
+    Putting a block whose parentHash disagrees with the cached parent drops
+    the cached parent and everything above it, so stale branches never
+    survive a reorg.
+    """
+
+    def __init__(self, capacity: int = config.BLOCK_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.reorgs = 0
+
+        self._by_number: "OrderedDict[int, dict]" = OrderedDict()
+        self._by_hash: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_number)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, block_number: int) -> Optional[dict]:
+        with self._lock:
+            block = self._by_number.get(block_number)
+            if block is None:
+                self.misses += 1
+                return None
+            self._by_number.move_to_end(block_number)
+            self.hits += 1
+            return block
+
+    def get_by_hash(self, block_hash) -> Optional[dict]:
+        with self._lock:
+            block_number = self._by_hash.get(to_hex(block_hash))
+        if block_number is None:
+            self.misses += 1
+            return None
+        return self.get(block_number)
+
+    def put(self, block: dict) -> None:
+        block_number = block["number"]
+        block_hash = to_hex(block.get("hash"))
+        parent_hash = to_hex(block.get("parentHash"))
+
+        with self._lock:
+            parent = self._by_number.get(block_number - 1)
+            if (
+                parent is not None
+                and parent_hash is not None
+                and to_hex(parent.get("hash")) != parent_hash
+            ):
+                self.reorgs += 1
+                logger.warning(
+                    f"Reorg at #{block_number - 1}, dropping cached descendants"
+                )
+                self._drop_from(block_number - 1)
+
+            existing = self._by_number.get(block_number)
+            if existing is not None and to_hex(existing.get("hash")) != block_hash:
+                self._drop_from(block_number)
+
+            self._by_number[block_number] = block
+            self._by_number.move_to_end(block_number)
+            if block_hash is not None:
+                self._by_hash[block_hash] = block_number
+
+            while len(self._by_number) > self.capacity:
+                _, evicted = self._by_number.popitem(last=False)
+                self._by_hash.pop(to_hex(evicted.get("hash")), None)
+
+    def invalidate_from(self, block_number: int) -> None:
+        """Drop every cached block at or above block_number."""
+        with self._lock:
+            self._drop_from(block_number)
+
+    def _drop_from(self, block_number: int) -> None:
+        for number in [n for n in self._by_number if n >= block_number]:
+            stale = self._by_number.pop(number)
+            self._by_hash.pop(to_hex(stale.get("hash")), None)
@@ -0,0 +1,151 @@
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import config
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("checkpoint")
+
+
+class CheckpointStore(ABC):
+    """Durable last-processed block with group commit.
+
+    `commit` is called once per block and only records the number; the
+    backend write (and its fsync) happens every CHECKPOINT_COMMIT_BLOCKS
+    blocks or CHECKPOINT_COMMIT_INTERVAL_MS milliseconds.
+    """
+
+    def __init__(
+        self,
+        commit_blocks: int = config.CHECKPOINT_COMMIT_BLOCKS,
+        commit_interval_ms: int = config.CHECKPOINT_COMMIT_INTERVAL_MS,
+    ):
+        self.commit_blocks = commit_blocks
+        self.commit_interval = commit_interval_ms / 1000
+        self.committed: Optional[int] = None
+
+        self._pending: Optional[int] = None
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def load(self) -> Optional[int]:
+        """Return the last durably committed block, or None."""
+
+    @abstractmethod
+    def _write(self, block_number: int) -> None:
+        """Durably persist block_number."""
+
+    def close(self) -> None:
+        self.flush()
+
+    def commit(self, block_number: int, count: int = 1) -> None:
+        """Record processed blocks up to block_number, `count` of them new.
+
+        Flushes when the group is full or stale.
+        """
+        self._pending = block_number
+        self._pending_count += count
+        self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        if self._pending is None:
+            return
+        if (
+            self._pending_count >= self.commit_blocks
+            or time.monotonic() - self._last_flush >= self.commit_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Durably write the pending checkpoint."""
+        if self._pending is None:
+            return
+        self._write(self._pending)
+        self.committed = self._pending
+        self._pending = None
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """Checkpoint kept in a single-row SQLite table."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint "
+            "(id INTEGER PRIMARY KEY CHECK (id = 0), block_number INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+
+    def load(self) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT block_number FROM checkpoint WHERE id = 0"
+        ).fetchone()
+        self.committed = row[0] if row else None
+        return self.committed
+
+    def _write(self, block_number: int) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoint (id, block_number) VALUES (0, ?)",
+            (block_number,),
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        super().close()
+        self.conn.close()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoint appended as one line per flush; the last full line wins."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.file = open(path, "a+b")
+
+    def load(self) -> Optional[int]:
+        self.file.seek(0)
+        data = self.file.read()
+
+        # Drop a torn trailing write so later appends start on a fresh line
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            self.file.truncate(complete)
+
+        lines = data[:complete].split()
+        self.committed = int(lines[-1]) if lines else None
+        return self.committed
+
+    def _write(self, block_number: int) -> None:
+        self.file.write(b"%d\n" % block_number)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        super().close()
+        self.file.close()
+
+
+def create_checkpoint_store(
+    backend: Optional[str] = config.CHECKPOINT_BACKEND,
+    path: str = config.CHECKPOINT_PATH,
+) -> Optional[CheckpointStore]:
+    """Build the configured checkpoint store, or None when disabled."""
+    if backend is None:
+        return None
+    if backend == "sqlite":
+        return SqliteCheckpointStore(path)
+    if backend == "file":
+        return FileCheckpointStore(path)
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
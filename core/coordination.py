@@ -0,0 +1,283 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import config
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("coordination")
+
+
+@dataclass
+class Lease:
+    start: int
+    end: int
+    owner: str
+    attempts: int = 1
+
+
+class SqliteLeaseStore:
+    """Block-range leases and the live-head leadership, shared through SQLite.
+
+    Every mutation runs in a BEGIN IMMEDIATE transaction, so workers in
+    other processes on the same machine (or on a shared filesystem with
+    working locks) see claims atomically. Expiry times are wall-clock
+    seconds since all workers must agree on them.
+    """
+
+    def __init__(self, path: str, range_size: int = config.LEASE_RANGE_SIZE):
+        self.path = path
+        self.range_size = range_size
+        self.conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=10
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ranges ("
+            "start_block INTEGER PRIMARY KEY, end_block INTEGER NOT NULL, "
+            "owner TEXT, expires REAL NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, done INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leader ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), owner TEXT NOT NULL, "
+            "expires REAL NOT NULL, cursor INTEGER)"
+        )
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def add_range(self, start: int, end: int) -> int:
+        """Split start..end into leasable ranges; return how many were new."""
+        with self._transaction() as conn:
+            added = 0
+            for first in range(start, end + 1, self.range_size):
+                added += conn.execute(
+                    "INSERT OR IGNORE INTO ranges (start_block, end_block) "
+                    "VALUES (?, ?)",
+                    (first, min(first + self.range_size - 1, end)),
+                ).rowcount
+        return added
+
+    def claim(self, owner: str, ttl: float) -> Optional[Lease]:
+        """Lease the lowest range that is unowned or whose lease has expired."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT start_block, end_block, owner, attempts FROM ranges "
+                "WHERE done = 0 AND (owner IS NULL OR expires < ?) "
+                "ORDER BY start_block LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            start, end, previous, attempts = row
+            conn.execute(
+                "UPDATE ranges SET owner = ?, expires = ?, attempts = attempts + 1 "
+                "WHERE start_block = ?",
+                (owner, now + ttl, start),
+            )
+
+        if previous is not None:
+            logger.warning(f"{owner} reclaimed #{start}-#{end} from {previous}")
+        return Lease(start, end, owner, attempts + 1)
+
+    def renew(self, lease: Lease, ttl: float) -> bool:
+        """Extend a lease; False once another worker has reclaimed it."""
+        with self._transaction() as conn:
+            return (
+                conn.execute(
+                    "UPDATE ranges SET expires = ? "
+                    "WHERE start_block = ? AND owner = ? AND done = 0",
+                    (time.time() + ttl, lease.start, lease.owner),
+                ).rowcount
+                == 1
+            )
+
+    def complete(self, lease: Lease) -> bool:
+        """Mark a range done; False if it was reclaimed in the meantime."""
+        with self._transaction() as conn:
+            return (
+                conn.execute(
+                    "UPDATE ranges SET done = 1 WHERE start_block = ? AND owner = ?",
+                    (lease.start, lease.owner),
+                ).rowcount
+                == 1
+            )
+
+    def release(self, lease: Lease, next_start: Optional[int] = None) -> None:
+        """Give an unfinished range back without waiting for it to expire.
+
+        With next_start, the blocks below it are recorded as done and only
+        next_start..end is given back.
+        """
+        start = lease.start if next_start is None else next_start
+        with self._transaction() as conn:
+            released = conn.execute(
+                "UPDATE ranges SET start_block = ?, owner = NULL, expires = 0 "
+                "WHERE start_block = ? AND owner = ? AND done = 0",
+                (start, lease.start, lease.owner),
+            ).rowcount
+            if released and start > lease.start:
+                conn.execute(
+                    "INSERT INTO ranges (start_block, end_block, owner, done) "
+                    "VALUES (?, ?, ?, 1)",
+                    (lease.start, start - 1, lease.owner),
+                )
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM ranges WHERE done = 0"
+            ).fetchone()[0]
+
+    def elect(self, owner: str, ttl: float, cursor: Optional[int] = None) -> bool:
+        """Take or keep the live-head leadership; publish the leader's cursor."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, expires FROM leader WHERE id = 0"
+            ).fetchone()
+            if row is not None and row[0] != owner and row[1] >= now:
+                return False
+            conn.execute(
+                "INSERT INTO leader (id, owner, expires, cursor) VALUES (0, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET owner = excluded.owner, "
+                "expires = excluded.expires, "
+                "cursor = COALESCE(excluded.cursor, leader.cursor)",
+                (owner, now + ttl, cursor),
+            )
+
+        if row is None or row[0] != owner:
+            logger.info(f"{owner} elected live-head leader")
+        return True
+
+    def resign(self, owner: str, cursor: Optional[int] = None) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE leader SET expires = 0, cursor = COALESCE(?, cursor) "
+                "WHERE id = 0 AND owner = ?",
+                (cursor, owner),
+            )
+
+    def cursor(self) -> Optional[int]:
+        """Last block the live-head leader reported as processed."""
+        with self._lock:
+            row = self.conn.execute("SELECT cursor FROM leader WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Coordinator:
+    """One worker's view of the group: its leases, leadership and heartbeat.
+
+    A background thread renews held leases and the leadership every third
+    of the TTL and publishes `cursor` while leading. Leases another worker
+    reclaimed are dropped, so `holds()` turns False and the range is
+    abandoned; the reclaiming worker redoes it (at-least-once).
+    """
+
+    def __init__(
+        self,
+        store: SqliteLeaseStore,
+        worker_id: Optional[str] = None,
+        ttl: float = config.LEASE_TTL,
+    ):
+        self.store = store
+        self.worker_id = worker_id or default_worker_id()
+        self.ttl = ttl
+        self.leases: Dict[int, Lease] = {}
+        self.is_leader = False
+
+        # Last block processed while leading; written by the streamer
+        self.cursor: Optional[int] = None
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Coordinator":
+        self.heartbeat()
+        self._thread = threading.Thread(
+            target=self._run, name=f"heartbeat-{self.worker_id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.warning(f"Heartbeat failed: {str(e)}")
+
+    def heartbeat(self) -> None:
+        """Renew held leases and the leadership."""
+        with self._lock:
+            leases = list(self.leases.values())
+        for lease in leases:
+            if not self.store.renew(lease, self.ttl):
+                logger.warning(f"Lost lease #{lease.start}-#{lease.end}")
+                with self._lock:
+                    self.leases.pop(lease.start, None)
+
+        was_leader = self.is_leader
+        cursor = self.cursor if was_leader else None
+        self.is_leader = self.store.elect(self.worker_id, self.ttl, cursor)
+        if self.is_leader != was_leader:
+            # A cursor from an earlier term must not overwrite the group's
+            self.cursor = None
+
+    def claim(self) -> Optional[Lease]:
+        lease = self.store.claim(self.worker_id, self.ttl)
+        if lease is not None:
+            with self._lock:
+                self.leases[lease.start] = lease
+        return lease
+
+    def holds(self, lease: Lease) -> bool:
+        return lease.start in self.leases
+
+    def complete(self, lease: Lease) -> bool:
+        with self._lock:
+            self.leases.pop(lease.start, None)
+        return self.store.complete(lease)
+
+    def release(self, lease: Lease, next_start: Optional[int] = None) -> None:
+        with self._lock:
+            self.leases.pop(lease.start, None)
+        self.store.release(lease, next_start)
+
+    def close(self) -> None:
+        """Stop heartbeating, hand back unfinished leases and resign."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            leases, self.leases = list(self.leases.values()), {}
+        for lease in leases:
+            self.store.release(lease)
+        if self.is_leader:
+            self.store.resign(self.worker_id, self.cursor)
+            self.is_leader = False
@@ -0,0 +1,195 @@
+import codecs
+import json
+from typing import Callable, Iterable, Iterator, Optional
+
+from models.block import BlockHeader
+
+# Header fields the streamer needs before it can hand out transactions
+REQUIRED_FIELDS = ("number", "hash", "parentHash", "timestamp")
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Pull-based JSON reader over a stream of byte chunks.
+
+    Only the unconsumed tail of the input is buffered, so memory is bounded
+    by the chunk size plus the largest single value decoded (one
+    transaction), not by the size of the document.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what was consumed. False at EOF."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk)
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Keys of the object at the cursor; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[None]:
+        """Steps through the array at the cursor; the caller consumes each value."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.expect(",]") == "]":
+                return
+
+
+class FullBlock:
+    """A block whose transactions are handed out one at a time.
+
+    `header` is built from the fields preceding the transaction array.
+    Nodes serialize block fields in alphabetical order, so number, hash,
+    parentHash, timestamp and the gas fields are all known by then.
+    `header.tx_count` counts up while transactions() is iterated.
+    """
+
+    def __init__(
+        self,
+        fields: dict,
+        transactions: Iterable[dict],
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        missing = [key for key in REQUIRED_FIELDS if key not in fields]
+        if missing:
+            raise ValueError(f"Block fields {missing} must precede its transactions")
+
+        self.header = BlockHeader.from_rpc(fields)
+        self._transactions = transactions
+        self._on_close = on_close
+
+    def transactions(self) -> Iterator[dict]:
+        """Yield each transaction as a plain JSON dict (hex quantities)."""
+        try:
+            for transaction in self._transactions:
+                self.header.tx_count += 1
+                yield transaction
+        finally:
+            self.close()
+
+    def close(self):
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+
+def _streamed_transactions(
+    reader: _Reader, block_keys: Iterator[str], has_transactions: bool
+) -> Iterator[dict]:
+    """Decode the transaction array at the cursor, then skip the block's tail."""
+    if has_transactions:
+        for _ in reader.elements():
+            yield reader.value()
+    for _ in block_keys:
+        reader.value()
+
+
+def decode_full_block(
+    chunks: Iterable[bytes], on_close: Optional[Callable[[], None]] = None
+) -> FullBlock:
+    """Decode an eth_getBlockByNumber(..., true) response up to its transactions."""
+    reader = _Reader(chunks)
+    try:
+        for key in reader.members():
+            if key == "result":
+                break
+            if key == "error":
+                raise ValueError(f"RPC error: {reader.value()}")
+            reader.value()
+        else:
+            raise ValueError("Response has no result")
+
+        if reader.peek() == "n":
+            reader.value()
+            raise LookupError("Block not found")
+
+        fields = {}
+        block_keys = reader.members()
+        for key in block_keys:
+            if key == "transactions":
+                transactions = _streamed_transactions(reader, block_keys, True)
+                return FullBlock(fields, transactions, on_close)
+            fields[key] = reader.value()
+        return FullBlock(fields, (), on_close)
+    except Exception:
+        if on_close is not None:
+            on_close()
+        raise
+
+
+def full_block_from_response(response: dict) -> FullBlock:
+    """FullBlock over a response that arrived already parsed, as on websockets."""
+    if "error" in response:
+        raise ValueError(f"RPC error: {response['error']}")
+    if "result" not in response:
+        raise ValueError("Response has no result")
+    if response["result"] is None:
+        raise LookupError("Block not found")
+
+    block = response["result"]
+    fields = {key: value for key, value in block.items() if key != "transactions"}
+    return FullBlock(fields, block.get("transactions", ()))
@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+from core.checkpoint import CheckpointStore, create_checkpoint_store
+from core.decode import DecodePool
+from core.hotswap import HotswapManager
+from core.logs import LogStream
+from core.metrics import REGISTRY
+from core.pipeline import SinkPipeline
+from core.sinks import create_sinks
+from core.streamer import BlockStreamer
+from core.w3_client import build_session
+from models.provider import Provider
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("group")
+
+
+def chain_path(path: str, chain: str) -> str:
+    """Per-chain variant of a file path: checkpoint.db -> checkpoint.<chain>.db."""
+    if chain == "default":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{chain}{ext}"
+
+
+class StreamerGroup:
+    """Streams several chains from one process, one thread per chain.
+
+    Every chain gets its own HotswapManager, checkpoint, sinks, log stream
+    and BlockStreamer, so a slow or failing chain only ever blocks its own
+    thread. File sinks write to per-chain paths like the checkpoint, and
+    one decode pool serves every chain. HTTP connections come from shared
+    sessions, one per distinct pool_size/keep_alive setting, each holding
+    one pool per provider host. Metrics go to the shared registry
+    labelled by chain.
+    """
+
+    def __init__(
+        self,
+        chains: Dict[str, List[Provider]],
+        checkpoint_backend: Optional[str] = config.CHECKPOINT_BACKEND,
+        checkpoint_path: str = config.CHECKPOINT_PATH,
+        sinks: List[str] = config.SINKS,
+        log_addresses: Optional[List[str]] = config.LOG_ADDRESSES,
+        log_topics: Optional[List] = config.LOG_TOPICS,
+        decode_pool: Optional[str] = config.DECODE_POOL,
+    ):
+        self.chains = chains
+        self.checkpoint_backend = checkpoint_backend
+        self.checkpoint_path = checkpoint_path
+        self.sinks = sinks
+        self.log_addresses = log_addresses
+        self.log_topics = log_topics
+
+        # Providers sharing pool settings share a session
+        hosts: Dict[Tuple[int, bool], set] = {}
+        for provider in (p for group in chains.values() for p in group):
+            key = (provider.pool.pool_size, provider.pool.keep_alive)
+            hosts.setdefault(key, set()).add(urlsplit(provider.url).netloc)
+        self.sessions: Dict[Tuple[int, bool], requests.Session] = {
+            key: build_session(*key, hosts=len(netlocs))
+            for key, netlocs in hosts.items()
+        }
+        self.decoder = DecodePool(decode_pool) if decode_pool else None
+
+        self.managers: Dict[str, HotswapManager] = {}
+        self.streamers: Dict[str, BlockStreamer] = {}
+        self.checkpoints: Dict[str, CheckpointStore] = {}
+        self.pipelines: Dict[str, SinkPipeline] = {}
+        self.threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start one streaming thread per chain and return immediately."""
+        for chain in self.chains:
+            thread = threading.Thread(
+                target=self._run_chain,
+                args=(chain,),
+                name=f"stream-{chain}",
+                daemon=True,
+            )
+            self.threads[chain] = thread
+            thread.start()
+
+    def run(self) -> None:
+        """Start every chain and block until stop() is called."""
+        self.start()
+        try:
+            self._stopped.wait()
+        finally:
+            self.stop()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop every streamer and release checkpoints and connections."""
+        self._stopped.set()
+        with self._lock:
+            streamers = list(self.streamers.values())
+        for streamer in streamers:
+            streamer.stop()
+        for thread in self.threads.values():
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+        # Drain the sinks before their checkpoints take the last commit
+        for pipeline in self.pipelines.values():
+            pipeline.close()
+        for checkpoint in self.checkpoints.values():
+            checkpoint.close()
+        for manager in self.managers.values():
+            for client in manager.clients.values():
+                client.close()
+        if self.decoder is not None:
+            self.decoder.close()
+        for session in self.sessions.values():
+            session.close()
+
+    def _run_chain(self, chain: str) -> None:
+        manager = self._connect(chain)
+        if manager is None:
+            return
+
+        checkpoint = create_checkpoint_store(
+            self.checkpoint_backend, chain_path(self.checkpoint_path, chain)
+        )
+        pipeline = self._pipeline(chain, checkpoint)
+        logs = None
+        if self.log_addresses or self.log_topics:
+            logs = LogStream(self.log_addresses, self.log_topics)
+        streamer = BlockStreamer(
+            manager,
+            checkpoint=checkpoint,
+            pipeline=pipeline,
+            logs=logs,
+            decoder=self.decoder,
+            chain=chain,
+        )
+        with self._lock:
+            self.managers[chain] = manager
+            if self._stopped.is_set():
+                if pipeline is not None:
+                    pipeline.close()
+                if checkpoint is not None:
+                    checkpoint.close()
+                return
+            self.streamers[chain] = streamer
+            if pipeline is not None:
+                self.pipelines[chain] = pipeline
+            if checkpoint is not None:
+                self.checkpoints[chain] = checkpoint
+
+        streamer.stream()
+        logger.info(f"Stopped streaming {chain}")
+
+    def _pipeline(
+        self, chain: str, checkpoint: Optional[CheckpointStore]
+    ) -> Optional[SinkPipeline]:
+        """The chain's sink pipeline, with file sinks at per-chain paths."""
+        sinks = create_sinks(
+            self.sinks,
+            jsonl_path=chain_path(config.JSONL_SINK_PATH, chain),
+            archive_path=chain_path(config.ARCHIVE_PATH, chain),
+        )
+        if not sinks:
+            return None
+
+        on_flushed = checkpoint.commit if checkpoint is not None else None
+        pipeline = SinkPipeline(sinks, on_flushed=on_flushed)
+        REGISTRY.gauge(
+            "pipeline_queue_depth",
+            "Blocks waiting for the sinks",
+            fn=lambda: pipeline.depth,
+            chain=chain,
+        )
+        return pipeline
+
+    def _connect(self, chain: str) -> Optional[HotswapManager]:
+        """Connect a chain's providers, retrying until one is healthy or stopped."""
+        sessions = {
+            p.name: self.sessions[(p.pool.pool_size, p.pool.keep_alive)]
+            for p in self.chains[chain]
+        }
+        while not self._stopped.is_set():
+            try:
+                return HotswapManager(self.chains[chain], sessions=sessions)
+            except Exception as e:
+                logger.error(
+                    f"{chain}: {e}, retrying in {config.PROVIDER_RECOVERY_TIME}s"
+                )
+                self._stopped.wait(config.PROVIDER_RECOVERY_TIME)
+        return None
@@ -1,134 +1,370 @@
+import asyncio
+import bisect
 import logging
+import threading
 import time
 from functools import wraps
 from typing import Any, Callable, List, Optional
 
 import config
+from core.metrics import rpc_series
 
 logger = logging.getLogger("health")
 
 
+# Log-spaced latency bucket upper bounds: 1ms growing by 25% up to ~2 minutes
+LATENCY_BUCKETS = [0.001 * 1.25**i for i in range(53)]
+
+
+class LatencySketch:
+    """Rolling latency window with an EWMA and bucketed percentiles.
+
+    Samples are stored as bucket indexes in a fixed ring, and the bucket
+    counts are adjusted on insert and eviction, so recording is O(1) and
+    allocation-free. Percentiles scan the (small, fixed) bucket array and
+    return the bucket's upper bound.
+    """
+
+    def __init__(
+        self,
+        window: int = config.RESPONSE_TIME_WINDOW,
+        alpha: float = config.EWMA_ALPHA,
+    ):
+        self.window = window
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+
+        self._ring = [0] * window
+        self._pos = 0
+        self._count = 0
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, value: float) -> None:
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        if self._count == self.window:
+            self._buckets[self._ring[self._pos]] -= 1
+        else:
+            self._count += 1
+
+        self._ring[self._pos] = index
+        self._buckets[index] += 1
+        self._pos = (self._pos + 1) % self.window
+
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            self.ewma += self.alpha * (value - self.ewma)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile sample."""
+        if not self._count:
+            return None
+
+        rank = max(1, int(pct / 100 * self._count + 0.5))
+        seen = 0
+        for index, count in enumerate(self._buckets[:-1]):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS[index]
+        return float("inf")
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _failure_counter(kind: str, threshold: str) -> property:
+    """Failure count that opens the breaker once it reaches config.<threshold>.
+
+    Increments made by an abandoned hedged call are dropped, like the rest
+    of its outcome.
+    """
+    attr = f"_{kind}_failures"
+
+    def get(self) -> int:
+        return getattr(self, attr)
+
+    def set(self, value: int) -> None:
+        if value > getattr(self, attr) and not _counts():
+            return
+        setattr(self, attr, value)
+        if self.state is CLOSED and value >= getattr(config, threshold):
+            self._open(f"{kind} failures ({value})")
+
+    return property(get, set)
+
+
 class ProviderHealth:
-    """Tracker for provider health metrics."""
+    """Tracker for provider health metrics, gated by a circuit breaker.
+
+    Failures are judged as they are recorded and open the breaker, so
+    is_healthy is a single comparison. An open provider is due a probe
+    after open_duration seconds; the probe moves it to half-open. Only the
+    probe's own outcome decides from there: probe_succeeded() closes the
+    breaker, and probe_failed() re-opens it for twice as long, up to
+    BREAKER_OPEN_MAX. Other calls that finish while half-open are ignored.
+    """
+
+    connection_failures = _failure_counter("connection", "CONNECTION_FAILURE_THRESHOLD")
+    block_failures = _failure_counter("block", "BLOCK_FAILURE_THRESHOLD")
+    network_failures = _failure_counter("network", "NETWORK_FAILURE_THRESHOLD")
 
     def __init__(self, provider_name: str):
         self.provider_name = provider_name
-        self.response_times: List[float] = []
+        self.latency = LatencySketch()
+        self.batch_latency = LatencySketch()
+
+        # EWMA of call outcomes: 0 for success, 1 for failure
+        self.error_rate = 0.0
+
+        # Circuit breaker
+        self.state = CLOSED
+        self.open_duration = config.BREAKER_OPEN_MIN
+        self.opened_at: Optional[float] = None
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
 
         # Track failures directly
-        self.connection_failures = 0
-        self.block_failures = 0
-        self.network_failures = 0
+        self._connection_failures = 0
+        self._block_failures = 0
+        self._network_failures = 0
 
         # Block timing data
         self.last_block_time: Optional[int] = None
 
-        # Recovery tracking
-        self.unhealthy_since: Optional[float] = None
-        self.last_recovery_check: float = time.time()
-
     def record_response_time(self, duration: float) -> None:
-        """Record response time."""
-        self.response_times.append(duration)
-
-        # Keep only the most recent measurements
-        while len(self.response_times) > config.RESPONSE_TIME_WINDOW:
-            self.response_times.pop(0)
-
-    def mark_unhealthy(self) -> None:
-        """Mark provider as unhealthy and record the time."""
-        if self.unhealthy_since is None:
-            self.unhealthy_since = time.time()
-            logger.info(
-                f"{self.provider_name} marked unhealthy, will recover after {config.PROVIDER_RECOVERY_TIME} seconds"
-            )
-
-    def _check_recovery(self) -> bool:
-        """Check if enough time has passed to recover health."""
-        current_time = time.time()
-        if current_time - self.last_recovery_check < config.HEALTH_CHECK_MIN_INTERVAL:
-            return False
-
-        self.last_recovery_check = current_time
-        elapsed = current_time - self.unhealthy_since
-
-        if elapsed >= config.PROVIDER_RECOVERY_TIME:
-            logger.info(f"{self.provider_name} recovered after {elapsed:.1f} seconds")
-            self.reset_health()
-            return True
-
-        return False
-
-    def reset_health(self) -> None:
-        """Reset health metrics."""
-        self.connection_failures = 0
-        self.block_failures = 0
-        self.network_failures = 0
-        self.unhealthy_since = None
-        logger.info(f"Health metrics reset for {self.provider_name}")
+        """Record the response time of a successful call."""
+        if self.state is HALF_OPEN:
+            return
+        self.latency.record(duration)
+        self.error_rate -= config.EWMA_ALPHA * self.error_rate
 
-    @property
-    def avg_response_time(self) -> float:
-        """Get average response time."""
-        if not self.response_times:
-            return 0
-        return sum(self.response_times) / len(self.response_times)
+        slow = config.PROVIDER_TIMEOUT * 0.8
+        if self.state is CLOSED and self.latency.ewma > slow:
+            self._open(f"slow response time ({self.latency.ewma:.2f}s)")
+
+    def record_batch_time(self, duration: float, size: int) -> None:
+        """Record a batch round trip and its amortized per-block time."""
+        self.batch_latency.record(duration)
+        self.record_response_time(duration / max(size, 1))
+
+    def record_error(self) -> None:
+        """Record a failed call in the error-rate EWMA."""
+        if self.state is HALF_OPEN:
+            return
+        self.error_rate += config.EWMA_ALPHA * (1 - self.error_rate)
+
+    def probe_succeeded(self, duration: float) -> None:
+        """Close a half-open breaker, unless the probe itself was slow."""
+        if self.state is not HALF_OPEN:
+            return
+        # Judge the recovered provider on its probe, not the old average
+        self.latency.record(duration)
+        self.latency.ewma = duration
+        self.error_rate -= config.EWMA_ALPHA * self.error_rate
+        if duration > config.PROVIDER_TIMEOUT * 0.8:
+            self._open(f"slow probe ({duration:.2f}s)")
+        else:
+            self._close()
+
+    def probe_failed(self) -> None:
+        """Re-open a half-open breaker for twice as long."""
+        if self.state is not HALF_OPEN:
+            return
+        self.error_rate += config.EWMA_ALPHA * (1 - self.error_rate)
+        self._open("probe failed")
 
     @property
     def is_healthy(self) -> bool:
-        """Check if the provider is healthy based on metrics."""
-        # Always check recovery first if unhealthy
-        if self.unhealthy_since is not None:
-            self._check_recovery()
-
-        # Check connection failures
-        if self.connection_failures >= config.CONNECTION_FAILURE_THRESHOLD:
-            logger.warning(
-                f"{self.provider_name} marked unhealthy: connection failures ({self.connection_failures})"
-            )
-            self.mark_unhealthy()
-            return False
-
-        # Check block failures
-        if self.block_failures >= config.BLOCK_FAILURE_THRESHOLD:
-            logger.warning(
-                f"{self.provider_name} marked unhealthy: block failures ({self.block_failures})"
-            )
-            self.mark_unhealthy()
-            return False
-
-        # Check network failures
-        if self.network_failures >= config.NETWORK_FAILURE_THRESHOLD:
-            logger.warning(
-                f"{self.provider_name} marked unhealthy: network failures ({self.network_failures})"
-            )
-            self.mark_unhealthy()
-            return False
-
-        # Response time too slow
-        if (
-            self.response_times
-            and self.avg_response_time > config.PROVIDER_TIMEOUT * 0.8
-        ):
-            logger.warning(
-                f"{self.provider_name} marked unhealthy: slow response time ({self.avg_response_time:.2f}s)"
-            )
-            self.mark_unhealthy()
-            return False
+        """True while the breaker is closed."""
+        return self.state is CLOSED
 
+    @property
+    def probe_due(self) -> bool:
+        """True once an open breaker has waited out its open duration."""
+        return self.state is OPEN and time.monotonic() >= self._probe_at
+
+    def begin_probe(self) -> bool:
+        """Move a due breaker to half-open; only one caller gets to probe."""
+        with self._lock:
+            if self.state is not OPEN or time.monotonic() < self._probe_at:
+                return False
+            self.state = HALF_OPEN
         return True
 
+    def _open(self, reason: str) -> None:
+        with self._lock:
+            if self.state is OPEN:
+                return
+            if self.state is HALF_OPEN:
+                self.open_duration = min(
+                    self.open_duration * 2, config.BREAKER_OPEN_MAX
+                )
+            now = time.monotonic()
+            if self.opened_at is None:
+                self.opened_at = now
+            self._probe_at = now + self.open_duration
+            self.state = OPEN
+        logger.warning(
+            f"{self.provider_name} circuit open: {reason}, "
+            f"probing in {self.open_duration:.0f}s"
+        )
+
+    def _close(self) -> None:
+        with self._lock:
+            if self.state is CLOSED:
+                return
+            outage = time.monotonic() - self.opened_at
+            self._connection_failures = 0
+            self._block_failures = 0
+            self._network_failures = 0
+            self.open_duration = config.BREAKER_OPEN_MIN
+            self.opened_at = None
+            self.state = CLOSED
+        logger.info(f"{self.provider_name} circuit closed after {outage:.1f} seconds")
+
+    def percentile(self, pct: float, batch: bool = False) -> Optional[float]:
+        """Recent response (or batch) time percentile, None without samples."""
+        return (self.batch_latency if batch else self.latency).percentile(pct)
+
+    @property
+    def avg_response_time(self) -> float:
+        """Get the exponentially weighted average response time."""
+        return self.latency.ewma or 0
+
+    @property
+    def score(self) -> float:
+        """Expected seconds per successful call; lower is better.
+
+        Latency divided by the success rate is the expected cost once
+        retries are counted. Providers without samples score infinity.
+        """
+        if self.latency.ewma is None:
+            return float("inf")
+        return self.latency.ewma / max(1 - self.error_rate, 0.01)
+
+
+# Per-thread flag set while running a call whose outcome may be abandoned
+_calls = threading.local()
+
+
+def run_abandonable(abandoned: threading.Event, fn: Callable, *args, **kwargs) -> Any:
+    """Run fn, leaving provider health untouched once `abandoned` is set.
+
+    Used for the losing side of a hedged read: its result is discarded, so
+    a late failure or timeout says nothing the caller acted on. That covers
+    the response-time EWMAs and the failure counters alike.
+    """
+    _calls.abandoned = abandoned
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _calls.abandoned = None
+
+
+def _counts() -> bool:
+    """False when the running call's outcome was abandoned."""
+    abandoned = getattr(_calls, "abandoned", None)
+    return abandoned is None or not abandoned.is_set()
+
+
+def _method_label(fn: Callable) -> str:
+    """RPC method label for a client method, e.g. _get_block_timed -> get_block."""
+    return fn.__name__.lstrip("_").removesuffix("_timed")
+
+
+def _reserve(client, method: str, count: int = 1) -> float:
+    """Seconds to wait for the provider's rate-limit budget, outside the timing."""
+    if client.budget is None:
+        return 0.0
+    return client.budget.reserve(method, count)
+
 
 def measure_time(fn: Callable) -> Callable:
     """Decorator to measure operation time."""
 
+    method = _method_label(fn)
+
     @wraps(fn)
     def wrapper(client, *args, **kwargs) -> Any:
+        wait = _reserve(client, method)
+        if wait:
+            time.sleep(wait)
+        start_time = time.time()
+        try:
+            result = fn(client, *args, **kwargs)
+        except Exception:
+            if _counts():
+                client.health.record_error()
+            rpc_series(client.provider.chain, client.provider.name, method)[1].inc()
+            raise
+        duration = time.time() - start_time
+
+        if _counts():
+            client.health.record_response_time(duration)
+        ok, _, latency = rpc_series(client.provider.chain, client.provider.name, method)
+        ok.inc()
+        latency.observe(duration)
+        return result
+
+    return wrapper
+
+
+def measure_batch_time(fn: Callable) -> Callable:
+    """Decorator to measure a batched operation, per batch and per block."""
+
+    method = _method_label(fn)
+
+    @wraps(fn)
+    def wrapper(client, block_numbers: List[int], *args, **kwargs) -> Any:
+        wait = _reserve(client, method, len(block_numbers))
+        if wait:
+            time.sleep(wait)
+        start_time = time.time()
+        try:
+            result = fn(client, block_numbers, *args, **kwargs)
+        except Exception:
+            if _counts():
+                client.health.record_error()
+            rpc_series(client.provider.chain, client.provider.name, method)[1].inc()
+            raise
+        duration = time.time() - start_time
+
+        if _counts():
+            client.health.record_batch_time(duration, len(block_numbers))
+        ok, _, latency = rpc_series(client.provider.chain, client.provider.name, method)
+        ok.inc()
+        latency.observe(duration)
+        return result
+
+    return wrapper
+
+
+def measure_time_async(fn: Callable) -> Callable:
+    """Decorator to measure coroutine operation time."""
+
+    method = _method_label(fn)
+
+    @wraps(fn)
+    async def wrapper(client, *args, **kwargs) -> Any:
+        wait = _reserve(client, method)
+        if wait:
+            await asyncio.sleep(wait)
         start_time = time.time()
-        result = fn(client, *args, **kwargs)
+        try:
+            result = await fn(client, *args, **kwargs)
+        except Exception:
+            client.health.record_error()
+            rpc_series(client.provider.chain, client.provider.name, method)[1].inc()
+            raise
         duration = time.time() - start_time
 
         client.health.record_response_time(duration)
+        ok, _, latency = rpc_series(client.provider.chain, client.provider.name, method)
+        ok.inc()
+        latency.observe(duration)
         return result
 
     return wrapper
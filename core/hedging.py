@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from functools import partial
+from typing import Any, Optional
+
+import config
+from core.health import run_abandonable
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("hedging")
+
+# Read-only client calls that are safe to issue twice
+HEDGED_METHODS = ("get_latest_block_number", "get_block", "get_blocks")
+
+
+class HedgeBudget:
+    """Hedges one primary may issue: earns `ratio` per call it makes, up to `burst`."""
+
+    def __init__(
+        self,
+        ratio: float = config.HEDGE_BUDGET_RATIO,
+        burst: float = config.HEDGE_BUDGET_BURST,
+    ):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self.spent = 0
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.spent += 1
+        return True
+
+
+def hedge_delay(client, method: str) -> float:
+    """Seconds to wait on `client` before hedging, from its recent percentile."""
+    delay = client.health.percentile(
+        config.HEDGE_PERCENTILE, batch=method == "get_blocks"
+    )
+    if delay is None:
+        return config.HEDGE_DEFAULT_DELAY
+    return max(config.HEDGE_MIN_DELAY, delay)
+
+
+def hedged_call(
+    executor: ThreadPoolExecutor,
+    primary,
+    backup: Optional[Any],
+    budget: Optional[HedgeBudget],
+    method: str,
+    *args,
+    **kwargs,
+) -> Any:
+    """Run `method` on primary; if it is slow, race it against backup.
+
+    The first successful answer wins. The loser is cancelled if it has not
+    started; an in-flight HTTP call cannot be interrupted, so its result is
+    simply discarded, and so is its outcome in the provider's health. A
+    primary that loses is recorded as having taken as long as it ran
+    before the backup answered, at least the hedge delay, so its score
+    learns that it is slow.
+    """
+    abandoned = threading.Event()
+    started = time.monotonic()
+    first = executor.submit(
+        run_abandonable, abandoned, getattr(primary, method), *args, **kwargs
+    )
+    try:
+        return first.result(timeout=hedge_delay(primary, method))
+    except FuturesTimeout:
+        pass
+
+    if backup is None or budget is None or not budget.try_spend():
+        return first.result()
+
+    logger.info(
+        f"Hedging {method} from {primary.provider.name} to {backup.provider.name}"
+    )
+    second = executor.submit(
+        run_abandonable, abandoned, getattr(backup, method), *args, **kwargs
+    )
+
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                abandoned.set()
+                for loser in pending:
+                    loser.cancel()
+                if future is second and not first.done():
+                    _record_slow(primary, method, time.monotonic() - started, args)
+                return future.result()
+            error = future.exception()
+
+    raise error
+
+
+def _record_slow(client, method: str, elapsed: float, args: tuple) -> None:
+    """Record the time a call abandoned by a hedge had taken so far."""
+    if method == "get_blocks":
+        client.health.record_batch_time(elapsed, len(args[0]))
+    else:
+        client.health.record_response_time(elapsed)
+
+
+class HedgedClient:
+    """Primary client proxy whose reads are hedged through the manager."""
+
+    def __init__(self, primary, manager):
+        self.primary = primary
+        self.manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        if name in HEDGED_METHODS:
+            return partial(self.manager.hedge, self.primary, name)
+        return getattr(self.primary, name)
@@ -1,7 +1,15 @@
 import logging
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Dict, List, Optional
+
+import requests
 
 import config
+from core.cache import BlockCache
+from core.hedging import HedgeBudget, HedgedClient, hedged_call
+from core.metrics import REGISTRY
 from core.w3_client import W3Client
 from models.provider import Provider
 
@@ -10,46 +18,271 @@ logger = logging.getLogger("manager")
 
 
 class HotswapManager:
-    def __init__(self, providers: List[Provider]):
+    def __init__(
+        self,
+        providers: List[Provider],
+        hedging: bool = config.HEDGING_ENABLED,
+        sessions: Optional[Dict[str, requests.Session]] = None,
+    ):
         self.providers = providers
-        self.clients = {}
+        self.chain = providers[0].chain if providers else "default"
+
+        # Pooled sessions by provider name, shared across chains by a
+        # StreamerGroup; a provider without one gets its own
+        self.sessions = sessions or {}
+        self.clients: Dict[str, W3Client] = {}
         self.current_provider = None
+        self._clients_lock = threading.Lock()
+        self._connecting = []
+        self._last_routed = time.monotonic()
+        # Idle providers with a score-refresh call in flight
+        self._refreshing = set()
+        # Providers routed around until their budget refills to RATE_LIMIT_RESUME
+        self._throttled = set()
+        self.swaps = REGISTRY.counter(
+            "hotswap_swaps_total", "Changes of the current provider", chain=self.chain
+        )
+
+        # Shared so a provider swap does not refetch blocks already seen
+        self.cache = BlockCache()
+
+        # Slow reads on the primary are re-issued to a backup within budget
+        self.hedging = hedging
+        self.hedge_budgets: Dict[str, HedgeBudget] = {}
+        self._hedge_executor = (
+            ThreadPoolExecutor(
+                max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge"
+            )
+            if hedging
+            else None
+        )
 
         self._initialize_clients()
 
     def _initialize_clients(self):
-        """Initialize all clients and select the first healthy one."""
-        for provider in self.providers:
-            try:
-                client = W3Client(provider)
-                client.connect()
-                self.clients[provider.name] = client
-
-                # Set the first working provider as current
-                if not self.current_provider and client.health.is_healthy:
-                    self.current_provider = provider.name
-                    logger.info(f"Using {provider.name} as primary provider")
-            except Exception as e:
-                logger.warning(f"Failed to initialize {provider.name}: {e}")
-
-        if not self.current_provider:
-            raise RuntimeError("No healthy providers available")
+        """Connect to all providers concurrently; return once one is healthy.
+
+        A dead endpoint can hold its connect() for the full timeout, so
+        providers are probed in parallel and streaming starts on the first
+        healthy one. The rest join self.clients as they finish connecting.
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=len(self.providers), thread_name_prefix="connect"
+        )
+        self._connecting = [executor.submit(self._connect, p) for p in self.providers]
+        executor.shutdown(wait=False)
+
+        for future in as_completed(self._connecting):
+            future.result()
+            if self.current_provider:
+                return
+
+        raise RuntimeError("No healthy providers available")
+
+    def _connect(self, provider: Provider) -> Optional[W3Client]:
+        try:
+            client = W3Client(provider, session=self.sessions.get(provider.name))
+            client.connect()
+        except Exception as e:
+            logger.warning(f"Failed to initialize {provider.name}: {e}")
+            return None
+
+        self._add_client(provider, client)
+        return client
+
+    def _add_client(self, provider: Provider, client: W3Client) -> None:
+        client.cache = self.cache
+        with self._clients_lock:
+            # Copy-on-write in providers.yml order, so readers never see a
+            # dict change size mid-iteration and ties keep config order
+            clients = {**self.clients, provider.name: client}
+            self.clients = {
+                p.name: clients[p.name] for p in self.providers if p.name in clients
+            }
+            self.hedge_budgets = {**self.hedge_budgets, provider.name: HedgeBudget()}
+
+            # The first healthy provider to connect becomes current
+            if not self.current_provider and client.health.is_healthy:
+                self.current_provider = provider.name
+                logger.info(f"Using {provider.name} as primary provider")
+
+    def wait_for_providers(self, timeout: Optional[float] = None) -> None:
+        """Block until every provider has finished connecting (or failed)."""
+        wait(self._connecting, timeout=timeout)
 
     def get_client(self) -> W3Client:
         """Get a healthy client, switching providers if necessary."""
-        if (
-            not self.current_provider
-            or not self.clients[self.current_provider].health.is_healthy
-        ):
+        current = self.clients.get(self.current_provider)
+        if current is None or not current.health.is_healthy:
+            self._swap()
+        elif not self._has_headroom(current) and self._has_spare(current):
+            # Move before the budget runs out rather than after the 429s
             self._swap()
-        return self.clients[self.current_provider]
+        elif time.monotonic() - self._last_routed >= config.ROUTING_INTERVAL:
+            self._route()
 
-    def _swap(self):
-        """Swap to the next healthy provider."""
+        client = self.clients[self.current_provider]
+        if self.hedging:
+            return HedgedClient(client, self)
+        return client
+
+    def _probe_open(self) -> None:
+        """Probe every provider whose breaker has waited out its open time."""
+        for client in self.clients.values():
+            if client.health.probe_due:
+                self._probe(client)
+
+    def _probe(self, client: W3Client) -> None:
+        """Send a half-open probe (eth_blockNumber) off the calling thread.
+
+        Its outcome alone closes or re-opens the breaker.
+        """
+        if client.health.begin_probe():
+            threading.Thread(
+                target=self._send_probe,
+                args=(client,),
+                name=f"probe-{client.provider.name}",
+                daemon=True,
+            ).start()
+
+    def _send_probe(self, client: W3Client) -> None:
+        start = time.monotonic()
+        try:
+            client.get_latest_block_number()
+        except Exception as e:
+            logger.debug(f"Probe to {client.provider.name} failed: {str(e)}")
+            client.health.probe_failed()
+            return
+        client.health.probe_succeeded(time.monotonic() - start)
+
+    def hedge(self, primary: W3Client, method: str, *args, **kwargs):
+        """Call `method` on primary, hedging to the next healthy provider.
+
+        Each primary earns and spends its own budget, so hedges stay a fixed
+        fraction of the calls that primary makes.
+        """
+        budget = self.hedge_budgets.get(primary.provider.name)
+        if budget is not None:
+            budget.earn()
+
+        backup = self._hedge_target(primary)
+        return hedged_call(
+            self._hedge_executor, primary, backup, budget, method, *args, **kwargs
+        )
+
+    def _hedge_target(self, primary: W3Client) -> Optional[W3Client]:
+        """The next healthy client after the primary."""
+        for client in self.clients.values():
+            if (
+                client is not primary
+                and client.health.is_healthy
+                and self._has_headroom(client)
+            ):
+                return client
+        return None
+
+    def _has_spare(self, current: W3Client) -> bool:
+        """Whether another healthy client has budget to take over."""
+        return self._hedge_target(current) is not None
+
+    def _has_headroom(self, client: W3Client) -> bool:
+        """False once the client's rate-limit budget is nearly spent.
+
+        A client that ran low stays without headroom until its budget has
+        refilled to RATE_LIMIT_RESUME, so it does not flap around the
+        reserve.
+        """
+        if client.budget is None:
+            return True
+
+        name = client.provider.name
+        fill = client.budget.headroom
+        if name in self._throttled:
+            if fill < config.RATE_LIMIT_RESUME:
+                return False
+            self._throttled.discard(name)
+        elif fill < config.RATE_LIMIT_RESERVE:
+            self._throttled.add(name)
+            return False
+        return True
+
+    def _best_client(self) -> Optional[W3Client]:
+        """Healthy client with the lowest expected latency; ties keep config order.
+
+        Clients with budget headroom are preferred over any that are nearly
+        out of it.
+        """
+        best, best_key = None, None
+        for client in self.clients.values():
+            if not client.health.is_healthy:
+                continue
+            key = (not self._has_headroom(client), client.health.score)
+            if best is None or key < best_key:
+                best, best_key = client, key
+        return best
+
+    def _route(self):
+        """Move to a clearly better provider, with hysteresis against flapping."""
+        self._last_routed = time.monotonic()
+        current = self.clients[self.current_provider]
+        self._refresh_idle(current)
+        self._probe_open()
+        best = self._best_client()
+        if best is None or best is current:
+            return
+
+        if best.health.score < current.health.score * (1 - config.ROUTING_HYSTERESIS):
+            logger.info(
+                f"Routing to {best.provider.name} "
+                f"({best.health.score:.3f}s vs {current.health.score:.3f}s)"
+            )
+            self.current_provider = best.provider.name
+            self.swaps.inc()
+
+    def _refresh_idle(self, current: W3Client) -> None:
+        """Send each idle healthy provider one eth_blockNumber call.
+
+        Idle providers carry no traffic, so without this their scores would
+        stay at whatever connect() measured. Each answer is timed like any
+        other call and lands in the next routing decision.
+        """
         for name, client in self.clients.items():
-            if client.health.is_healthy:
-                self.current_provider = name
-                logger.info(f"Swapped to: {name}")
-                return
+            if (
+                client is current
+                or name in self._refreshing
+                or not client.health.is_healthy
+                or not self._has_headroom(client)
+            ):
+                continue
+            self._refreshing.add(name)
+            self._refresh(client)
 
-        raise RuntimeError("No healthy providers available")
+    def _refresh(self, client: W3Client) -> None:
+        threading.Thread(
+            target=self._send_refresh,
+            args=(client,),
+            name=f"refresh-{client.provider.name}",
+            daemon=True,
+        ).start()
+
+    def _send_refresh(self, client: W3Client) -> None:
+        try:
+            client.get_latest_block_number()
+        except Exception as e:
+            logger.debug(f"Refresh of {client.provider.name} failed: {str(e)}")
+        finally:
+            self._refreshing.discard(client.provider.name)
+
+    def _swap(self):
+        """Swap to the healthy provider with the best expected latency."""
+        self._last_routed = time.monotonic()
+        self._probe_open()
+        best = self._best_client()
+        if best is None:
+            raise RuntimeError("No healthy providers available")
+
+        if best.provider.name == self.current_provider:
+            return
+        self.swaps.inc()
+        self.current_provider = best.provider.name
+        logger.info(f"Swapped to: {self.current_provider}")
@@ -0,0 +1,131 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import config
+from core.w3_client import W3Client
+from models.block import BlockHeader, to_hex
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("logs")
+
+# Fragments of the errors providers return for an oversized eth_getLogs
+_TOO_LARGE = (
+    "query returned more than",
+    "exceed maximum block range",
+    "block range is too wide",
+    "range is too large",
+    "range too large",
+    "response size",
+    "too many results",
+    "max results",
+)
+
+
+def is_range_too_large(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(fragment in message for fragment in _TOO_LARGE)
+
+
+class LogStream:
+    """Event logs for a filter, fetched ahead of the block cursor by range.
+
+    Logs are fetched with eth_getLogs over ranges that halve when the
+    provider rejects them as too large and double while results stay
+    sparse. After a rejection the range stays at or below the rejected
+    size until `regrow` calls in a row succeed. The streamer asks for one
+    block's logs at a time, in cursor order, so logs always come out with
+    their block.
+
+    Ranges only cover blocks at least `confirmations` below the head.
+    Blocks nearer the head get their logs by block hash. A range result
+    from a replaced branch may have no log for a block at all, so a
+    blockHash mismatch cannot catch it. Confirmed logs whose blockHash
+    does not match the emitted header are still refetched by hash.
+    """
+
+    def __init__(
+        self,
+        addresses: Optional[List[str]] = None,
+        topics: Optional[List] = None,
+        range_size: int = config.LOG_RANGE_INITIAL,
+        min_range: int = config.LOG_RANGE_MIN,
+        max_range: int = config.LOG_RANGE_MAX,
+        target_results: int = config.LOG_RANGE_TARGET,
+        regrow: int = config.LOG_RANGE_REGROW,
+        confirmations: int = config.LOG_CONFIRMATIONS,
+    ):
+        self.addresses = addresses or []
+        self.topics = topics or []
+        self.range_size = range_size
+        self.min_range = min_range
+        self.max_range = max_range
+        self.target_results = target_results
+        self.regrow = regrow
+        self.confirmations = confirmations
+
+        # Largest range the provider has not rejected lately
+        self.range_cap = max_range
+        self._successes = 0
+
+        # Logs fetched ahead of the cursor, by block number
+        self.fetched_to: Optional[int] = None
+        self._pending: Dict[int, List[dict]] = defaultdict(list)
+
+    def logs_for(self, client: W3Client, block: BlockHeader, head: int) -> List[dict]:
+        """Logs of `block`, fetching the next range if it is not buffered yet."""
+        confirmed = head - self.confirmations
+        if block.number > confirmed:
+            self._pending.pop(block.number, None)
+            self.invalidate_from(block.number + 1)
+            return client.get_logs(self.addresses, self.topics, block_hash=block.hash)
+
+        if self.fetched_to is None or self.fetched_to < block.number - 1:
+            # First call, or the cursor jumped: restart just below the block
+            self.invalidate_from(block.number)
+
+        while self.fetched_to < block.number:
+            self._fetch_range(client, confirmed)
+
+        logs = self._pending.pop(block.number, [])
+        if any(to_hex(log["blockHash"]) != block.hash for log in logs):
+            logger.info(f"Logs for #{block.number} are from a stale branch, refetching")
+            logs = client.get_logs(self.addresses, self.topics, block_hash=block.hash)
+        return logs
+
+    def invalidate_from(self, number: int) -> None:
+        """Drop buffered logs at and above `number`; they are refetched."""
+        for stale in [n for n in self._pending if n >= number]:
+            del self._pending[stale]
+        self.fetched_to = number - 1
+
+    def _fetch_range(self, client: W3Client, confirmed: int) -> None:
+        start = self.fetched_to + 1
+        end = min(start + self.range_size - 1, confirmed)
+        try:
+            logs = client.get_logs(
+                self.addresses, self.topics, from_block=start, to_block=end
+            )
+        except Exception as e:
+            if not is_range_too_large(e) or self.range_size <= self.min_range:
+                raise
+            # Halve, and stop growing past the halved size for a while
+            self.range_size = max(self.min_range, self.range_size // 2)
+            self.range_cap = self.range_size
+            self._successes = 0
+            logger.info(f"eth_getLogs range too large, shrinking to {self.range_size}")
+            return
+
+        for log in logs:
+            self._pending[log["blockNumber"]].append(log)
+        self.fetched_to = end
+
+        if self.range_cap < self.max_range:
+            self._successes += 1
+            if self._successes >= self.regrow:
+                self.range_cap = min(self.max_range, self.range_cap * 2)
+                self._successes = 0
+
+        full_range = end - start + 1 == self.range_size
+        if full_range and len(logs) < self.target_results // 2:
+            self.range_size = min(self.range_cap, self.range_size * 2)
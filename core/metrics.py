@@ -0,0 +1,257 @@
+import bisect
+import logging
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("metrics")
+
+# Upper bounds (seconds) of the RPC latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _Sharded:
+    """Per-thread value slots summed at scrape time.
+
+    Each thread writes only its own list, so hot-path updates take no lock;
+    the lock is taken once per thread to register its shard. Shards of
+    exited threads are folded into base values whenever a thread registers
+    or a scrape runs, so short-lived threads do not accumulate shards.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0] * size
+        self._shards: List[Tuple[threading.Thread, list]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0] * self._size
+            with self._lock:
+                self._fold_exited()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _fold_exited(self) -> None:
+        """Merge the shards of exited threads into the base; hold the lock."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                # An exited thread can no longer write to its shard
+                self._base = [a + b for a, b in zip(self._base, shard, strict=True)]
+        self._shards = live
+
+    def _collect(self) -> list:
+        with self._lock:
+            self._fold_exited()
+            shards = [self._base] + [shard for _, shard in self._shards]
+        return [sum(values) for values in zip(*shards, strict=True)]
+
+
+class Counter(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._collect()[0]
+
+
+class Histogram(_Sharded):
+    """Bucketed histogram; the last two slots hold the overflow count and the sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(len(buckets) + 2)
+        self.buckets = buckets
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Cumulative bucket counts, total count and sum."""
+        values = self._collect()
+        cumulative, running = [], 0
+        for count in values[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative[:-1], running, values[-1]
+
+
+class Gauge:
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self.fn() if self.fn is not None else self._value
+
+
+def rate_of(counter: Counter) -> Callable[[], float]:
+    """Gauge callback: the counter's per-second rate since the previous scrape."""
+    last = [time.monotonic(), counter.value]
+
+    def rate() -> float:
+        now, value = time.monotonic(), counter.value
+        elapsed = now - last[0]
+        result = (value - last[1]) / elapsed if elapsed > 0 else 0.0
+        last[:] = [now, value]
+        return result
+
+    return rate
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{str(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Named metric families with labels, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help_text: str, labels: dict, factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            metric = family[2].get(key)
+            if metric is not None:
+                return metric
+
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            return family[2].setdefault(key, factory())
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def histogram(self, name: str, help_text: str = "", **labels) -> Histogram:
+        return self._get("histogram", name, help_text, labels, Histogram)
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str = "",
+        fn: Optional[Callable[[], float]] = None,
+        **labels,
+    ) -> Gauge:
+        gauge = self._get("gauge", name, help_text, labels, Gauge)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            families = {
+                name: (kind, help_text, dict(series))
+                for name, (kind, help_text, series) in self._families.items()
+            }
+
+        for name, (kind, help_text, series) in sorted(families.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in series.items():
+                if kind == "histogram":
+                    cumulative, count, total = metric.snapshot()
+                    for bound, value in zip(metric.buckets, cumulative, strict=True):
+                        le = _format_labels(labels, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{le} {value}")
+                    inf = _format_labels(labels, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{inf} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every client, manager and streamer
+REGISTRY = MetricsRegistry()
+
+
+@lru_cache(maxsize=None)
+def rpc_series(
+    chain: str, provider: str, method: str
+) -> Tuple[Counter, Counter, Histogram]:
+    """Success counter, error counter and latency histogram for one series."""
+
+    def requests(status: str) -> Counter:
+        return REGISTRY.counter(
+            "rpc_requests_total",
+            "RPC calls by chain, provider, method and outcome",
+            chain=chain,
+            provider=provider,
+            method=method,
+            status=status,
+        )
+
+    latency = REGISTRY.histogram(
+        "rpc_request_duration_seconds",
+        "RPC latency by chain, provider and method",
+        chain=chain,
+        provider=provider,
+        method=method,
+    )
+    return requests("ok"), requests("error"), latency
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.registry.render().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/health":
+            body, content_type = b"ok\n", "text/plain"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(
+    host: str = config.METRICS_HOST,
+    port: int = config.METRICS_PORT,
+    registry: MetricsRegistry = REGISTRY,
+) -> ThreadingHTTPServer:
+    """Serve /metrics and /health from a daemon thread."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,173 @@
+import logging
+import queue
+import threading
+import time
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, List, Optional
+
+import config
+from core.sinks import Sink
+from models.block import BlockHeader
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("pipeline")
+
+_STOP = object()
+
+# Sink method taking each kind of per-block record
+_WRITERS = {"log": "write_logs", "transaction": "write_transactions"}
+
+
+class PipelineFailed(RuntimeError):
+    """A sink kept failing past SINK_MAX_ATTEMPTS; queued blocks were dropped.
+
+    Nothing past the last flushed block was committed to the checkpoint,
+    so a restart replays the dropped blocks.
+    """
+
+
+class SinkPipeline:
+    """Bounded queue between fetching and sinks, drained by one worker thread.
+
+    Blocks, their logs and transactions are grouped into micro-batches of
+    SINK_BATCH_SIZE items or SINK_BATCH_INTERVAL_MS milliseconds. When sinks
+    fall behind the queue fills up and `submit` blocks, which slows fetching
+    instead of growing memory. Failed sink writes are retried up to
+    SINK_MAX_ATTEMPTS times; after that the pipeline fails and submit()
+    raises PipelineFailed.
+    """
+
+    def __init__(
+        self,
+        sinks: List[Sink],
+        on_flushed: Optional[Callable[[int, int], None]] = None,
+        max_queue: int = config.SINK_QUEUE_SIZE,
+        batch_size: int = config.SINK_BATCH_SIZE,
+        batch_interval_ms: int = config.SINK_BATCH_INTERVAL_MS,
+    ):
+        self.sinks = sinks
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+        self.error: Optional[Exception] = None
+
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="sink-pipeline", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def submit(self, block: BlockHeader) -> None:
+        """Queue a block for the sinks. Blocks while the queue is full."""
+        self._put(("block", block))
+
+    def submit_transaction(self, block: BlockHeader, transaction: dict) -> None:
+        """Queue one of `block`'s transactions; submit them before the block."""
+        self._put(("transaction", block, transaction))
+
+    def submit_log(self, block: BlockHeader, log: dict) -> None:
+        """Queue one of `block`'s event logs; submit them before its transactions."""
+        self._put(("log", block, log))
+
+    def after_flush(self, callback: Callable[[], None]) -> None:
+        """Run `callback` on the worker once everything queued so far is in
+        the sinks. It never runs if the pipeline fails first."""
+        self._put(("callback", callback))
+
+    def revert(self, number: int, block_hash: Optional[str]) -> None:
+        """Queue a revert; it reaches the sinks after every earlier block."""
+        self._put(("revert", number, block_hash))
+
+    def _put(self, item: tuple) -> None:
+        if self.error is not None:
+            raise PipelineFailed(f"Sink pipeline failed: {self.error}") from self.error
+        self.queue.put(item)
+
+    def close(self) -> None:
+        """Flush everything queued and close the sinks."""
+        self.queue.put(_STOP)
+        self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+    def _run(self) -> None:
+        try:
+            self._drain()
+        except Exception as e:
+            logger.critical(f"Sink pipeline stopped: {str(e)}")
+            self.error = e
+            # Keep taking items so a producer blocked in submit() sees the error
+            while self.queue.get() is not _STOP:
+                pass
+
+    def _drain(self) -> None:
+        batch: List[tuple] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                batch = self._flush(batch)
+                continue
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+
+            if item[0] != "revert":
+                if not batch:
+                    deadline = time.monotonic() + self.batch_interval
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    batch = self._flush(batch)
+            else:
+                batch = self._flush(batch)
+                _, number, block_hash = item
+                self._deliver("revert", number, block_hash)
+
+    def _flush(self, batch: List[tuple]) -> List[tuple]:
+        if not batch:
+            return []
+
+        # A block's logs and transactions reach the sinks ahead of the block
+        records = [item for item in batch if item[0] in _WRITERS]
+        for (kind, block), items in groupby(records, key=itemgetter(0, 1)):
+            self._deliver(_WRITERS[kind], block, [item[2] for item in items])
+        blocks = [item[1] for item in batch if item[0] == "block"]
+        if blocks:
+            self._deliver("write", blocks)
+            if self.on_flushed is not None:
+                self._notify(self.on_flushed, blocks[-1].number, len(blocks))
+        for item in batch:
+            if item[0] == "callback":
+                self._notify(item[1])
+        return []
+
+    def _notify(self, callback: Callable, *args) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            # The batch is in the sinks; a later flush commits past it
+            logger.error(f"Flush callback failed: {str(e)}")
+
+    def _deliver(self, method: str, *args) -> None:
+        """Call `method` on every sink, retrying each up to SINK_MAX_ATTEMPTS."""
+        for sink in self.sinks:
+            for attempt in range(1, config.SINK_MAX_ATTEMPTS + 1):
+                try:
+                    getattr(sink, method)(*args)
+                    break
+                except Exception as e:
+                    if attempt == config.SINK_MAX_ATTEMPTS:
+                        raise
+                    logger.error(
+                        f"{type(sink).__name__} failed, retrying in "
+                        f"{config.SINK_RETRY_DELAY}s: {str(e)}"
+                    )
+                    time.sleep(config.SINK_RETRY_DELAY)
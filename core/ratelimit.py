@@ -0,0 +1,73 @@
+import threading
+import time
+
+from models.provider import RateLimitConfig
+
+# JSON-RPC method behind each timed client call, for per-method costs
+RPC_METHODS = {
+    "connect": "web3_clientVersion",
+    "get_latest_block_number": "eth_blockNumber",
+    "get_block": "eth_getBlockByNumber",
+    "get_blocks": "eth_getBlockByNumber",
+    "get_raw_blocks": "eth_getBlockByNumber",
+    "get_full_block": "eth_getBlockByNumber",
+    "get_logs": "eth_getLogs",
+}
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    reserve() always succeeds, possibly driving the balance negative, and
+    returns how long the caller must wait before sending. Callers are
+    therefore served in arrival order and the provider sees at most
+    `rate` units per second after an initial `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float) -> float:
+        """Take `cost` tokens; return the seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= cost
+            return max(0.0, -self._tokens / self.rate)
+
+    @property
+    def fill(self) -> float:
+        """Available tokens as a fraction of the burst (0 when in debt)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens) / self.burst
+
+
+class ComputeBudget:
+    """A provider's request or compute-unit budget, priced per method."""
+
+    def __init__(self, limits: RateLimitConfig):
+        self.limits = limits
+        self.bucket = TokenBucket(
+            limits.units_per_second, limits.burst or limits.units_per_second
+        )
+
+    def cost(self, method: str, count: int = 1) -> float:
+        rpc_method = RPC_METHODS.get(method, method)
+        return (
+            self.limits.method_costs.get(rpc_method, self.limits.default_cost) * count
+        )
+
+    def reserve(self, method: str, count: int = 1) -> float:
+        return self.bucket.reserve(self.cost(method, count))
+
+    @property
+    def headroom(self) -> float:
+        return self.bucket.fill
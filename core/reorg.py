@@ -0,0 +1,63 @@
+from collections import namedtuple
+from typing import List, Optional
+
+import config
+from models.block import BlockHeader
+
+HistoryEntry = namedtuple("HistoryEntry", ["number", "hash", "parent_hash"])
+
+
+class ReorgTooDeep(RuntimeError):
+    """A reorg reaches below the recorded history, so its fork point is unknown.
+
+    Blocks of the stale branch below the window have already gone downstream
+    and cannot be reverted; retrying would fail the same way, so streamers
+    stop on it instead.
+    """
+
+
+class BlockHistory:
+    """Fixed-size ring buffer of (number, hash, parentHash) for the last K blocks.
+
+    Slots are addressed by `number % size`, so pushing and the parent check
+    are O(1) and allocate nothing beyond the entry itself.
+    """
+
+    def __init__(self, size: int = config.REORG_HISTORY_SIZE):
+        self.size = size
+        self.head: Optional[int] = None
+        self._slots: List[Optional[HistoryEntry]] = [None] * size
+
+    def get(self, number: int) -> Optional[HistoryEntry]:
+        entry = self._slots[number % self.size]
+        if entry is None or entry.number != number:
+            return None
+        return entry
+
+    def push(self, block: BlockHeader) -> None:
+        self._slots[block.number % self.size] = HistoryEntry(
+            block.number, block.hash, block.parent_hash
+        )
+        self.head = block.number
+
+    def links(self, block: BlockHeader) -> bool:
+        """False only when the recorded parent's hash contradicts block.parentHash."""
+        parent = self.get(block.number - 1)
+        if parent is None or parent.hash is None or block.parent_hash is None:
+            return True
+        return parent.hash == block.parent_hash
+
+    def truncate_above(self, number: int) -> List[HistoryEntry]:
+        """Remove and return entries above `number`, newest first."""
+        removed = []
+        if self.head is None:
+            return removed
+
+        for n in range(self.head, number, -1):
+            entry = self.get(n)
+            if entry is not None:
+                removed.append(entry)
+                self._slots[n % self.size] = None
+
+        self.head = number
+        return removed
@@ -0,0 +1,57 @@
+import random
+import time
+from typing import Optional
+
+import config
+
+
+class PollScheduler:
+    """Decides how long the streamer sleeps between head polls.
+
+    The chain's block cadence is learned as an EWMA over the timestamps of
+    consecutive blocks. Between blocks the scheduler sleeps until the next
+    block is due, then polls every POLL_MIN_INTERVAL until it shows up.
+    Errors back off exponentially with jitter instead of a fixed sleep,
+    until the caller reports a successful iteration with success().
+    """
+
+    def __init__(self):
+        self.block_time: Optional[float] = None
+        self.errors = 0
+
+        self._last_number: Optional[int] = None
+        self._last_timestamp: Optional[int] = None
+
+    def observe(self, number: int, timestamp: int) -> None:
+        """Learn from a newly processed block."""
+        if self._last_number is not None and number == self._last_number + 1:
+            delta = timestamp - self._last_timestamp
+            if delta > 0:
+                if self.block_time is None:
+                    self.block_time = float(delta)
+                else:
+                    self.block_time += config.EWMA_ALPHA * (delta - self.block_time)
+
+        self._last_number = number
+        self._last_timestamp = timestamp
+
+    def poll_delay(self, now: Optional[float] = None) -> float:
+        """Seconds to sleep before the next head poll."""
+        if self.block_time is None:
+            return config.POLL_INTERVAL
+
+        now = time.time() if now is None else now
+        until_due = self._last_timestamp + self.block_time - now
+        return min(config.POLL_MAX_INTERVAL, max(config.POLL_MIN_INTERVAL, until_due))
+
+    def success(self) -> None:
+        """An iteration completed; the next error starts the backoff over."""
+        self.errors = 0
+
+    def error_delay(self) -> float:
+        """Seconds to sleep after a failed iteration, doubling per error."""
+        delay = min(
+            config.ERROR_BACKOFF_MAX, config.ERROR_BACKOFF_BASE * 2**self.errors
+        )
+        self.errors += 1
+        return delay * random.uniform(0.5, 1.0)
@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Mapping
+from typing import List, Optional, Tuple
+
+import config
+from models.block import BlockHeader
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("sinks")
+
+
+def _json_value(value):
+    """Logs come straight from web3, as AttributeDicts holding HexBytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes.hex(value)
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _transaction_json(block: BlockHeader, transaction: dict) -> str:
+    return json.dumps({"block": block.number, "transaction": transaction})
+
+
+def _log_json(block: BlockHeader, log: dict) -> str:
+    return json.dumps({"block": block.number, "log": log}, default=_json_value)
+
+
+class Sink(ABC):
+    """Destination for micro-batches of processed blocks."""
+
+    @abstractmethod
+    def write(self, blocks: List[BlockHeader]) -> None:
+        """Persist a batch of blocks, in order."""
+
+    @abstractmethod
+    def revert(self, number: int, block_hash: Optional[str]) -> None:
+        """A previously written block was orphaned by a reorg."""
+
+    def write_transactions(  # noqa: B027 - optional hook, header-only sinks skip it
+        self, block: BlockHeader, transactions: List[dict]
+    ) -> None:
+        """Persist some of a block's transactions, ahead of the block's batch.
+
+        A large block's transactions may arrive over several calls.
+        """
+
+    def write_logs(  # noqa: B027 - optional hook, header-only sinks skip it
+        self, block: BlockHeader, logs: List[dict]
+    ) -> None:
+        """Persist some of a block's event logs, ahead of its transactions."""
+
+    def close(self) -> None:  # noqa: B027 - optional hook, nothing to release
+        """Release the sink's resources."""
+
+
+class JsonLinesSink(Sink):
+    """Appends one JSON object per block, transaction, log or revert to a file."""
+
+    def __init__(self, path: str = config.JSONL_SINK_PATH):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, blocks: List[BlockHeader]) -> None:
+        self.file.write("".join(json.dumps(b.to_dict()) + "\n" for b in blocks))
+        self.file.flush()
+
+    def write_transactions(self, block: BlockHeader, transactions: List[dict]) -> None:
+        self.file.write(
+            "".join(_transaction_json(block, tx) + "\n" for tx in transactions)
+        )
+        self.file.flush()
+
+    def write_logs(self, block: BlockHeader, logs: List[dict]) -> None:
+        self.file.write("".join(_log_json(block, log) + "\n" for log in logs))
+        self.file.flush()
+
+    def revert(self, number: int, block_hash: Optional[str]) -> None:
+        self.file.write(json.dumps({"revert": number, "hash": block_hash}) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class LocalTopic:
+    """In-process stand-in for a Kafka topic: an offset-addressed, retained log."""
+
+    def __init__(self, retention: int = config.TOPIC_RETENTION):
+        self.retention = retention
+        self.start_offset = 0
+        self._records: deque = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def end_offset(self) -> int:
+        return self.start_offset + len(self._records)
+
+    def produce(self, records: List[bytes]) -> int:
+        """Append records and return the offset of the first one."""
+        with self._lock:
+            first = self.end_offset
+            self._records.extend(records)
+            while len(self._records) > self.retention:
+                self._records.popleft()
+                self.start_offset += 1
+            return first
+
+    def consume(self, offset: int, max_records: int = 500) -> Tuple[List[bytes], int]:
+        """Read from `offset`; returns the records and the next offset."""
+        with self._lock:
+            offset = max(offset, self.start_offset)
+            start = offset - self.start_offset
+            records = [
+                self._records[i]
+                for i in range(start, min(start + max_records, len(self._records)))
+            ]
+            return records, offset + len(records)
+
+
+class TopicSink(Sink):
+    """Publishes JSON-encoded blocks and reverts to a LocalTopic."""
+
+    def __init__(self, topic: Optional[LocalTopic] = None):
+        self.topic = topic or LocalTopic()
+
+    def write(self, blocks: List[BlockHeader]) -> None:
+        self.topic.produce([json.dumps(b.to_dict()).encode() for b in blocks])
+
+    def write_transactions(self, block: BlockHeader, transactions: List[dict]) -> None:
+        self.topic.produce(
+            [_transaction_json(block, tx).encode() for tx in transactions]
+        )
+
+    def write_logs(self, block: BlockHeader, logs: List[dict]) -> None:
+        self.topic.produce([_log_json(block, log).encode() for log in logs])
+
+    def revert(self, number: int, block_hash: Optional[str]) -> None:
+        self.topic.produce(
+            [json.dumps({"revert": number, "hash": block_hash}).encode()]
+        )
+
+
+def create_sinks(
+    names: List[str] = config.SINKS,
+    jsonl_path: str = config.JSONL_SINK_PATH,
+    archive_path: str = config.ARCHIVE_PATH,
+) -> List[Sink]:
+    """Build the configured sinks, writing to the given paths."""
+    sinks = []
+    for name in names:
+        if name == "jsonl":
+            sinks.append(JsonLinesSink(jsonl_path))
+        elif name == "topic":
+            sinks.append(TopicSink())
+        elif name == "archive":
+            from core.archive import ArchiveSink
+
+            sinks.append(ArchiveSink(archive_path))
+        else:
+            raise ValueError(f"Unknown sink: {name}")
+    return sinks
@@ -1,42 +1,513 @@
 import logging
+import threading
 import time
+from collections import deque
+from functools import partial
+from typing import Callable, Iterable, Iterator, Optional, Tuple
 
 import config
+from core.backfill import BackfillProgress, ParallelBackfiller
+from core.checkpoint import CheckpointStore
+from core.coordination import Coordinator, Lease
+from core.decode import DecodePool
 from core.hotswap import HotswapManager
+from core.logs import LogStream
+from core.metrics import REGISTRY, rate_of
+from core.pipeline import PipelineFailed, SinkPipeline
+from core.reorg import BlockHistory, ReorgTooDeep
+from core.scheduler import PollScheduler
 from core.w3_client import W3Client
+from models.block import BlockHeader
 
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
 logger = logging.getLogger("streamer")
 
 
 class BlockStreamer:
-    def __init__(self, hotswap_manager: HotswapManager):
+    def __init__(
+        self,
+        hotswap_manager: HotswapManager,
+        checkpoint: Optional[CheckpointStore] = None,
+        pipeline: Optional[SinkPipeline] = None,
+        full_transactions: bool = config.FULL_TRANSACTIONS,
+        logs: Optional[LogStream] = None,
+        decoder: Optional[DecodePool] = None,
+        chain: str = "default",
+        coordinator: Optional[Coordinator] = None,
+    ):
         self.manager = hotswap_manager
+        self.chain = chain
+        self.coordinator = coordinator
+        self.checkpoint = checkpoint
+        self.pipeline = pipeline
+        self.full_transactions = full_transactions
+        self.logs = logs
+        self.decoder = decoder
+        self.history = BlockHistory()
+        self.scheduler = PollScheduler()
         self.last_block = None
+        self.head: Optional[int] = None
+        self._stopped = threading.Event()
+
+        self.blocks = REGISTRY.counter(
+            "streamer_blocks_total", "Blocks emitted", chain=chain
+        )
+        self.reorgs = REGISTRY.counter(
+            "streamer_reorgs_total", "Reorgs handled", chain=chain
+        )
+        self.head_lag = REGISTRY.gauge(
+            "streamer_head_lag_blocks",
+            "Blocks between the chain head and the cursor",
+            chain=chain,
+        )
+        REGISTRY.gauge(
+            "streamer_blocks_per_second",
+            "Emit rate since the previous scrape",
+            fn=rate_of(self.blocks),
+            chain=chain,
+        )
 
     def stream(self):
         """Stream blocks from the blockchain."""
         logger.info("Streaming...")
-        while True:
+        while not self._stopped.is_set():
             try:
                 client: W3Client = self.manager.get_client()
 
-                current_block = client.get_latest_block_number()
-                if self.last_block is None:
-                    self.last_block = current_block - 1
-                    logger.info(
-                        f"{client.provider.name} Initialized at Block #{self.last_block}"
+                if self.coordinator is not None and not self.coordinator.is_leader:
+                    self._follow(client)
+                else:
+                    self._poll_head(client)
+                self.scheduler.success()
+            except (ReorgTooDeep, PipelineFailed) as e:
+                logger.critical(f"Stopping: {str(e)}")
+                self.stop()
+                raise
+            except Exception as e:
+                delay = self.scheduler.error_delay()
+                logger.warning(f"Streaming error, retrying in {delay:.1f}s: {str(e)}")
+                self._stopped.wait(delay)
+
+    def _poll_head(self, client: W3Client):
+        """One round at the live head: catch up to it, then wait for the next."""
+        current_block = self._next_head(client)
+        if current_block is None:
+            return
+
+        if self.last_block is None:
+            self.last_block = self._resume_point(current_block)
+            logger.info(
+                f"{client.provider.name} Initialized at Block #{self.last_block}"
+            )
+
+        self.head_lag.set(current_block - self.last_block)
+        if current_block > self.last_block:
+            self._catch_up(client, current_block)
+
+        # With a pipeline the checkpoint is committed by its worker
+        if self.checkpoint is not None and self.pipeline is None:
+            self.checkpoint.flush_if_due()
+
+        if self.coordinator is not None:
+            self._publish_cursor(self.last_block)
+            # Leased ranges only fill the wait for the next block
+            deadline = time.monotonic() + self.scheduler.poll_delay()
+            if self.work_lease(client, deadline):
+                return
+
+        if not self._is_subscribed(client):
+            self._stopped.wait(self.scheduler.poll_delay())
+
+    def _publish_cursor(self, number: int):
+        def publish():
+            self.coordinator.cursor = number
+
+        self._when_flushed(publish)
+
+    def _when_flushed(self, callback: Callable[[], None]):
+        """Run `callback` once every block emitted so far is in the sinks."""
+        if self.pipeline is not None:
+            self.pipeline.after_flush(callback)
+        else:
+            callback()
+
+    def stop(self):
+        """Make stream() return after the current iteration."""
+        self._stopped.set()
+
+    def _catch_up(self, client: W3Client, current_block: int):
+        """Process every block up to current_block."""
+        self.head = current_block
+        behind = current_block - self.last_block
+        if self.full_transactions:
+            # One streamed response per block bounds memory by a block; no batching
+            for number in range(self.last_block + 1, current_block + 1):
+                self._emit_full(client, number)
+            return
+
+        if behind > config.BACKFILL_THRESHOLD and self.coordinator is not None:
+            # Lease out all but the reorg window to the group and stream on
+            handoff = current_block - self.history.size
+            added = self.coordinator.store.add_range(self.last_block + 1, handoff)
+            logger.info(
+                f"Behind by {behind} blocks, leased #{self.last_block + 1}-#{handoff} "
+                f"as {added} ranges"
+            )
+            self.last_block = handoff
+            behind = current_block - handoff
+        elif behind > config.BACKFILL_THRESHOLD:
+            logger.info(f"Behind by {behind} blocks, backfilling")
+            self.backfill(self.last_block + 1, current_block)
+            return
+
+        logger.info(f"Found {behind} new blocks")
+        if self.decoder is not None:
+            self._catch_up_decoded(client, current_block)
+            return
+
+        for start in range(self.last_block + 1, current_block + 1, config.BATCH_SIZE):
+            end = min(start + config.BATCH_SIZE, current_block + 1)
+            for block_data in client.get_blocks(list(range(start, end))):
+                self._emit(client, client.validate_block(block_data))
+
+    def _catch_up_decoded(self, client: W3Client, current_block: int):
+        """Fetch raw batches while the decode pool validates earlier ones.
+
+        Up to one batch per worker is in flight; batches are emitted in
+        submission order, and one that does not hold exactly the requested
+        blocks fails the iteration.
+        """
+        pending = deque()
+        try:
+            for start in range(
+                self.last_block + 1, current_block + 1, config.BATCH_SIZE
+            ):
+                end = min(start + config.BATCH_SIZE, current_block + 1)
+                numbers = list(range(start, end))
+                pending.append(
+                    self.decoder.submit(client.get_raw_blocks(numbers), numbers)
+                )
+                while len(pending) > self.decoder.workers:
+                    for block in pending.popleft().result():
+                        self._emit(client, block)
+
+            while pending:
+                for block in pending.popleft().result():
+                    self._emit(client, block)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def backfill(self, start_block: int, end_block: int):
+        """Ingest a historical range using every healthy provider."""
+        client: W3Client = self.manager.get_client()
+        for block in ParallelBackfiller(self.manager).backfill(start_block, end_block):
+            self._emit(client, block)
+
+    def _follow(self, client: W3Client):
+        """Work leased ranges while another worker streams the live head."""
+        if self.last_block is not None:
+            logger.info("Lost the live-head leadership, following")
+            self.last_block = None
+            self.history = BlockHistory()
+        if not self.work_lease(client):
+            self._stopped.wait(config.POLL_INTERVAL)
+
+    def work_lease(self, client: W3Client, deadline: Optional[float] = None) -> bool:
+        """Claim one leased range and ingest it; False when none is available.
+
+        Leased ranges lie below the leader's reorg window, so blocks skip the
+        parent-hash check but otherwise go downstream as _emit sends them,
+        logs and transactions included. The range is abandoned as soon as
+        the lease is lost; whoever reclaimed it ingests it again. Past
+        `deadline` the rest of the range is handed back, so the leader
+        returns to the head in time for its next block. With a pipeline the
+        lease is completed or handed back only once its blocks are in the
+        sinks; until then the heartbeat keeps renewing it.
+        """
+        lease: Optional[Lease] = self.coordinator.claim()
+        if lease is None:
+            return False
+
+        logger.info(f"Working lease #{lease.start}-#{lease.end}")
+        logs = None
+        if self.logs is not None:
+            # Below the reorg window every block is confirmed
+            logs = LogStream(self.logs.addresses, self.logs.topics, confirmations=0)
+        try:
+            for block, transactions in self._lease_blocks(client, lease):
+                if not self.coordinator.holds(lease):
+                    logger.warning(f"Abandoning #{lease.start}-#{lease.end}")
+                    return True
+                if logs is not None:
+                    for log in logs.logs_for(client, block, lease.end):
+                        self._process_log(client, block, log)
+                if transactions is not None:
+                    self._emit_transactions(client, block, transactions)
+                self._process(client, block)
+                self.blocks.inc()
+
+                if (
+                    deadline is not None
+                    and time.monotonic() >= deadline
+                    and block.number < lease.end
+                ):
+                    logger.info(f"Handing back #{block.number + 1}-#{lease.end}")
+                    self._when_flushed(
+                        partial(self.coordinator.release, lease, block.number + 1)
                     )
+                    return True
+        except Exception:
+            self.coordinator.release(lease)
+            raise
+
+        self._when_flushed(partial(self.coordinator.complete, lease))
+        return True
+
+    def _lease_blocks(
+        self, client: W3Client, lease: Lease
+    ) -> Iterator[Tuple[BlockHeader, Optional[Iterable[dict]]]]:
+        if self.full_transactions:
+            for number in range(lease.start, lease.end + 1):
+                full = client.get_full_block(number)
+                try:
+                    yield full.header, full.transactions()
+                finally:
+                    full.close()
+            return
+        for block in ParallelBackfiller(self.manager).backfill(lease.start, lease.end):
+            yield block, None
+
+    def bulk_backfill(self, start_block: int, end_block: Optional[int] = None):
+        """Ingest from start_block at full throughput, then return.
+
+        Uses large chunks across every provider with per-block logging off
+        and logs progress instead. Without end_block the target follows the
+        head and the call returns within BULK_HANDOFF_DISTANCE of it, with
+        last_block set so stream() carries on from the very next block.
+        """
+        self.last_block = start_block - 1
+        progress = BackfillProgress(start_block)
+        logger.info(f"Bulk backfill from #{start_block} to #{end_block or 'head'}")
+        try:
+            while not self._stopped.is_set():
+                try:
+                    client: W3Client = self.manager.get_client()
+                    head = client.get_latest_block_number()
+                    if end_block is not None and self.last_block >= end_block:
+                        break
+                    if (
+                        end_block is None
+                        and head - self.last_block <= config.BULK_HANDOFF_DISTANCE
+                    ):
+                        break
+
+                    target = head if end_block is None else min(end_block, head)
+                    if target <= self.last_block:
+                        # end_block is beyond the head; wait for the chain
+                        self.scheduler.success()
+                        self._stopped.wait(self.scheduler.poll_delay())
+                        continue
+                    self._bulk_round(client, target, progress, end_block or head)
+                    self.scheduler.success()
+                except (ReorgTooDeep, PipelineFailed) as e:
+                    logger.critical(f"Stopping: {str(e)}")
+                    self.stop()
+                    raise
+                except Exception as e:
+                    delay = self.scheduler.error_delay()
+                    logger.warning(
+                        f"Backfill error at #{self.last_block}, "
+                        f"retrying in {delay:.1f}s: {str(e)}"
+                    )
+                    self._stopped.wait(delay)
+        finally:
+            self._log_blocks(True)
+        logger.info(f"Bulk backfill finished: {progress.summary()}")
+
+    def _bulk_round(
+        self, client: W3Client, target: int, progress: BackfillProgress, end: int
+    ):
+        """Ingest last_block+1..target, stopping early when asked to."""
+        self.head = max(self.head or target, target)
+        self._log_blocks(False)
+        if self.full_transactions:
+            # Full blocks stream one at a time; batching would defeat that
+            for number in range(self.last_block + 1, target + 1):
+                self._emit_full(client, number)
+                progress.update(number, end)
+                if self._stopped.is_set():
+                    break
+        else:
+            backfiller = ParallelBackfiller(
+                self.manager, config.BULK_CHUNK_SIZE, config.BULK_WINDOW
+            )
+            for block in backfiller.backfill(self.last_block + 1, target):
+                self._emit(client, block)
+                progress.update(block.number, end)
+                if self._stopped.is_set():
+                    break
+        self.head_lag.set(self.head - self.last_block)
+
+    def _log_blocks(self, enabled: bool):
+        for client in self.manager.clients.values():
+            client.log_blocks = enabled
+
+    def _emit_full(self, client: W3Client, number: int):
+        """Emit a block, streaming its transactions downstream as they decode."""
+        full = client.get_full_block(number)
+        try:
+            self._emit(client, full.header, full.transactions())
+        finally:
+            full.close()
+
+    def _emit(
+        self,
+        client: W3Client,
+        block: BlockHeader,
+        transactions: Optional[Iterable[dict]] = None,
+    ):
+        """Hand a block downstream and advance the cursor."""
+        if not self.history.links(block):
+            self._rewind(client, block)
+
+        self._emit_logs(client, block)
+        if transactions is not None:
+            self._emit_transactions(client, block, transactions)
+        self._process(client, block)
+        self.history.push(block)
+        self.last_block = block.number
+        self.blocks.inc()
+        self.scheduler.observe(block.number, block.timestamp)
+        client.health.last_block_time = block.timestamp
+        if self.checkpoint is not None and self.pipeline is None:
+            self.checkpoint.commit(block.number)
+
+    def _emit_logs(self, client: W3Client, block: BlockHeader):
+        """Hand over the block's event logs, ahead of the block itself."""
+        if self.logs is None:
+            return
+        head = max(self.head or block.number, block.number)
+        for log in self.logs.logs_for(client, block, head):
+            self._process_log(client, block, log)
+
+    def _process_log(self, client: W3Client, block: BlockHeader, log: dict):
+        if self.pipeline is not None:
+            self.pipeline.submit_log(block, log)
+        else:
+            client.process_log(block, log)
+
+    def _emit_transactions(
+        self, client: W3Client, block: BlockHeader, transactions: Iterable[dict]
+    ):
+        """Hand over the block's transactions one by one, ahead of the block.
+
+        If the response breaks off midway, the block is reverted downstream
+        before the error propagates, so its retry cannot deliver the
+        transactions already handed over a second time.
+        """
+        try:
+            for transaction in transactions:
+                if self.pipeline is not None:
+                    self.pipeline.submit_transaction(block, transaction)
+                else:
+                    client.process_transaction(block, transaction)
+        except PipelineFailed:
+            raise
+        except Exception:
+            self._revert(client, block.number, block.hash)
+            raise
+
+    def _process(self, client: W3Client, block: BlockHeader):
+        """Hand a block to the pipeline or the client."""
+        if self.pipeline is not None:
+            self.pipeline.submit(block)
+        else:
+            client.process_block(block)
+
+    def _revert(self, client: W3Client, number: int, block_hash: Optional[str]):
+        if self.pipeline is not None:
+            self.pipeline.revert(number, block_hash)
+        else:
+            client.revert_block(number, block_hash)
+
+    def _rewind(self, client: W3Client, block: BlockHeader):
+        """Revert the stale branch below `block` and re-emit the canonical one.
+
+        Walks parent hashes down from `block`, fetching one canonical block per
+        step until its parentHash matches the recorded history. Every block
+        fetched on the way has to be re-emitted anyway, so the walk costs no
+        RPC calls beyond the reorg depth.
+        """
+        canonical = []
+        number, parent_hash = block.number - 1, block.parent_hash
+        while True:
+            entry = self.history.get(number)
+            if entry is None:
+                raise ReorgTooDeep(
+                    f"Reorg at #{block.number} is deeper than "
+                    f"{self.history.size} recorded blocks; raise REORG_HISTORY_SIZE "
+                    f"and resync from a checkpoint below the fork"
+                )
+            if entry.hash == parent_hash:
+                break
+
+            parent = client.validate_block(client.get_block(number, use_cache=False))
+            canonical.append(parent)
+            number, parent_hash = number - 1, parent.parent_hash
+
+        logger.warning(
+            f"Reorg detected at #{block.number}, fork point #{number}, "
+            f"depth {len(canonical)}"
+        )
+        self.reorgs.inc()
+        for entry in self.history.truncate_above(number):
+            self._revert(client, entry.number, entry.hash)
+
+        # Reverting a block invalidates its logs; refetch from the fork point
+        if self.logs is not None:
+            self.logs.invalidate_from(number + 1)
+
+        for parent in reversed(canonical):
+            self._emit_logs(client, parent)
+            if self.full_transactions:
+                self._emit_canonical_transactions(client, parent)
+            self._process(client, parent)
+            self.history.push(parent)
+            self.last_block = parent.number
+            self.blocks.inc()
+
+    def _emit_canonical_transactions(self, client: W3Client, block: BlockHeader):
+        """Stream the transactions of a block re-emitted by _rewind."""
+        full = client.get_full_block(block.number)
+        try:
+            if full.header.hash != block.hash:
+                raise ValueError(f"Block #{block.number} changed during the rewind")
+            self._emit_transactions(client, block, full.transactions())
+        finally:
+            full.close()
 
-                if current_block > self.last_block:
-                    logger.info(f"Found {current_block - self.last_block} new blocks")
+    def _resume_point(self, current_block: int) -> int:
+        """Last committed block if there is a checkpoint, else just below the head."""
+        if self.coordinator is not None:
+            cursor = self.coordinator.store.cursor()
+            if cursor is not None:
+                logger.info(f"Resuming from the group cursor at Block #{cursor}")
+                return cursor
+        if self.checkpoint is not None:
+            committed = self.checkpoint.load()
+            if committed is not None:
+                logger.info(f"Resuming from checkpoint at Block #{committed}")
+                return committed
+        return current_block - 1
 
-                    for block_number in range(self.last_block + 1, current_block + 1):
-                        block_data = client.get_block(block_number)
-                        block = client.validate_block(block_data)
-                        client.process_block(block)
-                        self.last_block = block_number
+    def _is_subscribed(self, client: W3Client) -> bool:
+        return client.subscription is not None and client.subscription.is_connected
 
-                time.sleep(config.POLL_INTERVAL)
-            except Exception:
-                time.sleep(config.POLL_INTERVAL)
+    def _next_head(self, client: W3Client) -> Optional[int]:
+        """Return the chain head, pushed by newHeads when subscribed, else polled."""
+        if self.last_block is not None and self._is_subscribed(client):
+            return client.subscription.wait_for_head(
+                self.last_block, config.POLL_INTERVAL
+            )
+        return client.get_latest_block_number()
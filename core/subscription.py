@@ -0,0 +1,98 @@
+import json
+import logging
+import threading
+from typing import Optional
+
+import config
+
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
+logger = logging.getLogger("subscription")
+
+
+class HeadSubscription:
+    """Background eth_subscribe("newHeads") feed for a websocket provider."""
+
+    def __init__(self, url: str, provider_name: str):
+        self.url = url
+        self.provider_name = provider_name
+        self.is_connected = False
+
+        self._head: Optional[int] = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._websocket = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the subscription thread."""
+        self._thread = threading.Thread(
+            target=self._run, name=f"heads-{self.provider_name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Close the socket and stop reconnecting."""
+        self._stop.set()
+        if self._websocket is not None:
+            self._websocket.close()
+        if self._thread is not None:
+            self._thread.join(timeout=config.WS_RECONNECT_INTERVAL)
+
+    def wait_for_head(self, after: int, timeout: float) -> Optional[int]:
+        """Wait for a head newer than `after`, returning None on timeout."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._head is not None and self._head > after, timeout
+            )
+            if self._head is not None and self._head > after:
+                return self._head
+            return None
+
+    def _push_head(self, head: int) -> None:
+        with self._condition:
+            if self._head is None or head > self._head:
+                self._head = head
+                self._condition.notify_all()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(
+                        f"{self.provider_name} newHeads subscription dropped: {str(e)}"
+                    )
+            finally:
+                self.is_connected = False
+                self._websocket = None
+
+            self._stop.wait(config.WS_RECONNECT_INTERVAL)
+
+    def _listen(self) -> None:
+        from websockets.sync.client import connect
+
+        with connect(self.url, open_timeout=config.PROVIDER_TIMEOUT) as websocket:
+            self._websocket = websocket
+            websocket.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": 1,
+                        "method": "eth_subscribe",
+                        "params": ["newHeads"],
+                    }
+                )
+            )
+            response = json.loads(websocket.recv())
+            if "result" not in response:
+                raise ConnectionError(f"eth_subscribe rejected: {response}")
+
+            self.is_connected = True
+            logger.info(f"{self.provider_name} subscribed to newHeads")
+
+            for message in websocket:
+                payload = json.loads(message)
+                if payload.get("method") != "eth_subscription":
+                    continue
+                self._push_head(int(payload["params"]["result"]["number"], 16))
@@ -1,32 +1,146 @@
+import json
 import logging
+import time
+from collections.abc import Mapping
+from typing import Iterable, List, Optional, Tuple
 
-from web3 import Web3
+import requests
+from requests.adapters import HTTPAdapter
 
 import config
-from core.health import ProviderHealth, measure_time
-from models.block import Block
+from core.cache import BlockCache
+from core.full_blocks import FullBlock, decode_full_block, full_block_from_response
+from core.health import ProviderHealth, measure_batch_time, measure_time
+from core.ratelimit import ComputeBudget
+from core.subscription import HeadSubscription
+from models.block import BlockHeader
 from models.provider import Provider
 
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
 logger = logging.getLogger("w3_client")
 
 
+# JSON-RPC "method not found", returned by providers without batch support
+METHOD_NOT_FOUND = -32601
+
+
+def is_batch_rejected(error: Exception) -> bool:
+    """True when a failed batch means the provider does not take batches.
+
+    That is a reply that is not a list of responses (web3 raises
+    BadResponseFormat, or an RPC error for a single error object) carrying
+    method-not-found or mentioning batches. Timeouts and resets are not.
+    """
+    from web3.exceptions import BadResponseFormat
+
+    if isinstance(error, BadResponseFormat):
+        return True
+    response = getattr(error, "rpc_response", None) or {}
+    code = (response.get("error") or {}).get("code")
+    return code == METHOD_NOT_FOUND or "batch" in str(error).lower()
+
+
+def _rpc_value(value):
+    """A decoded web3 value back in JSON-RPC form (hex quantities and bytes)."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes.hex(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return hex(value)
+    if isinstance(value, Mapping):
+        # web3 hands out AttributeDicts, which are Mappings but not dicts
+        return {key: _rpc_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rpc_value(item) for item in value]
+    return value
+
+
+def _encode_responses(blocks: Iterable[Tuple[int, dict]]) -> bytes:
+    """Batch payload answering request id i with block, as a node would."""
+    return json.dumps(
+        [
+            {"jsonrpc": "2.0", "id": i, "result": _rpc_value(block)}
+            for i, block in blocks
+        ]
+    ).encode()
+
+
+def build_session(
+    pool_size: int, keep_alive: bool = True, hosts: int = 1
+) -> requests.Session:
+    """Pooled HTTP session keeping up to pool_size connections to each of hosts."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
 class W3Client:
-    def __init__(self, provider: Provider):
+    def __init__(self, provider: Provider, session: Optional[requests.Session] = None):
         self.provider = provider
         self.w3 = None
         self.health = ProviderHealth(provider.name)
 
+        # Off for good once the provider rejects a JSON-RPC batch; off until
+        # _batch_retry_at after any other batch failure
+        self.batch_supported = True
+        self._batch_retry_at: Optional[float] = None
+
+        # Pushes new heads for websocket providers; None means poll
+        self.subscription: Optional[HeadSubscription] = None
+
+        # Recent blocks shared across clients by the HotswapManager
+        self.cache: Optional[BlockCache] = None
+
+        # Outlives reconnects so a swap back finds warm connections. A
+        # session passed in is shared with other clients and not closed here
+        self._owns_session = session is None
+        self.session = session or build_session(
+            provider.pool.pool_size, provider.pool.keep_alive
+        )
+
+        # Per-block INFO logs; bulk backfill switches them off
+        self.log_blocks = True
+
+        # Paces calls to the provider's request or compute-unit budget
+        self.budget: Optional[ComputeBudget] = (
+            ComputeBudget(provider.rate_limit) if provider.rate_limit else None
+        )
+
+    def close(self):
+        """Release pooled connections and the head subscription."""
+        if self.subscription is not None:
+            self.subscription.stop()
+        if self._owns_session:
+            self.session.close()
+
     @measure_time
     def connect(self):
         """Connect to the provider."""
+        # Deferred: importing web3 costs about a second of startup
+        from web3 import Web3
+
         try:
-            self.w3 = Web3(
-                Web3.HTTPProvider(
-                    self.provider.url,
-                    request_kwargs={"timeout": config.PROVIDER_TIMEOUT},
+            if self.provider.type == "websocket":
+                self.w3 = Web3(
+                    Web3.LegacyWebSocketProvider(
+                        self.provider.url,
+                        websocket_timeout=config.PROVIDER_TIMEOUT,
+                    )
+                )
+            else:
+                pool = self.provider.pool
+                self.w3 = Web3(
+                    Web3.HTTPProvider(
+                        self.provider.url,
+                        request_kwargs={
+                            "timeout": (pool.connect_timeout, pool.read_timeout)
+                        },
+                        session=self.session,
+                    )
                 )
-            )
 
             if not self.w3.is_connected():
                 raise ConnectionError(
@@ -35,6 +149,12 @@ class W3Client:
 
             logger.info(f"Connected to provider: {self.provider.name}")
 
+            if self.provider.type == "websocket" and self.subscription is None:
+                self.subscription = HeadSubscription(
+                    self.provider.url, self.provider.name
+                )
+                self.subscription.start()
+
         except Exception as e:
             logger.error(f"Connection error for {self.provider.name}: {str(e)}")
             self.health.connection_failures += 1
@@ -52,9 +172,217 @@ class W3Client:
             )
             raise
 
+    def get_block(self, block_number: int, use_cache: bool = True):
+        """Get block data, from the cache when possible"""
+        if use_cache and self.cache is not None:
+            block_data = self.cache.get(block_number)
+            if block_data is not None:
+                return block_data
+
+        block_data = self._get_block_timed(block_number)
+        if self.cache is not None:
+            self.cache.put(block_data)
+        return block_data
+
+    def get_blocks(self, block_numbers: List[int]) -> list:
+        """Get several blocks, batching the ones the cache does not have."""
+        if self.cache is None:
+            return self._get_blocks_timed(block_numbers)
+
+        blocks = {}
+        for block_number in block_numbers:
+            block_data = self.cache.get(block_number)
+            if block_data is not None:
+                blocks[block_number] = block_data
+
+        missing = [n for n in block_numbers if n not in blocks]
+        if missing:
+            for block_data in self._get_blocks_timed(missing):
+                self.cache.put(block_data)
+                blocks[block_data["number"]] = block_data
+
+        return [blocks[n] for n in block_numbers]
+
+    @measure_time
+    def _get_block_timed(self, block_number: int):
+        return self._fetch_block(block_number)
+
+    @measure_batch_time
+    def _get_blocks_timed(self, block_numbers: List[int]) -> list:
+        """Get several blocks in one JSON-RPC batch, falling back to single calls."""
+        if len(block_numbers) > 1 and self._batching():
+            try:
+                with self.w3.batch_requests() as batch:
+                    for block_number in block_numbers:
+                        batch.add(
+                            self.w3.eth.get_block(block_number, full_transactions=False)
+                        )
+                    blocks = list(batch.execute())
+
+                if len(blocks) != len(block_numbers):
+                    raise ValueError(
+                        f"expected {len(block_numbers)} blocks, got {len(blocks)}"
+                    )
+                return blocks
+
+            except Exception as e:
+                self._disable_batching(e)
+
+        return [self._fetch_block(block_number) for block_number in block_numbers]
+
+    def _batching(self) -> bool:
+        """Whether to batch now, re-enabling batches after their cooldown."""
+        if (
+            not self.batch_supported
+            and self._batch_retry_at is not None
+            and time.monotonic() >= self._batch_retry_at
+        ):
+            self.batch_supported = True
+            self._batch_retry_at = None
+        return self.batch_supported
+
+    def _disable_batching(self, error: Exception) -> None:
+        self.batch_supported = False
+        if is_batch_rejected(error):
+            self._batch_retry_at = None
+            logger.warning(
+                f"{self.provider.name} rejected batch request, "
+                f"falling back to single calls: {str(error)}"
+            )
+        else:
+            self._batch_retry_at = time.monotonic() + config.BATCH_RETRY_COOLDOWN
+            logger.warning(
+                f"{self.provider.name} batch request failed, using single calls "
+                f"for {config.BATCH_RETRY_COOLDOWN}s: {str(error)}"
+            )
+
+    def get_raw_blocks(self, block_numbers: List[int]) -> bytes:
+        """JSON-RPC batch responses for block_numbers, left undecoded.
+
+        Leaves JSON decoding and validation to a DecodePool; response ids
+        are the positions in block_numbers. Cached blocks are encoded from
+        the cache and only the rest is requested. Providers that cannot
+        take an HTTP batch are served through get_blocks, and those blocks
+        are encoded into the same payload.
+        """
+        if self.provider.type != "http" or not self._batching():
+            blocks = self.get_blocks(block_numbers)
+            return _encode_responses(enumerate(blocks))
+
+        cached, missing = [], []
+        for i, number in enumerate(block_numbers):
+            block = self.cache.get(number) if self.cache is not None else None
+            if block is None:
+                missing.append((i, number))
+            else:
+                cached.append((i, block))
+        if not missing:
+            return _encode_responses(cached)
+
+        raw = self._get_raw_blocks_timed([number for _, number in missing], missing)
+        if not cached or not raw.rstrip().endswith(b"]"):
+            # Not an array: an error reply, which the decoder reports
+            return raw
+        return raw.rstrip()[:-1] + b"," + _encode_responses(cached)[1:]
+
+    @measure_batch_time
+    def _get_raw_blocks_timed(
+        self, block_numbers: List[int], requests: List[Tuple[int, int]]
+    ) -> bytes:
+        pool = self.provider.pool
+        try:
+            response = self.session.post(
+                self.provider.url,
+                json=[
+                    {
+                        "jsonrpc": "2.0",
+                        "id": i,
+                        "method": "eth_getBlockByNumber",
+                        "params": [hex(number), False],
+                    }
+                    for i, number in requests
+                ],
+                timeout=(pool.connect_timeout, pool.read_timeout),
+            )
+            response.raise_for_status()
+            return response.content
+
+        except Exception as e:
+            self.health.block_failures += 1
+            logger.error(
+                f"Error getting raw blocks from {self.provider.name}: {str(e)}"
+            )
+            raise
+
+    @measure_time
+    def get_full_block(self, block_number: int) -> FullBlock:
+        """Fetch a block with transaction bodies, decoding them as they arrive.
+
+        Over HTTP the response is streamed and decoded as it arrives.
+        Websocket replies arrive as a single, already parsed message, so
+        their transactions are read straight from it.
+        """
+        params = [hex(block_number), True]
+        try:
+            if self.provider.type == "websocket":
+                response = self.w3.provider.make_request("eth_getBlockByNumber", params)
+                return full_block_from_response(response)
+
+            pool = self.provider.pool
+            response = self.session.post(
+                self.provider.url,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": block_number,
+                    "method": "eth_getBlockByNumber",
+                    "params": params,
+                },
+                stream=True,
+                timeout=(pool.connect_timeout, pool.read_timeout),
+            )
+            response.raise_for_status()
+            return decode_full_block(
+                response.iter_content(chunk_size=config.FULL_BLOCK_CHUNK_SIZE),
+                on_close=response.close,
+            )
+
+        except Exception as e:
+            self.health.block_failures += 1
+            logger.error(
+                f"Error getting full Block #{block_number} "
+                f"from {self.provider.name}: {str(e)}"
+            )
+            raise
+
     @measure_time
-    def get_block(self, block_number: int):
-        """Get block data"""
+    def get_logs(
+        self,
+        addresses: List[str],
+        topics: list,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_hash: Optional[str] = None,
+    ) -> list:
+        """Logs matching addresses and topics in a block range or one block."""
+        if block_hash is not None:
+            params = {"blockHash": block_hash}
+        else:
+            params = {"fromBlock": from_block, "toBlock": to_block}
+        if addresses:
+            from web3 import Web3
+
+            params["address"] = [Web3.to_checksum_address(a) for a in addresses]
+        if topics:
+            params["topics"] = topics
+
+        try:
+            return self.w3.eth.get_logs(params)
+        except Exception as e:
+            logger.error(f"Error getting logs from {self.provider.name}: {str(e)}")
+            raise
+
+    def _fetch_block(self, block_number: int):
+        """Fetch a single block without timing it."""
         try:
             block_data = self.w3.eth.get_block(block_number, full_transactions=False)
             return block_data
@@ -66,11 +394,12 @@ class W3Client:
             )
             raise
 
-    def validate_block(self, block: dict) -> Block:
-        """Validating using Pydantic model... could be extended"""
+    def validate_block(self, block: dict) -> BlockHeader:
+        """Validating into a compact header... could be extended"""
         try:
-            block = Block.from_raw(block)
-            logger.info(f"Validated | #{block.number}")
+            block = BlockHeader.from_raw(block)
+            if self.log_blocks:
+                logger.info(f"Validated | #{block.number}")
 
             return block
 
@@ -79,12 +408,29 @@ class W3Client:
             logger.error(f"Error validating #{block.number}: {str(e)}")
             raise
 
-    def process_block(self, block: Block):
+    def process_block(self, block: BlockHeader):
         """Just logging for now..."""
         try:
-            logger.info(
-                f"Processed | #{block.number} | ts: {block.timestamp} | txs: {block.tx_count}"
-            )
+            if self.log_blocks:
+                logger.info(
+                    f"Processed | #{block.number} | ts: {block.timestamp} "
+                    f"| txs: {block.tx_count}"
+                )
         except Exception as e:
             logger.error(f"Error processing block #{block.number}: {str(e)}")
             self.health.block_failures += 1
+
+    def process_transaction(self, block: BlockHeader, transaction: dict):
+        """Just logging for now..."""
+        logger.debug(f"Transaction | #{block.number} | {transaction.get('hash')}")
+
+    def process_log(self, block: BlockHeader, log: dict):
+        """Just logging for now..."""
+        logger.info(
+            f"Log | #{block.number} | {log.get('address')} | "
+            f"index: {log.get('logIndex')}"
+        )
+
+    def revert_block(self, number: int, block_hash: str):
+        """Just logging for now..."""
+        logger.warning(f"Reverted | #{number} | hash: {block_hash}")
@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 
 import yaml
 from dotenv import load_dotenv
@@ -11,35 +11,33 @@ logging = config.setup_logging()
 logger = logging.getLogger("helpers")
 
 
-def load_providers(path: str) -> List[Provider]:
-    """Load providers from YAML config and inject API keys from environment."""
-    try:
-        load_dotenv()
+def _build_providers(entries: dict, chain: str = "default") -> List[Provider]:
+    """Providers for one chain, with API keys injected from the environment."""
+    if not entries or len(entries) < 2:
+        raise ValueError(f"Chain {chain} must have at least two providers")
 
-        with open(path) as f:
-            yaml_config = yaml.safe_load(f)
+    providers = []
+    for _id, data in entries.items():
+        logger.info(f"Loading provider: {data['name']} ({chain})")
 
-        if (
-            not yaml_config
-            or "providers" not in yaml_config
-            or len(yaml_config["providers"]) < 2
-        ):
-            raise ValueError("Config must contain at least two providers")
+        if data.get("api_key", False):
+            api_key = os.getenv(f"{data['name']}_API_KEY")
+            if api_key:
+                data["url"] = f"{data['url']}/{api_key}"
+            else:
+                logger.warning(f"Missing API key for {_id}")
 
-        providers = []
-        for _id, data in yaml_config["providers"].items():
-            logger.info(f"Loading provider: {data['name']}")
+        providers.append(Provider(**data, chain=chain))
 
-            if data.get("api_key", False):
-                api_key = os.getenv(f"{data['name']}_API_KEY")
-                if api_key:
-                    data["url"] = f"{data['url']}/{api_key}"
-                else:
-                    logger.warning(f"Missing API key for {_id}")
+    return providers
 
-            providers.append(Provider(**data))
 
-        return providers
+def _read_config(path: str) -> dict:
+    try:
+        load_dotenv()
+
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
 
     except FileNotFoundError:
         logger.error(f"Config file not found: {path}")
@@ -47,6 +45,35 @@ def load_providers(path: str) -> List[Provider]:
     except yaml.YAMLError:
         logger.error(f"Invalid YAML in config: {path}")
         raise
+
+
+def load_providers(path: str) -> List[Provider]:
+    """Load providers from YAML config and inject API keys from environment."""
+    yaml_config = _read_config(path)
+    try:
+        if "providers" not in yaml_config:
+            raise ValueError("Config must contain at least two providers")
+        return _build_providers(yaml_config["providers"])
+
     except Exception as e:
         logger.error(f"Failed to load providers: {str(e)}")
         raise
+
+
+def load_chains(path: str) -> Dict[str, List[Provider]]:
+    """Load a config of `chains: {chain: {id: provider}}`, one entry per chain.
+
+    A single-chain config (top-level `providers:`) loads as chain "default".
+    """
+    yaml_config = _read_config(path)
+    try:
+        if "chains" not in yaml_config:
+            return {"default": load_providers(path)}
+        return {
+            chain: _build_providers(entries, chain)
+            for chain, entries in yaml_config["chains"].items()
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to load chains: {str(e)}")
+        raise
@@ -1,27 +1,169 @@
+import argparse
+import asyncio
 import logging
 
 from dotenv import load_dotenv
 
 import config
+from core.checkpoint import create_checkpoint_store
+from core.coordination import Coordinator, SqliteLeaseStore
+from core.decode import DecodePool
+from core.group import StreamerGroup
 from core.hotswap import HotswapManager
+from core.logs import LogStream
+from core.metrics import REGISTRY, start_metrics_server
+from core.pipeline import SinkPipeline
+from core.sinks import create_sinks
 from core.streamer import BlockStreamer
-from helpers import load_providers
+from helpers import load_chains
 
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT)
 logger = logging.getLogger("main")
 
 load_dotenv()
 
+# Settings the asyncio engine does not implement; it streams headers only
+SYNC_ONLY_SETTINGS = (
+    "SINKS",
+    "LOG_ADDRESSES",
+    "LOG_TOPICS",
+    "DECODE_POOL",
+    "FULL_TRANSACTIONS",
+    "COORDINATION_PATH",
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ethereum block streamer")
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default=config.STREAM_ENGINE,
+        help="Streaming engine to run",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_block",
+        type=int,
+        help="Bulk-ingest from this block, then stream live unless --to is given",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_block",
+        type=int,
+        help="Last block of the bulk backfill; exit once it is ingested",
+    )
+    args = parser.parse_args()
+    if args.to_block is not None and args.from_block is None:
+        parser.error("--to requires --from")
+    if args.to_block is not None and args.to_block < args.from_block:
+        parser.error("--to must not be below --from")
+    if args.from_block is not None and args.engine == "async":
+        parser.error("--from runs on the sync engine")
+    if args.engine == "async":
+        unsupported = [name for name in SYNC_ONLY_SETTINGS if getattr(config, name)]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} run on the sync engine only")
+    if args.from_block is not None and config.COORDINATION_PATH is not None:
+        # Bulk ingest does not take leases, so workers would duplicate it
+        parser.error("--from does not run with COORDINATION_PATH set")
+    return args
+
+
+async def run_async(providers, checkpoint):
+    """Run the asyncio streaming engine."""
+    from core.async_hotswap import AsyncHotswapManager
+    from core.async_streamer import AsyncBlockStreamer
+
+    manager = await AsyncHotswapManager.create(providers)
+    streamer = AsyncBlockStreamer(hotswap_manager=manager, checkpoint=checkpoint)
+    try:
+        await streamer.stream()
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
 
 if __name__ == "__main__":
-    # Load all providers from the config file
-    providers = load_providers(path=config.PROVIDERS_CONFIG_FILE)
+    args = parse_args()
+
+    # Load all providers from the config file, grouped by chain
+    chains = load_chains(path=config.PROVIDERS_CONFIG_FILE)
+
+    # Expose Prometheus metrics and a liveness probe
+    if config.METRICS_PORT is not None:
+        start_metrics_server()
+
+    if list(chains) != ["default"]:
+        # One streamer thread per chain over shared connections
+        if args.engine == "async":
+            logger.warning("Multi-chain streaming runs on the sync engine")
+        if args.from_block is not None:
+            raise SystemExit("--from/--to need a single-chain providers.yml")
+        StreamerGroup(chains).run()
+    elif args.engine == "async":
+        checkpoint = create_checkpoint_store()
+        asyncio.run(run_async(chains["default"], checkpoint))
+    else:
+        providers = chains["default"]
+
+        # Resume from the last committed block across restarts; coordinated
+        # workers resume from the cursor the group leader publishes instead
+        coordinator = None
+        if config.COORDINATION_PATH is not None:
+            store = SqliteLeaseStore(config.COORDINATION_PATH)
+            coordinator = Coordinator(store, config.WORKER_ID).start()
+            checkpoint = None
+        else:
+            checkpoint = create_checkpoint_store()
+
+        # Create the hotswap manager with all available providers
+        manager = HotswapManager(providers)
+
+        # Hand blocks to the configured sinks off the fetch thread
+        pipeline = None
+        sinks = create_sinks()
+        if sinks:
+            on_flushed = checkpoint.commit if checkpoint is not None else None
+            pipeline = SinkPipeline(sinks, on_flushed=on_flushed)
+            REGISTRY.gauge(
+                "pipeline_queue_depth",
+                "Blocks waiting for the sinks",
+                fn=lambda: pipeline.depth,
+            )
+
+        # Stream event logs for the configured contracts alongside blocks
+        logs = None
+        if config.LOG_ADDRESSES or config.LOG_TOPICS:
+            logs = LogStream(config.LOG_ADDRESSES, config.LOG_TOPICS)
+
+        # Decode and validate batches off the fetch thread
+        decoder = DecodePool(config.DECODE_POOL) if config.DECODE_POOL else None
 
-    # Create the hotswap manager with all available providers
-    manager = HotswapManager(providers)
+        # Create the block streamer
+        streamer = BlockStreamer(
+            hotswap_manager=manager,
+            checkpoint=checkpoint,
+            pipeline=pipeline,
+            logs=logs,
+            decoder=decoder,
+            coordinator=coordinator,
+        )
 
-    # Create the block streamer
-    streamer = BlockStreamer(hotswap_manager=manager)
+        try:
+            # Ingest the requested history in bulk mode first
+            if args.from_block is not None:
+                streamer.bulk_backfill(args.from_block, args.to_block)
 
-    # Start streaming blocks
-    streamer.stream()
+            # Start streaming blocks, right after the backfill when there was one
+            if args.to_block is None:
+                streamer.stream()
+        finally:
+            # Drain the sinks first so their last batch still reaches the
+            # checkpoint, then flush it; this also runs on Ctrl-C and errors
+            if pipeline is not None:
+                pipeline.close()
+            if checkpoint is not None:
+                checkpoint.close()
+            if coordinator is not None:
+                coordinator.close()
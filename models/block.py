@@ -1,10 +1,26 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
+def to_hex(value) -> Optional[str]:
+    """Normalize a hash (HexBytes, bytes or str) to a lowercase 0x string."""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes.hex(value)
+    value = str(value).lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
 class Block(BaseModel):
     number: int
     timestamp: int
     tx_count: int = Field(..., description="The amount of transactions")
+    hash: Optional[str] = Field(default=None, description="Block hash (0x hex)")
+    parent_hash: Optional[str] = Field(
+        default=None, description="Parent block hash (0x hex)"
+    )
     raw: dict = Field(..., description="The raw block data returned by the provider")
 
     @classmethod
@@ -13,5 +29,113 @@ class Block(BaseModel):
             number=raw_block["number"],
             timestamp=raw_block["timestamp"],
             tx_count=len(raw_block.get("transactions", [])),
+            hash=to_hex(raw_block.get("hash")),
+            parent_hash=to_hex(raw_block.get("parentHash")),
             raw=raw_block,
         )
+
+
+class BlockHeader:
+    """Compact, slot-backed block header used on the streaming hot path.
+
+    Validation only checks the fields the streamer relies on. The provider
+    payload is referenced only when `keep_raw=True`, so by default a header
+    costs a handful of slots instead of the full AttributeDict.
+    """
+
+    __slots__ = (
+        "number",
+        "timestamp",
+        "tx_count",
+        "hash",
+        "parent_hash",
+        "gas_used",
+        "gas_limit",
+        "base_fee",
+        "_raw",
+    )
+
+    def __init__(
+        self,
+        number: int,
+        timestamp: int,
+        tx_count: int,
+        hash: Optional[str] = None,
+        parent_hash: Optional[str] = None,
+        raw: Optional[dict] = None,
+        gas_used: int = 0,
+        gas_limit: int = 0,
+        base_fee: int = 0,
+    ):
+        self.number = number
+        self.timestamp = timestamp
+        self.tx_count = tx_count
+        self.hash = hash
+        self.parent_hash = parent_hash
+        self.gas_used = gas_used
+        self.gas_limit = gas_limit
+        self.base_fee = base_fee
+        self._raw = raw
+
+    @classmethod
+    def from_raw(cls, raw_block: dict, keep_raw: bool = False) -> "BlockHeader":
+        number = raw_block["number"]
+        timestamp = raw_block["timestamp"]
+        if not isinstance(number, int) or not isinstance(timestamp, int):
+            raise TypeError(
+                f"number and timestamp must be int, got {number!r}, {timestamp!r}"
+            )
+
+        return cls(
+            number,
+            timestamp,
+            len(raw_block.get("transactions", ())),
+            to_hex(raw_block.get("hash")),
+            to_hex(raw_block.get("parentHash")),
+            raw_block if keep_raw else None,
+            raw_block.get("gasUsed", 0),
+            raw_block.get("gasLimit", 0),
+            # Zero before London, which introduced baseFeePerGas
+            raw_block.get("baseFeePerGas", 0),
+        )
+
+    @classmethod
+    def from_rpc(cls, block: dict) -> "BlockHeader":
+        """Build a header from an undecoded JSON-RPC block (hex quantities)."""
+
+        def quantity(key: str) -> int:
+            value = block.get(key)
+            return int(value, 16) if value else 0
+
+        return cls(
+            int(block["number"], 16),
+            int(block["timestamp"], 16),
+            len(block.get("transactions", ())),
+            to_hex(block.get("hash")),
+            to_hex(block.get("parentHash")),
+            None,
+            quantity("gasUsed"),
+            quantity("gasLimit"),
+            quantity("baseFeePerGas"),
+        )
+
+    @property
+    def raw(self) -> Optional[dict]:
+        """The provider payload, if it was kept."""
+        return self._raw
+
+    def to_dict(self) -> dict:
+        """Header fields as a plain, JSON-serializable dict."""
+        return {
+            "number": self.number,
+            "timestamp": self.timestamp,
+            "tx_count": self.tx_count,
+            "hash": self.hash,
+            "parent_hash": self.parent_hash,
+            "gas_used": self.gas_used,
+            "gas_limit": self.gas_limit,
+            "base_fee": self.base_fee,
+        }
+
+    def __repr__(self) -> str:
+        return f"BlockHeader(number={self.number}, hash={self.hash})"
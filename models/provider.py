@@ -1,11 +1,50 @@
-from typing import Literal
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
+class PoolConfig(BaseModel):
+    pool_size: int = Field(
+        default=10, gt=0, description="Maximum pooled connections to the provider"
+    )
+    keep_alive: bool = Field(
+        default=True, description="Reuse connections (and their TLS sessions)"
+    )
+    connect_timeout: float = Field(
+        default=5, gt=0, description="Seconds to establish a connection"
+    )
+    read_timeout: float = Field(
+        default=30, gt=0, description="Seconds to wait for a response"
+    )
+
+
+class RateLimitConfig(BaseModel):
+    units_per_second: float = Field(
+        ..., gt=0, description="Sustained request or compute-unit budget"
+    )
+    burst: Optional[float] = Field(
+        default=None, gt=0, description="Bucket size; defaults to one second's worth"
+    )
+    default_cost: float = Field(
+        default=1, ge=0, description="Units charged for methods not in method_costs"
+    )
+    method_costs: Dict[str, float] = Field(
+        default_factory=dict, description="Units charged per JSON-RPC method"
+    )
+
+
 class Provider(BaseModel):
     url: str = Field(..., description="Provider API endpoint URL")
     type: Literal["http", "websocket"] = Field(
         default="http", description="Connection type"
     )
     name: str = Field(..., description="Human-readable provider name")
+    chain: str = Field(
+        default="default", description="Chain served, set from providers.yml"
+    )
+    pool: PoolConfig = Field(
+        default_factory=PoolConfig, description="HTTP connection pool settings"
+    )
+    rate_limit: Optional[RateLimitConfig] = Field(
+        default=None, description="Client-side throttling; unlimited when omitted"
+    )
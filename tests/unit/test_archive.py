@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from core.archive import ArchiveReader, ArchiveSink, ArchiveWriter
+from models.block import BlockHeader
+
+
+def header(number):
+    return BlockHeader(
+        number,
+        1_700_000_000 + number * 12,
+        number % 7,
+        f"0x{number}",
+        f"0x{number - 1}",
+        gas_used=number * 1000,
+        gas_limit=30_000_000,
+        base_fee=10**9 + number,
+    )
+
+
+def test_archive_range_query(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(n) for n in range(100, 150)])
+    writer.append([header(n) for n in range(150, 200)])
+    writer.close()
+
+    reader = ArchiveReader(str(tmp_path))
+    columns = reader.range(120, 129)
+
+    assert columns["number"].dtype == np.uint64
+    assert columns["number"].tolist() == list(range(120, 130))
+    assert columns["gas_used"].tolist() == [n * 1000 for n in range(120, 130)]
+    assert columns["tx_count"].dtype == np.uint32
+    assert reader.has_range(100, 199)
+    assert not reader.has_range(100, 200)
+
+
+def test_archive_gaps_are_indexed(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(10), header(11), header(15)])
+    writer.close()
+
+    reader = ArchiveReader(str(tmp_path))
+
+    assert reader.range(10, 20)["number"].tolist() == [10, 11, 15]
+    assert not reader.has_range(10, 15)
+    assert reader.range(12, 14)["number"].tolist() == []
+
+
+def test_archive_skips_duplicates_and_rejects_disorder(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(1), header(2)])
+    writer.append([header(2), header(3)])
+
+    with pytest.raises(ValueError):
+        writer.append([header(5), header(4)])
+    writer.close()
+
+    assert ArchiveReader(str(tmp_path)).range(0, 10)["number"].tolist() == [1, 2, 3]
+
+
+def test_archive_revert_truncates(tmp_path):
+    sink = ArchiveSink(str(tmp_path))
+    sink.write([header(n) for n in range(1, 6)])
+    sink.revert(5, "0x5")
+    sink.revert(4, "0x4")
+    sink.write([header(4)])
+    sink.close()
+
+    columns = ArchiveReader(str(tmp_path)).range(1, 10)
+    assert columns["number"].tolist() == [1, 2, 3, 4]
+
+
+def test_archive_recovers_torn_append(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(1), header(2)])
+    writer.close()
+
+    # Simulate a crash that wrote a row to one column only
+    with open(tmp_path / "number.u8", "ab") as f:
+        f.write((3).to_bytes(8, "little"))
+
+    writer = ArchiveWriter(str(tmp_path))
+    assert writer.rows == 2
+    writer.append([header(3)])
+    writer.close()
+
+    columns = ArchiveReader(str(tmp_path)).range(1, 3)
+    assert columns["timestamp"].tolist() == [header(n).timestamp for n in (1, 2, 3)]
+
+
+def test_archive_rebuilds_index_for_unindexed_rows(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(n) for n in range(10, 15)])
+    writer.close()
+
+    # Simulate a crash after rows for #15 and #17 reached every column but
+    # before their index entries did
+    writer = ArchiveWriter(str(tmp_path))
+    index_length = writer.index_length
+    writer.append([header(15), header(17)])
+    writer.flush()
+    writer._index.truncate(index_length * 8)
+    writer.close()
+
+    writer = ArchiveWriter(str(tmp_path))
+    assert writer.rows == 7
+    writer.append([header(18)])
+    writer.close()
+
+    reader = ArchiveReader(str(tmp_path))
+    assert reader.rows(10, 18).tolist() == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert reader.range(15, 16)["number"].tolist() == [15]
+    assert reader.range(10, 20)["number"].tolist() == [10, 11, 12, 13, 14, 15, 17, 18]
+
+
+def test_archive_drops_index_entries_past_the_columns(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(n) for n in range(1, 4)])
+    writer.close()
+
+    # The index reached disk, the columns for #3 did not
+    for name in ("number.u8", "timestamp.u8"):
+        path = tmp_path / name
+        path.write_bytes(path.read_bytes()[:-8])
+
+    writer = ArchiveWriter(str(tmp_path))
+    assert writer.rows == 2
+    assert writer.index_length == 2
+    writer.close()
+
+
+def test_archive_rejects_blocks_below_base(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append([header(10), header(11)])
+
+    with pytest.raises(ValueError, match="below the archive base"):
+        writer.append([header(9)])
+    writer.close()
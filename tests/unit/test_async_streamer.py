@@ -0,0 +1,157 @@
+import asyncio
+import random
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from core.async_hotswap import AsyncHotswapManager
+from core.async_streamer import AsyncBlockStreamer
+from models.block import BlockHeader
+
+
+class FakeAsyncClient:
+    """Async client double that answers out of order."""
+
+    def __init__(self):
+        self.provider = Mock()
+        self.provider.name = "Fake"
+        self.health = Mock()
+        self.in_flight = 0
+        self.max_seen_in_flight = 0
+        self.processed = []
+
+    async def get_block(self, block_number):
+        self.in_flight += 1
+        self.max_seen_in_flight = max(self.max_seen_in_flight, self.in_flight)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        self.in_flight -= 1
+        return {"number": block_number, "timestamp": 0, "transactions": []}
+
+    def validate_block(self, block_data):
+        return BlockHeader.from_raw(block_data)
+
+    def process_block(self, block):
+        self.processed.append(block.number)
+
+
+def test_fetch_range_in_order_and_bounded():
+    client = FakeAsyncClient()
+    streamer = AsyncBlockStreamer(hotswap_manager=Mock(), max_in_flight=4)
+    streamer.last_block = 99
+
+    asyncio.run(streamer._fetch_range(client, 150))
+
+    assert client.processed == list(range(100, 151))
+    assert client.max_seen_in_flight <= 4
+    assert streamer.last_block == 150
+
+
+def test_fetch_range_stops_at_failed_block():
+    client = FakeAsyncClient()
+    original = client.get_block
+
+    async def failing_get_block(block_number):
+        if block_number == 105:
+            raise ConnectionError("boom")
+        return await original(block_number)
+
+    client.get_block = failing_get_block
+    streamer = AsyncBlockStreamer(hotswap_manager=Mock(), max_in_flight=3)
+    streamer.last_block = 99
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(streamer._fetch_range(client, 120))
+
+    assert client.processed == list(range(100, 105))
+    assert streamer.last_block == 104
+
+
+def test_fetch_range_leaves_no_task_behind(monkeypatch):
+    tasks = []
+    ensure_future = asyncio.ensure_future
+    monkeypatch.setattr(
+        "core.async_streamer.asyncio.ensure_future",
+        lambda coro: tasks.append(ensure_future(coro)) or tasks[-1],
+    )
+    client = FakeAsyncClient()
+
+    async def get_block(block_number):
+        if block_number == 100:
+            raise ConnectionError("boom")
+        if block_number == 101:
+            raise TimeoutError("also failed")
+        await asyncio.sleep(1)
+
+    client.get_block = get_block
+    streamer = AsyncBlockStreamer(hotswap_manager=Mock(), max_in_flight=4)
+    streamer.last_block = 99
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await streamer._fetch_range(client, 120)
+        return [task.done() for task in tasks]
+
+    # Failed tasks were retrieved and cancelled ones finished cancelling
+    assert asyncio.run(run()) == [True] * 4
+
+
+def test_fetch_range_rewinds_on_reorg():
+    def block(number, branch):
+        parent = "a" if branch == "b" and number == 4 else branch
+        return {
+            "number": number,
+            "timestamp": number,
+            "transactions": [],
+            "hash": f"0x{branch}{number}",
+            "parentHash": f"0x{parent}{number - 1}",
+        }
+
+    # The a-branch was streamed up to #5; the chain now forks after #3
+    canonical = {n: block(n, "a" if n < 4 else "b") for n in range(1, 8)}
+    client = FakeAsyncClient()
+    events = []
+    client.process_block = lambda b: events.append(("process", b.number, b.hash))
+    client.revert_block = lambda n, h: events.append(("revert", n, h))
+
+    async def get_block(block_number, use_cache=True):
+        return canonical[block_number]
+
+    client.get_block = get_block
+    streamer = AsyncBlockStreamer(hotswap_manager=Mock())
+    for number in range(1, 6):
+        streamer.history.push(BlockHeader.from_raw(block(number, "a")))
+    streamer.last_block = 5
+
+    asyncio.run(streamer._fetch_range(client, 7))
+
+    assert events == [
+        ("revert", 5, "0xa5"),
+        ("revert", 4, "0xa4"),
+        ("process", 4, "0xb4"),
+        ("process", 5, "0xb5"),
+        ("process", 6, "0xb6"),
+        ("process", 7, "0xb7"),
+    ]
+    assert streamer.last_block == 7
+
+
+def test_async_manager_skips_failed_providers(mock_providers):
+    with patch("core.async_hotswap.AsyncW3Client") as mock_client:
+
+        def create_instance(provider):
+            client = Mock()
+            client.provider = provider
+            client.health.is_healthy = True
+            client.health.probe_due = False
+            client.connect = AsyncMock(
+                side_effect=(
+                    ConnectionError("down") if provider.name == "Provider1" else None
+                )
+            )
+            return client
+
+        mock_client.side_effect = create_instance
+        manager = asyncio.run(AsyncHotswapManager.create(mock_providers))
+
+    assert list(manager.clients) == ["Provider2"]
+    assert manager.current_provider == "Provider2"
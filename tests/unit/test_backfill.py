@@ -0,0 +1,138 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+import config
+from core.backfill import BackfillProgress, ParallelBackfiller
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+def make_client(name, latency=0.01, fail_on=()):
+    client = Mock()
+    client.provider.name = name
+    client.health.is_healthy = True
+    client.health.avg_response_time = latency
+    client.requested = []
+    lock = threading.Lock()
+
+    def get_blocks(numbers):
+        with lock:
+            client.requested.append(numbers)
+        time.sleep(latency)
+        if numbers[0] in fail_on:
+            raise ConnectionError(f"{name} failed")
+        return [{"number": n, "timestamp": 0, "transactions": []} for n in numbers]
+
+    client.get_blocks.side_effect = get_blocks
+    client.validate_block.side_effect = BlockHeader.from_raw
+    return client
+
+
+def make_manager(*clients):
+    manager = Mock()
+    manager.clients = {c.provider.name: c for c in clients}
+    return manager
+
+
+def test_backfill_reassembles_in_order(monkeypatch):
+    monkeypatch.setattr(config, "BACKFILL_CHUNK_SIZE", 10)
+    manager = make_manager(make_client("A", 0.002), make_client("B", 0.004))
+
+    blocks = list(ParallelBackfiller(manager).backfill(100, 349))
+
+    assert [b.number for b in blocks] == list(range(100, 350))
+    assert manager.clients["A"].requested and manager.clients["B"].requested
+
+
+def test_backfill_weights_chunks_by_latency(monkeypatch):
+    monkeypatch.setattr(config, "BACKFILL_CHUNK_SIZE", 100)
+    fast, slow = make_client("Fast", 0.01), make_client("Slow", 0.04)
+
+    backfiller = ParallelBackfiller(make_manager(fast, slow))
+
+    assert backfiller.chunk_size(fast, backfiller.manager.clients) == 100
+    assert backfiller.chunk_size(slow, backfiller.manager.clients) == 25
+
+
+def test_backfill_moves_failed_chunk_to_other_provider(monkeypatch):
+    monkeypatch.setattr(config, "BACKFILL_CHUNK_SIZE", 10)
+    flaky = make_client("Flaky", 0.001, fail_on={0})
+    steady = make_client("Steady", 0.002)
+
+    blocks = list(ParallelBackfiller(make_manager(flaky, steady)).backfill(0, 39))
+
+    assert [b.number for b in blocks] == list(range(40))
+    assert any(numbers[0] == 0 for numbers in steady.requested)
+
+
+def test_backfill_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(config, "BACKFILL_CHUNK_SIZE", 10)
+    monkeypatch.setattr(config, "BACKFILL_MAX_ATTEMPTS", 2)
+    manager = make_manager(make_client("A", 0.001, fail_on={0}))
+
+    with pytest.raises(RuntimeError, match="failed after 2 attempts"):
+        list(ParallelBackfiller(manager).backfill(0, 9))
+
+
+def test_backfill_requires_healthy_provider():
+    client = make_client("A")
+    client.health.is_healthy = False
+
+    with pytest.raises(RuntimeError, match="No healthy providers available"):
+        list(ParallelBackfiller(make_manager(client)).backfill(0, 9))
+
+
+def test_backfill_progress_reports_rate_and_eta(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("core.backfill.time.monotonic", lambda: now[0])
+    progress = BackfillProgress(1001, interval=60)
+
+    now[0] += 10
+    progress.update(3000, 11000)
+
+    assert progress.done == 2000
+    assert progress.rate == 200
+    assert progress.eta == 40
+    assert progress.summary() == (
+        "Backfill #3000/#11000 (20.0%) 200 blocks/s, ETA 0:00:40"
+    )
+
+
+def bulk_streamer(heads, *clients):
+    manager = make_manager(*clients)
+    manager.get_client.return_value = clients[0]
+    clients[0].get_latest_block_number.side_effect = heads
+    for client in clients:
+        client.log_blocks = True
+
+    streamer = BlockStreamer(hotswap_manager=manager, checkpoint=None)
+    streamer.processed = []
+    streamer._process = lambda client, block: streamer.processed.append(block.number)
+    return streamer
+
+
+def test_bulk_backfill_hands_over_near_the_head(monkeypatch):
+    monkeypatch.setattr(config, "BULK_CHUNK_SIZE", 25)
+    monkeypatch.setattr(config, "BULK_HANDOFF_DISTANCE", 5)
+    # The head keeps moving while the backfill runs
+    streamer = bulk_streamer(
+        [300, 340, 343], make_client("A", 0.001), make_client("B", 0.001)
+    )
+
+    streamer.bulk_backfill(100)
+
+    assert streamer.processed == list(range(100, 341))
+    assert streamer.last_block == 340
+    assert all(c.log_blocks for c in streamer.manager.clients.values())
+
+
+def test_bulk_backfill_stops_at_end_block(monkeypatch):
+    monkeypatch.setattr(config, "BULK_CHUNK_SIZE", 25)
+    streamer = bulk_streamer([500, 500], make_client("A", 0.001))
+
+    streamer.bulk_backfill(100, 199)
+
+    assert streamer.processed == list(range(100, 200))
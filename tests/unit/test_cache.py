@@ -0,0 +1,71 @@
+from unittest.mock import Mock
+
+from hexbytes import HexBytes
+
+from core.cache import BlockCache
+from core.w3_client import W3Client
+from models.block import to_hex
+
+
+def raw(number, block_hash, parent_hash):
+    return {"number": number, "hash": block_hash, "parentHash": parent_hash}
+
+
+def test_cache_lookup_by_number_and_hash():
+    cache = BlockCache(capacity=4)
+    cache.put(raw(1, "0xa1", "0xa0"))
+
+    assert cache.get(1)["hash"] == "0xa1"
+    assert cache.get_by_hash("0xA1")["number"] == 1
+    assert cache.get(2) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = BlockCache(capacity=2)
+    cache.put(raw(1, "0xa1", "0xa0"))
+    cache.put(raw(2, "0xa2", "0xa1"))
+    cache.get(1)
+    cache.put(raw(3, "0xa3", "0xa2"))
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get_by_hash("0xa2") is None
+    assert cache.get(1) is not None
+
+
+def test_cache_drops_stale_descendants_on_reorg():
+    cache = BlockCache(capacity=10)
+    for number in range(1, 5):
+        cache.put(raw(number, f"0xa{number}", f"0xa{number - 1}"))
+
+    # Block 3 on the canonical branch builds on b2, not a2
+    cache.put(raw(3, "0xb3", "0xb2"))
+
+    assert cache.reorgs == 1
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.get(4) is None
+    assert cache.get(3)["hash"] == "0xb3"
+    assert cache.get_by_hash("0xa4") is None
+
+
+def test_to_hex_normalizes_hexbytes():
+    assert to_hex(HexBytes("0xABCD")) == "0xabcd"
+    assert to_hex("abcd") == "0xabcd"
+    assert to_hex(None) is None
+
+
+def test_client_serves_cached_blocks(mock_provider):
+    client = W3Client(mock_provider)
+    client.w3 = Mock()
+    client.batch_supported = False
+    client.w3.eth.get_block.side_effect = lambda n, **_: raw(n, f"0x{n}", f"0x{n - 1}")
+    client.cache = BlockCache()
+
+    client.get_block(10)
+    blocks = client.get_blocks([9, 10, 11])
+
+    assert [b["number"] for b in blocks] == [9, 10, 11]
+    assert client.w3.eth.get_block.call_count == 3
+    assert client.cache.hits == 1
@@ -0,0 +1,93 @@
+from unittest.mock import Mock
+
+import pytest
+
+from core.checkpoint import (
+    FileCheckpointStore,
+    SqliteCheckpointStore,
+    create_checkpoint_store,
+)
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def store_factory(request, tmp_path):
+    path = str(tmp_path / f"checkpoint.{request.param}")
+    cls = SqliteCheckpointStore if request.param == "sqlite" else FileCheckpointStore
+
+    def make(**kwargs):
+        return cls(path, **kwargs)
+
+    return make
+
+
+def test_checkpoint_empty_store(store_factory):
+    store = store_factory()
+    assert store.load() is None
+    store.close()
+
+
+def test_checkpoint_group_commit(store_factory):
+    store = store_factory(commit_blocks=3, commit_interval_ms=60_000)
+    store.load()
+
+    store.commit(10)
+    store.commit(11)
+    assert store.committed is None
+
+    store.commit(12)
+    assert store.committed == 12
+
+    store.commit(13)
+    store.close()
+
+    # close() flushes the pending block and a new store sees it
+    assert store_factory().load() == 13
+
+
+def test_checkpoint_time_based_flush(store_factory):
+    store = store_factory(commit_blocks=1000, commit_interval_ms=0)
+    store.commit(42)
+    assert store.committed == 42
+    store.close()
+
+
+def test_file_checkpoint_ignores_torn_write(tmp_path):
+    path = tmp_path / "checkpoint.log"
+    path.write_bytes(b"100\n200\n30")
+
+    store = FileCheckpointStore(str(path), commit_blocks=1)
+    assert store.load() == 200
+
+    store.commit(201)
+    store.close()
+    assert path.read_bytes() == b"100\n200\n201\n"
+
+
+def test_create_checkpoint_store(tmp_path):
+    assert create_checkpoint_store(None) is None
+    with pytest.raises(ValueError):
+        create_checkpoint_store("redis", str(tmp_path / "x"))
+
+
+def test_streamer_resumes_from_checkpoint(tmp_path):
+    store = SqliteCheckpointStore(str(tmp_path / "cp.db"), commit_blocks=1)
+    store.commit(990)
+
+    streamer = BlockStreamer(hotswap_manager=Mock(), checkpoint=store)
+    assert streamer._resume_point(current_block=1000) == 990
+
+    client = Mock()
+    client.get_blocks.side_effect = lambda numbers: [
+        {"number": n, "timestamp": 0, "transactions": []} for n in numbers
+    ]
+    client.validate_block.side_effect = BlockHeader.from_raw
+
+    streamer.last_block = 990
+    streamer._catch_up(client, 1000)
+
+    processed = [c.args[0].number for c in client.process_block.call_args_list]
+    assert processed == list(range(991, 1001))
+    assert store.committed == 1000
+    store.close()
@@ -0,0 +1,244 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.coordination import Coordinator, SqliteLeaseStore
+from core.logs import LogStream
+from core.pipeline import SinkPipeline
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.coordination.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "leases.db")
+
+
+def test_workers_claim_disjoint_ranges(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    assert store.add_range(1, 250) == 3
+    assert store.add_range(1, 250) == 0
+
+    # A second connection stands in for another process
+    a, b = Coordinator(store, "a"), Coordinator(SqliteLeaseStore(path), "b")
+    first, second = a.claim(), b.claim()
+
+    assert (first.start, first.end) == (1, 100)
+    assert (second.start, second.end) == (101, 200)
+    assert a.complete(first)
+    assert store.remaining() == 2
+
+
+def test_expired_lease_is_reclaimed_and_fenced(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 100)
+    a, b = Coordinator(store, "a", ttl=30), Coordinator(store, "b", ttl=30)
+
+    lease = a.claim()
+    assert b.claim() is None
+
+    clock[0] += 31
+    reclaimed = b.claim()
+    assert (reclaimed.start, reclaimed.attempts) == (1, 2)
+
+    # The original owner learns it lost the range on its next heartbeat
+    a.heartbeat()
+    assert not a.holds(lease)
+    assert not store.complete(lease)
+    assert b.complete(reclaimed)
+
+
+def test_single_leader_until_its_lease_expires(path, clock):
+    store = SqliteLeaseStore(path)
+    a, b = Coordinator(store, "a", ttl=30), Coordinator(store, "b", ttl=30)
+
+    a.heartbeat()
+    b.heartbeat()
+    assert a.is_leader and not b.is_leader
+
+    a.cursor = 500
+    a.heartbeat()
+    assert store.cursor() == 500
+
+    clock[0] += 31
+    b.heartbeat()
+    a.heartbeat()
+    assert b.is_leader and not a.is_leader
+    assert a.cursor is None
+    assert store.cursor() == 500
+
+
+def test_close_releases_leases_and_resigns(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 100)
+    a, b = Coordinator(store, "a"), Coordinator(store, "b")
+    a.heartbeat()
+    a.claim()
+    a.cursor = 42
+
+    a.close()
+    b.heartbeat()
+
+    assert b.is_leader
+    assert b.claim().start == 1
+    assert store.cursor() == 42
+
+
+def make_block(number):
+    return BlockHeader.from_raw(
+        {
+            "number": number,
+            "timestamp": number,
+            "transactions": [],
+            "hash": f"0x{number}",
+            "parentHash": f"0x{number - 1}",
+        }
+    )
+
+
+def test_leader_leases_out_the_gap_and_followers_ingest_it(path, clock):
+    store = SqliteLeaseStore(path)
+    leader, follower = Coordinator(store, "a"), Coordinator(store, "b")
+    leader.heartbeat()
+    follower.heartbeat()
+
+    client = Mock()
+    client.get_blocks.side_effect = lambda numbers: numbers
+    client.validate_block.side_effect = make_block
+    streamer = BlockStreamer(hotswap_manager=Mock(), coordinator=leader)
+    streamer.history.size = 10
+    streamer.last_block = 0
+
+    streamer._catch_up(client, 1000)
+
+    # Only the reorg window was streamed live; the rest is up for lease
+    assert streamer.last_block == 1000
+    assert client.process_block.call_count == 10
+    assert store.remaining() == 1
+
+    with patch("core.streamer.ParallelBackfiller") as backfiller:
+        backfiller.return_value.backfill.side_effect = lambda start, end: map(
+            make_block, range(start, end + 1)
+        )
+        worker = BlockStreamer(hotswap_manager=Mock(), coordinator=follower)
+        assert worker.work_lease(client)
+        assert not worker.work_lease(client)
+
+    assert client.process_block.call_count == 1000
+    assert store.remaining() == 0
+
+
+def test_release_with_progress_gives_back_only_the_rest(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 100)
+    a, b = Coordinator(store, "a"), Coordinator(store, "b")
+
+    a.release(a.claim(), next_start=41)
+
+    lease = b.claim()
+    assert (lease.start, lease.end) == (41, 100)
+    assert b.complete(lease)
+    assert store.remaining() == 0
+
+
+def test_lease_blocks_carry_logs_and_transactions(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 3)
+    worker = BlockStreamer(
+        hotswap_manager=Mock(),
+        coordinator=Coordinator(store, "a"),
+        logs=LogStream(["0xa"]),
+        full_transactions=True,
+    )
+
+    client = Mock()
+    client.get_full_block.side_effect = lambda n: Mock(
+        header=make_block(n), transactions=lambda: iter([{"tx": n}])
+    )
+    client.get_logs.side_effect = lambda *args, from_block, to_block, **kwargs: [
+        {"blockNumber": n, "blockHash": f"0x{n}"}
+        for n in range(from_block, to_block + 1)
+    ]
+    events = []
+    client.process_log.side_effect = lambda b, log: events.append(("log", b.number))
+    client.process_transaction.side_effect = lambda b, tx: events.append(
+        ("tx", b.number)
+    )
+    client.process_block.side_effect = lambda b: events.append(("block", b.number))
+
+    assert worker.work_lease(client)
+
+    assert events == [(kind, n) for n in (1, 2, 3) for kind in ("log", "tx", "block")]
+    # The whole lease is confirmed: one range call, none by hash
+    assert client.get_logs.call_count == 1
+
+
+def test_leader_hands_back_the_lease_when_the_head_is_due(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 100)
+    leader = Coordinator(store, "a")
+    client = Mock()
+    streamer = BlockStreamer(hotswap_manager=Mock(), coordinator=leader)
+
+    with patch("core.streamer.ParallelBackfiller") as backfiller:
+        backfiller.return_value.backfill.side_effect = lambda start, end: map(
+            make_block, range(start, end + 1)
+        )
+        assert streamer.work_lease(client, deadline=0)
+
+    assert client.process_block.call_count == 1
+    assert store.claim("b", 30).start == 2
+
+
+def gated_pipeline(gate):
+    sink = Mock()
+    sink.write.side_effect = lambda blocks: gate.wait()
+    return SinkPipeline([sink], batch_interval_ms=0)
+
+
+def test_lease_completes_only_once_its_blocks_are_in_the_sinks(path, clock):
+    store = SqliteLeaseStore(path, range_size=100)
+    store.add_range(1, 3)
+    gate = threading.Event()
+    pipeline = gated_pipeline(gate)
+    worker = BlockStreamer(
+        hotswap_manager=Mock(), pipeline=pipeline, coordinator=Coordinator(store, "a")
+    )
+
+    with patch("core.streamer.ParallelBackfiller") as backfiller:
+        backfiller.return_value.backfill.side_effect = lambda start, end: map(
+            make_block, range(start, end + 1)
+        )
+        assert worker.work_lease(Mock())
+
+    assert store.remaining() == 1
+    gate.set()
+    pipeline.close()
+    assert store.remaining() == 0
+
+
+def test_leader_publishes_the_cursor_once_flushed(path, clock):
+    store = SqliteLeaseStore(path)
+    leader = Coordinator(store, "a")
+    leader.heartbeat()
+    gate = threading.Event()
+    pipeline = gated_pipeline(gate)
+    streamer = BlockStreamer(
+        hotswap_manager=Mock(), pipeline=pipeline, coordinator=leader
+    )
+
+    streamer._emit(Mock(), make_block(1))
+    streamer._publish_cursor(1)
+
+    assert leader.cursor is None
+    gate.set()
+    pipeline.close()
+    assert leader.cursor == 1
@@ -0,0 +1,98 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from core.decode import DecodePool, decode_batch
+from core.streamer import BlockStreamer
+
+
+def rpc_block(number, transactions=2):
+    return {
+        "number": hex(number),
+        "timestamp": hex(1_700_000_000 + number),
+        "hash": f"0x{number:064x}",
+        "parentHash": f"0x{number - 1:064x}",
+        "gasUsed": hex(21_000),
+        "transactions": [f"0x{i:064x}" for i in range(transactions)],
+    }
+
+
+def batch_payload(numbers, reverse=False):
+    responses = [
+        {"jsonrpc": "2.0", "id": i, "result": rpc_block(number)}
+        for i, number in enumerate(numbers)
+    ]
+    if reverse:
+        responses.reverse()
+    return json.dumps(responses).encode()
+
+
+def test_decode_batch_orders_by_request_id():
+    headers = decode_batch(batch_payload([10, 11, 12], reverse=True))
+
+    assert [h.number for h in headers] == [10, 11, 12]
+    assert headers[0].hash == f"0x{10:064x}"
+    assert headers[0].tx_count == 2
+    assert headers[0].gas_used == 21_000
+
+
+def test_decode_batch_rejects_errors_and_malformed_blocks():
+    error = json.dumps([{"id": 0, "error": {"message": "boom"}}]).encode()
+    with pytest.raises(ValueError, match="boom"):
+        decode_batch(error)
+
+    with pytest.raises(LookupError):
+        decode_batch(json.dumps([{"id": 0, "result": None}]).encode())
+
+    block = rpc_block(1)
+    block["transactions"] = ["0x1234"]
+    with pytest.raises(ValueError, match="transaction hash"):
+        decode_batch(json.dumps([{"id": 0, "result": block}]).encode())
+
+
+def test_decode_batch_rejects_missing_or_unexpected_blocks():
+    assert len(decode_batch(batch_payload([10, 11]), [10, 11])) == 2
+
+    with pytest.raises(ValueError, match="Expected 3 blocks"):
+        decode_batch(batch_payload([10, 11]), [10, 11, 12])
+    with pytest.raises(ValueError, match="Expected block #11"):
+        decode_batch(batch_payload([10, 12]), [10, 11])
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_pool_results_match_inline_decoding(kind):
+    pool = DecodePool(kind, workers=2)
+    try:
+        payloads = [batch_payload(range(n, n + 5)) for n in range(1, 30, 5)]
+        futures = [pool.submit(payload) for payload in payloads]
+        results = [[h.number for h in f.result()] for f in futures]
+    finally:
+        pool.close()
+
+    assert results == [[h.number for h in decode_batch(p)] for p in payloads]
+
+
+def test_unknown_pool_kind_is_rejected():
+    with pytest.raises(ValueError):
+        DecodePool("fiber")
+
+
+def test_streamer_emits_decoded_batches_in_order(monkeypatch):
+    monkeypatch.setattr("config.BATCH_SIZE", 3)
+    client = Mock()
+    client.get_raw_blocks.side_effect = batch_payload
+    emitted = []
+    client.process_block.side_effect = lambda b: emitted.append(b.number)
+
+    pool = DecodePool("thread", workers=2)
+    try:
+        streamer = BlockStreamer(Mock(), decoder=pool)
+        streamer.last_block = 100
+        streamer._catch_up(client, 110)
+    finally:
+        pool.close()
+
+    assert emitted == list(range(101, 111))
+    assert client.get_raw_blocks.call_count == 4
+    assert streamer.last_block == 110
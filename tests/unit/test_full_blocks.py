@@ -0,0 +1,193 @@
+import json
+import tracemalloc
+from unittest.mock import Mock
+
+import pytest
+
+from core.full_blocks import decode_full_block, full_block_from_response
+from core.pipeline import SinkPipeline
+from core.streamer import BlockStreamer
+
+
+def transaction(i):
+    return {
+        "hash": f"0x{i:064x}",
+        "from": "0x" + "ab" * 20,
+        "input": "0x" + "00" * 64,
+        "memo": "é✓",
+    }
+
+
+def response(number=100, transactions=3, **extra):
+    block = {
+        "baseFeePerGas": hex(7),
+        "gasLimit": hex(30_000_000),
+        "gasUsed": hex(1_000),
+        "hash": f"0x{number:064x}",
+        "number": hex(number),
+        "parentHash": f"0x{number - 1:064x}",
+        "timestamp": hex(1_700_000_000),
+        "transactions": [transaction(i) for i in range(transactions)],
+        "transactionsRoot": "0x" + "11" * 32,
+        "uncles": [],
+    }
+    block.update(extra)
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": block}).encode()
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 16])
+def test_decodes_header_and_transactions_across_chunk_boundaries(size):
+    full = decode_full_block(chunked(response(), size))
+
+    assert full.header.number == 100
+    assert full.header.hash == f"0x{100:064x}"
+    assert full.header.base_fee == 7
+    assert list(full.transactions()) == [transaction(i) for i in range(3)]
+    assert full.header.tx_count == 3
+
+
+def test_block_without_transactions():
+    full = decode_full_block([response(transactions=0)])
+    assert list(full.transactions()) == []
+    assert full.header.tx_count == 0
+
+
+def test_rpc_error_and_missing_block_raise_and_close():
+    close = Mock()
+    error = json.dumps({"id": 1, "error": {"code": -32000, "message": "boom"}})
+    with pytest.raises(ValueError, match="boom"):
+        decode_full_block([error.encode()], on_close=close)
+    close.assert_called_once()
+
+    with pytest.raises(LookupError):
+        decode_full_block([b'{"id": 1, "result": null}'])
+
+
+def test_parsed_response_matches_streamed_decode():
+    streamed = decode_full_block([response()])
+    parsed = full_block_from_response(json.loads(response()))
+
+    assert list(parsed.transactions()) == list(streamed.transactions())
+    assert parsed.header.to_dict() == streamed.header.to_dict()
+
+    with pytest.raises(LookupError):
+        full_block_from_response({"id": 1, "result": None})
+
+
+def test_header_fields_must_precede_transactions():
+    data = b'{"result": {"transactions": [], "number": "0x1"}}'
+    with pytest.raises(ValueError, match="precede"):
+        decode_full_block([data])
+
+
+def test_closes_response_after_iteration():
+    close = Mock()
+    full = decode_full_block(chunked(response(), 64), on_close=close)
+    list(full.transactions())
+    close.assert_called_once()
+
+
+def test_peak_memory_does_not_grow_with_block_size():
+    def stream(count):
+        head = response(transactions=0).split(b'"transactions": []')[0]
+        yield head + b'"transactions": ['
+        for i in range(count):
+            yield (b"," if i else b"") + json.dumps(transaction(i)).encode()
+        yield b"]}}"
+
+    def peak(count):
+        tracemalloc.start()
+        for _ in decode_full_block(stream(count)).transactions():
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    assert peak(20_000) < peak(200) * 2
+
+
+def test_streamer_hands_transactions_over_before_the_block():
+    client = Mock()
+    client.get_full_block.side_effect = lambda n: decode_full_block(
+        [response(number=n, transactions=2)]
+    )
+    events = []
+    client.process_transaction.side_effect = lambda b, tx: events.append(
+        ("tx", b.number)
+    )
+    client.process_block.side_effect = lambda b: events.append(("block", b.number))
+
+    streamer = BlockStreamer(Mock(), full_transactions=True)
+    streamer.last_block = 100
+    streamer._catch_up(client, 102)
+
+    assert events == [("tx", 101), ("tx", 101), ("block", 101)] + [
+        ("tx", 102),
+        ("tx", 102),
+        ("block", 102),
+    ]
+    assert streamer.last_block == 102
+
+
+def test_block_failing_mid_response_is_reverted_downstream():
+    def broken(n):
+        data = response(number=n, transactions=3)
+        yield data[: len(data) // 2]
+        raise ConnectionError("connection reset")
+
+    client = Mock()
+    client.get_full_block.side_effect = lambda n: decode_full_block(broken(n))
+    events = []
+    client.process_transaction.side_effect = lambda b, tx: events.append("tx")
+    client.revert_block.side_effect = lambda n, h: events.append(("revert", n, h))
+    streamer = BlockStreamer(Mock(), full_transactions=True)
+    streamer.last_block = 100
+
+    with pytest.raises(ConnectionError):
+        streamer._catch_up(client, 101)
+
+    # Whatever went out ahead of the break is withdrawn before the retry
+    assert "tx" in events
+    assert events[-1] == ("revert", 101, f"0x{101:064x}")
+    client.process_block.assert_not_called()
+    assert streamer.last_block == 100
+
+
+def test_retry_after_a_broken_block_reaches_the_sinks_once():
+    attempts = []
+
+    def chunks(n):
+        data = response(number=n, transactions=3)
+        attempts.append(n)
+        if len(attempts) == 1:
+            yield data[: len(data) // 2]
+            raise ConnectionError("connection reset")
+        yield data
+
+    client = Mock()
+    client.get_full_block.side_effect = lambda n: decode_full_block(chunks(n))
+    sink = Mock()
+    pipeline = SinkPipeline([sink], batch_size=100, batch_interval_ms=60_000)
+    streamer = BlockStreamer(Mock(), pipeline=pipeline, full_transactions=True)
+    streamer.last_block = 100
+
+    with pytest.raises(ConnectionError):
+        streamer._catch_up(client, 101)
+    streamer._catch_up(client, 101)
+    pipeline.close()
+
+    calls = [call[0] for call in sink.method_calls]
+    revert = calls.index("revert")
+    assert "write_transactions" in calls[:revert]
+    written = [
+        tx["hash"]
+        for name, args, _ in sink.method_calls[revert:]
+        if name == "write_transactions"
+        for tx in args[1]
+    ]
+    assert written == [transaction(i)["hash"] for i in range(3)]
+    assert calls[-2:] == ["write", "close"]
@@ -0,0 +1,181 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.group import StreamerGroup, chain_path
+from helpers import load_chains
+from models.provider import Provider
+
+MULTI_CHAIN = """
+chains:
+  ethereum:
+    a: {name: "A", url: "https://eth-a.test"}
+    b: {name: "B", url: "https://eth-b.test"}
+  polygon:
+    a: {name: "A", url: "https://poly-a.test"}
+    c: {name: "C", url: "https://poly-c.test"}
+"""
+
+SINGLE_CHAIN = """
+providers:
+  a: {name: "A", url: "https://eth-a.test"}
+  b: {name: "B", url: "https://eth-b.test"}
+"""
+
+
+def write(tmp_path, text):
+    path = tmp_path / "providers.yml"
+    path.write_text(text)
+    return str(path)
+
+
+def test_load_chains_groups_providers_by_chain(tmp_path):
+    chains = load_chains(write(tmp_path, MULTI_CHAIN))
+
+    assert list(chains) == ["ethereum", "polygon"]
+    assert [p.url for p in chains["polygon"]] == [
+        "https://poly-a.test",
+        "https://poly-c.test",
+    ]
+    assert {p.chain for p in chains["ethereum"]} == {"ethereum"}
+
+
+def test_load_chains_reads_single_chain_config_as_default(tmp_path):
+    chains = load_chains(write(tmp_path, SINGLE_CHAIN))
+
+    assert list(chains) == ["default"]
+    assert [p.name for p in chains["default"]] == ["A", "B"]
+
+
+def test_load_chains_requires_two_providers_per_chain(tmp_path):
+    text = MULTI_CHAIN.replace('    c: {name: "C", url: "https://poly-c.test"}\n', "")
+
+    with pytest.raises(ValueError, match="polygon"):
+        load_chains(write(tmp_path, text))
+
+
+def test_chain_path():
+    assert chain_path("checkpoint.db", "default") == "checkpoint.db"
+    assert chain_path("data/checkpoint.db", "polygon") == "data/checkpoint.polygon.db"
+
+
+@pytest.fixture
+def chains():
+    return {
+        chain: [
+            Provider(url=f"https://{chain}-{i}.test", name=f"P{i}", chain=chain)
+            for i in range(2)
+        ]
+        for chain in ("fast", "slow")
+    }
+
+
+def test_slow_chain_does_not_stall_the_others(chains):
+    released = threading.Event()
+    streamed = []
+
+    def create_manager(providers, sessions):
+        if providers[0].chain == "slow":
+            released.wait(5)
+        manager = Mock()
+        manager.clients = {}
+        manager.sessions = sessions
+        return manager
+
+    def create_streamer(manager, checkpoint, chain, **kwargs):
+        streamer = Mock()
+        streamer.stream.side_effect = lambda: streamed.append((chain, manager))
+        return streamer
+
+    with (
+        patch("core.group.HotswapManager", side_effect=create_manager),
+        patch("core.group.BlockStreamer", side_effect=create_streamer),
+    ):
+        group = StreamerGroup(chains, checkpoint_backend=None)
+        group.start()
+
+        deadline = time.monotonic() + 5
+        while not streamed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [chain for chain, _ in streamed] == ["fast"]
+
+        released.set()
+        group.threads["slow"].join(5)
+        group.stop(timeout=5)
+
+    assert sorted(chain for chain, _ in streamed) == ["fast", "slow"]
+    # Every chain shares the group's connection pools
+    sessions = {id(s) for _, m in streamed for s in m.sessions.values()}
+    assert sessions == {id(s) for s in group.sessions.values()}
+
+
+def test_group_retries_chains_that_fail_to_connect(chains, monkeypatch):
+    monkeypatch.setattr("config.PROVIDER_RECOVERY_TIME", 0)
+    attempts = []
+
+    def create_manager(providers, sessions):
+        attempts.append(providers[0].chain)
+        if attempts.count("slow") < 3 and providers[0].chain == "slow":
+            raise RuntimeError("No healthy providers available")
+        return Mock(clients={})
+
+    with (
+        patch("core.group.HotswapManager", side_effect=create_manager),
+        patch("core.group.BlockStreamer"),
+    ):
+        group = StreamerGroup(chains, checkpoint_backend=None)
+        group.start()
+        for thread in group.threads.values():
+            thread.join(5)
+        group.stop()
+
+    assert attempts.count("slow") == 3
+    assert set(group.streamers) == {"fast", "slow"}
+
+
+def test_providers_keep_their_own_pool_settings():
+    providers = [
+        Provider(url="https://a.test", name="A", pool={"pool_size": 4}),
+        Provider(url="https://b.test", name="B", pool={"pool_size": 32}),
+    ]
+    group = StreamerGroup({"default": providers}, checkpoint_backend=None)
+
+    with patch("core.group.HotswapManager") as manager:
+        group._connect("default")
+    sessions = manager.call_args.kwargs["sessions"]
+    group.stop()
+
+    assert sessions["A"].get_adapter("https://a.test")._pool_maxsize == 4
+    assert sessions["B"].get_adapter("https://b.test")._pool_maxsize == 32
+
+
+def test_each_chain_gets_its_own_sinks_and_log_stream(chains, tmp_path, monkeypatch):
+    monkeypatch.setattr("config.JSONL_SINK_PATH", str(tmp_path / "blocks.jsonl"))
+    created = {}
+
+    def create_streamer(manager, checkpoint, chain, **kwargs):
+        created[chain] = kwargs
+        return Mock()
+
+    with (
+        patch("core.group.HotswapManager", return_value=Mock(clients={})),
+        patch("core.group.BlockStreamer", side_effect=create_streamer),
+    ):
+        group = StreamerGroup(
+            chains, checkpoint_backend=None, sinks=["jsonl"], log_addresses=["0xa"]
+        )
+        group.start()
+        for thread in group.threads.values():
+            thread.join(5)
+        group.stop()
+
+    fast, slow = created["fast"], created["slow"]
+    assert fast["pipeline"] is not slow["pipeline"]
+    assert fast["logs"] is not slow["logs"]
+    assert fast["logs"].addresses == ["0xa"]
+    assert {p.name for p in tmp_path.iterdir()} == {
+        "blocks.fast.jsonl",
+        "blocks.slow.jsonl",
+    }
@@ -0,0 +1,140 @@
+import pytest
+
+import config
+from core.health import CLOSED, HALF_OPEN, OPEN, LatencySketch, ProviderHealth
+
+
+def test_latency_sketch_percentiles():
+    sketch = LatencySketch(window=100)
+    for i in range(1, 101):
+        sketch.record(i / 1000)
+
+    assert len(sketch) == 100
+    assert 0.050 <= sketch.percentile(50) <= 0.050 * 1.25
+    assert 0.095 <= sketch.percentile(95) <= 0.095 * 1.25
+    assert 0.099 <= sketch.percentile(99) <= 0.099 * 1.25
+
+
+def test_latency_sketch_rolls_window():
+    sketch = LatencySketch(window=10)
+    for _ in range(10):
+        sketch.record(5.0)
+    for _ in range(10):
+        sketch.record(0.01)
+
+    assert len(sketch) == 10
+    assert sketch.percentile(99) <= 0.01 * 1.25
+    assert sum(sketch._buckets) == 10
+
+
+def test_latency_sketch_ewma():
+    sketch = LatencySketch(alpha=0.5)
+    assert sketch.percentile(50) is None
+
+    sketch.record(1.0)
+    sketch.record(3.0)
+    assert sketch.ewma == 2.0
+
+
+def test_provider_health_score_accounts_for_errors():
+    fast_flaky, slow_steady = ProviderHealth("A"), ProviderHealth("B")
+    assert fast_flaky.score == float("inf")
+
+    fast_flaky.record_response_time(0.1)
+    slow_steady.record_response_time(0.15)
+    for _ in range(10):
+        fast_flaky.record_error()
+
+    assert fast_flaky.error_rate > 0.8
+    assert fast_flaky.score > slow_steady.score
+
+
+def test_provider_health_slow_ewma_is_unhealthy():
+    health = ProviderHealth("A")
+    health.record_response_time(config.PROVIDER_TIMEOUT)
+
+    assert not health.is_healthy
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.health.time.monotonic", lambda: now[0])
+    monkeypatch.setattr(config, "BREAKER_OPEN_MIN", 2)
+    monkeypatch.setattr(config, "BREAKER_OPEN_MAX", 5)
+    return now
+
+
+def test_breaker_opens_when_failures_reach_threshold(clock):
+    health = ProviderHealth("A")
+    health.block_failures += 1
+    assert health.is_healthy
+
+    health.block_failures += 1
+    assert health.state is OPEN
+    assert not health.is_healthy
+    assert not health.probe_due
+
+
+def test_breaker_closes_after_successful_probe(clock):
+    health = ProviderHealth("A")
+    health.connection_failures = config.CONNECTION_FAILURE_THRESHOLD
+
+    clock[0] += 2
+    assert health.probe_due
+    assert health.begin_probe()
+    assert not health.begin_probe()  # one probe at a time
+    assert health.state is HALF_OPEN and not health.is_healthy
+
+    health.probe_succeeded(0.05)
+    assert health.state is CLOSED
+    assert health.connection_failures == 0
+
+
+def test_only_the_probe_decides_a_half_open_breaker(clock):
+    health = ProviderHealth("A")
+    health.block_failures = config.BLOCK_FAILURE_THRESHOLD
+    clock[0] += 2
+    health.begin_probe()
+
+    # Calls that were in flight when the breaker opened finish now
+    health.record_error()
+    health.record_response_time(0.05)
+    assert health.state is HALF_OPEN
+
+    health.probe_failed()
+    assert health.state is OPEN
+
+
+def test_failed_probes_back_off_exponentially(clock):
+    health = ProviderHealth("A")
+    health.block_failures = config.BLOCK_FAILURE_THRESHOLD
+
+    for expected in (4, 5, 5):
+        clock[0] += health.open_duration
+        assert health.begin_probe()
+        health.probe_failed()
+        assert health.state is OPEN
+        assert health.open_duration == expected
+
+    # A success resets the backoff
+    clock[0] += health.open_duration
+    health.begin_probe()
+    health.probe_succeeded(0.05)
+    assert health.open_duration == 2
+
+
+def test_slow_probe_keeps_breaker_open(clock):
+    health = ProviderHealth("A")
+    health.record_response_time(config.PROVIDER_TIMEOUT)
+
+    clock[0] += 2
+    health.begin_probe()
+    health.probe_succeeded(config.PROVIDER_TIMEOUT)
+    assert health.state is OPEN
+
+    clock[0] += health.open_duration
+    health.begin_probe()
+    health.probe_succeeded(0.05)
+    assert health.is_healthy
+    assert health.avg_response_time == 0.05
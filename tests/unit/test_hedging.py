@@ -0,0 +1,185 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+import config
+from core.health import ProviderHealth, measure_time
+from core.hedging import HedgeBudget, HedgedClient, hedge_delay, hedged_call
+from core.hotswap import HotswapManager
+from core.w3_client import W3Client
+from models.provider import Provider
+
+
+def make_client(name, delay, result=None, error=None):
+    client = Mock()
+    client.provider.name = name
+    client.health = ProviderHealth(name)
+    client.health.record_response_time(0.01)
+
+    def get_block(block_number):
+        time.sleep(delay)
+        if error:
+            raise error
+        return result or {"number": block_number, "from": name}
+
+    client.get_block.side_effect = get_block
+    return client
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_fast_primary_is_not_hedged(executor):
+    primary, backup = make_client("P", 0), make_client("B", 0)
+    budget = HedgeBudget(ratio=0, burst=1)
+
+    result = hedged_call(executor, primary, backup, budget, "get_block", 1)
+
+    assert result["from"] == "P"
+    backup.get_block.assert_not_called()
+    assert budget.spent == 0
+
+
+def test_slow_primary_loses_to_backup(executor):
+    primary, backup = make_client("P", 0.5), make_client("B", 0)
+    budget = HedgeBudget(ratio=0, burst=1)
+
+    start = time.time()
+    result = hedged_call(executor, primary, backup, budget, "get_block", 1)
+
+    assert result["from"] == "B"
+    assert time.time() - start < 0.4
+    assert budget.spent == 1
+
+
+def test_exhausted_budget_waits_for_primary(executor):
+    primary, backup = make_client("P", 0.2), make_client("B", 0)
+    budget = HedgeBudget(ratio=0, burst=0)
+
+    result = hedged_call(executor, primary, backup, budget, "get_block", 1)
+
+    assert result["from"] == "P"
+    backup.get_block.assert_not_called()
+
+
+def test_failed_hedge_falls_back_to_primary(executor):
+    primary = make_client("P", 0.2)
+    backup = make_client("B", 0, error=ConnectionError("down"))
+
+    result = hedged_call(
+        executor, primary, backup, HedgeBudget(burst=1), "get_block", 1
+    )
+
+    assert result["from"] == "P"
+
+
+class TimedClient:
+    """Client whose get_block records its outcome through measure_time."""
+
+    budget = None
+
+    def __init__(self, name, delay, error=None):
+        self.provider = Mock(chain="default")
+        self.provider.name = name
+        self.health = ProviderHealth(name)
+        self.health.record_response_time(0.01)
+        self.delay = delay
+        self.error = error
+
+    @measure_time
+    def get_block(self, block_number):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"number": block_number, "from": self.provider.name}
+
+
+def test_abandoned_loser_does_not_touch_health():
+    primary = TimedClient("P", 0.3, error=TimeoutError("late"))
+    backup = TimedClient("B", 0)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = hedged_call(
+            pool, primary, backup, HedgeBudget(burst=1), "get_block", 1
+        )
+    # Leaving the pool waited for the primary to time out
+
+    assert result["from"] == "B"
+    assert primary.health.error_rate == 0
+    # Only the hedge's lower bound on the primary's time was recorded
+    assert len(primary.health.latency) == 2
+    assert primary.health.latency.ewma > 0.01
+
+
+def test_abandoned_w3_client_failures_do_not_open_the_breaker(monkeypatch):
+    monkeypatch.setattr(config, "BLOCK_FAILURE_THRESHOLD", 2)
+    primary = W3Client(Provider(url="https://p.test", name="P", type="http"))
+    primary.w3 = Mock()
+    primary.health.record_response_time(0.01)
+
+    def late_failure(*args, **kwargs):
+        time.sleep(0.3)
+        raise TimeoutError("late")
+
+    primary.w3.eth.get_block.side_effect = late_failure
+    backup = TimedClient("B", 0)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for _ in range(2):
+            result = hedged_call(
+                pool, primary, backup, HedgeBudget(burst=1), "get_block", 1
+            )
+            assert result["from"] == "B"
+
+    assert primary.health.block_failures == 0
+    assert primary.health.is_healthy
+    primary.close()
+
+
+def test_hedge_earns_only_on_the_primary_budget():
+    manager = Mock(hedge_budgets={"P": HedgeBudget(0.5, 2), "B": HedgeBudget(0.5, 2)})
+    manager.hedge_budgets["P"].tokens = manager.hedge_budgets["B"].tokens = 0
+    manager._hedge_target.return_value = None
+    primary = make_client("P", 0)
+
+    HotswapManager.hedge(manager, primary, "get_block", 1)
+
+    assert manager.hedge_budgets["P"].tokens == 0.5
+    assert manager.hedge_budgets["B"].tokens == 0
+
+
+def test_hedge_delay_uses_percentile(monkeypatch):
+    health = ProviderHealth("P")
+    client = Mock(health=health)
+    assert hedge_delay(client, "get_block") == 1.0
+
+    for duration in (0.1, 0.2, 0.3, 0.4, 0.9):
+        health.record_response_time(duration)
+    # Percentiles come from log buckets, so expect the 0.9s bucket bound
+    assert 0.9 <= hedge_delay(client, "get_block") <= 0.9 * 1.25
+
+
+def test_budget_earns_up_to_burst():
+    budget = HedgeBudget(ratio=0.5, burst=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.earn()
+    assert not budget.try_spend()
+    budget.earn()
+    budget.earn()
+    assert budget.tokens == 1
+
+
+def test_hedged_client_delegates():
+    primary, manager = Mock(), Mock()
+    proxy = HedgedClient(primary, manager)
+
+    proxy.get_block(5)
+    manager.hedge.assert_called_once_with(primary, "get_block", 5)
+    assert proxy.provider is primary.provider
@@ -1,7 +1,11 @@
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 
+import config
+from core.health import ProviderHealth
+from core.hedging import HedgedClient
 from core.hotswap import HotswapManager
 from models.provider import Provider
 
@@ -18,10 +22,16 @@ def mock_providers():
 def mock_w3_client():
     with patch("core.hotswap.W3Client") as mock:
 
-        def create_instance(provider):
+        def create_instance(provider, **kwargs):
             client_instance = Mock()
             client_instance.health.is_healthy = True
+            client_instance.health.probe_due = False
+            client_instance.health.score = 0.1
+            client_instance.budget = None
             client_instance.connect.return_value = None
+            if provider.name != "Provider1":
+                # Connect after Provider1 so it deterministically becomes primary
+                client_instance.connect.side_effect = lambda: time.sleep(0.05)
             client_instance.provider = provider
             return client_instance
 
@@ -29,8 +39,14 @@ def mock_w3_client():
         yield mock
 
 
+def connected_manager(providers, **kwargs):
+    manager = HotswapManager(providers, **kwargs)
+    manager.wait_for_providers()
+    return manager
+
+
 def test_hotswap_manager_initialization(mock_providers, mock_w3_client):
-    manager = HotswapManager(mock_providers)
+    manager = connected_manager(mock_providers)
 
     assert manager.providers == mock_providers
     assert len(manager.clients) == 2
@@ -39,7 +55,7 @@ def test_hotswap_manager_initialization(mock_providers, mock_w3_client):
 
 
 def test_hotswap_manager_get_client_healthy(mock_providers, mock_w3_client):
-    manager = HotswapManager(mock_providers)
+    manager = connected_manager(mock_providers)
 
     client = manager.get_client()
 
@@ -48,7 +64,7 @@ def test_hotswap_manager_get_client_healthy(mock_providers, mock_w3_client):
 
 
 def test_hotswap_manager_swap_on_unhealthy(mock_providers, mock_w3_client):
-    manager = HotswapManager(mock_providers)
+    manager = connected_manager(mock_providers)
 
     # Make first provider unhealthy
     manager.clients["Provider1"].health.is_healthy = False
@@ -60,7 +76,7 @@ def test_hotswap_manager_swap_on_unhealthy(mock_providers, mock_w3_client):
 
 
 def test_hotswap_manager_no_healthy_providers(mock_providers, mock_w3_client):
-    manager = HotswapManager(mock_providers)
+    manager = connected_manager(mock_providers)
 
     # Make all providers unhealthy
     for client in manager.clients.values():
@@ -72,7 +88,7 @@ def test_hotswap_manager_no_healthy_providers(mock_providers, mock_w3_client):
 
 def test_hotswap_manager_initialization_failure(mock_providers, mock_w3_client):
     # Setup - all connect attempts will fail
-    def fail_connect(provider):
+    def fail_connect(provider, **kwargs):
         client = Mock()
         client.connect.side_effect = Exception("Connection failed")
         return client
@@ -81,3 +97,100 @@ def test_hotswap_manager_initialization_failure(mock_providers, mock_w3_client):
 
     with pytest.raises(RuntimeError, match="No healthy providers available"):
         HotswapManager(mock_providers)
+
+
+def test_hotswap_manager_hedging_returns_proxy(mock_providers, mock_w3_client):
+    manager = connected_manager(mock_providers, hedging=True)
+
+    client = manager.get_client()
+
+    assert isinstance(client, HedgedClient)
+    assert client.provider.name == "Provider1"
+    assert manager._hedge_target(client.primary).provider.name == "Provider2"
+
+
+def test_hotswap_manager_routes_to_faster_provider(
+    mock_providers, mock_w3_client, monkeypatch
+):
+    monkeypatch.setattr(config, "ROUTING_INTERVAL", 0)
+    manager = connected_manager(mock_providers)
+
+    # Within the hysteresis band the primary keeps the traffic
+    manager.clients["Provider1"].health.score = 0.10
+    manager.clients["Provider2"].health.score = 0.09
+    assert manager.get_client().provider.name == "Provider1"
+
+    manager.clients["Provider2"].health.score = 0.05
+    assert manager.get_client().provider.name == "Provider2"
+
+
+def test_hotswap_manager_refreshes_idle_provider_scores(
+    mock_providers, mock_w3_client, monkeypatch
+):
+    monkeypatch.setattr(config, "ROUTING_INTERVAL", 0)
+    manager = connected_manager(mock_providers)
+    primary, idle = manager.clients["Provider1"], manager.clients["Provider2"]
+
+    # The idle provider got faster since connect(); only a refresh shows it
+    idle.get_latest_block_number.side_effect = lambda: setattr(
+        idle.health, "score", 0.01
+    )
+    manager.get_client()
+    deadline = time.monotonic() + 5
+    while manager._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    primary.get_latest_block_number.assert_not_called()
+    idle.get_latest_block_number.assert_called_once()
+    assert manager.get_client().provider.name == "Provider2"
+
+
+def test_hotswap_manager_does_not_wait_for_slow_providers(
+    mock_providers, mock_w3_client
+):
+    def create(provider, **kwargs):
+        client = Mock()
+        client.provider = provider
+        client.budget = None
+        client.health.is_healthy = True
+        client.health.probe_due = False
+        if provider.name == "Provider1":
+            client.connect.side_effect = lambda: time.sleep(1)
+        return client
+
+    mock_w3_client.side_effect = create
+
+    start = time.monotonic()
+    manager = HotswapManager(mock_providers)
+    assert time.monotonic() - start < 0.5
+    assert manager.current_provider == "Provider2"
+    assert list(manager.clients) == ["Provider2"]
+
+    manager.wait_for_providers()
+    assert list(manager.clients) == ["Provider1", "Provider2"]
+
+
+def test_hotswap_manager_probes_open_providers(
+    mock_providers, mock_w3_client, monkeypatch
+):
+    monkeypatch.setattr(config, "BREAKER_OPEN_MIN", 0)
+    manager = connected_manager(mock_providers)
+    backup = manager.clients["Provider2"]
+    backup.health = ProviderHealth("Provider2")
+    backup.get_latest_block_number.return_value = 100
+
+    backup.health.block_failures = config.BLOCK_FAILURE_THRESHOLD
+    assert not backup.health.is_healthy
+
+    # Probes go out with the routing timer, not on every call
+    manager.get_client()
+    backup.get_latest_block_number.assert_not_called()
+
+    monkeypatch.setattr(config, "ROUTING_INTERVAL", 0)
+    manager.get_client()
+    deadline = time.monotonic() + 5
+    while not backup.health.is_healthy and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    backup.get_latest_block_number.assert_called_once()
+    assert backup.health.is_healthy
@@ -0,0 +1,199 @@
+from unittest.mock import Mock
+
+from core.logs import LogStream, is_range_too_large
+from core.pipeline import SinkPipeline
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+def header(number, branch="a", parent_branch=None):
+    parent_branch = parent_branch or branch
+    return BlockHeader(
+        number, number, 0, f"0x{branch}{number}", f"0x{parent_branch}{number - 1}"
+    )
+
+
+class FakeLogClient:
+    """Serves one log per block from `chain` (number -> branch), capped per call."""
+
+    def __init__(self, chain, max_range=None):
+        self.chain = chain
+        self.max_range = max_range
+        self.calls = []
+        self.events = []
+        self.health = Mock()
+
+    def log(self, number):
+        branch = self.chain[number]
+        return {"blockNumber": number, "blockHash": f"0x{branch}{number}"}
+
+    def get_logs(
+        self, addresses, topics, from_block=None, to_block=None, block_hash=None
+    ):
+        if block_hash is not None:
+            self.calls.append(("hash", block_hash))
+            number = int(block_hash[3:])
+            return [self.log(number)]
+
+        self.calls.append((from_block, to_block))
+        if self.max_range and to_block - from_block + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        return [self.log(n) for n in range(from_block, to_block + 1)]
+
+    def get_block(self, number, use_cache=True):
+        return header(number, self.chain[number], self.chain.get(number - 1, "a"))
+
+    def validate_block(self, block):
+        return block
+
+    def process_log(self, block, log):
+        self.events.append(("log", block.number, log["blockHash"]))
+
+    def process_block(self, block):
+        self.events.append(("block", block.number, block.hash))
+
+    def revert_block(self, number, block_hash):
+        self.events.append(("revert", number, block_hash))
+
+
+def test_too_large_errors_are_recognized():
+    assert is_range_too_large(ValueError("Log response size exceeded"))
+    assert is_range_too_large(ValueError("query returned more than 10000 results"))
+    assert is_range_too_large(ValueError("exceed maximum block range: 2000"))
+    assert not is_range_too_large(ValueError("429 Too Many Requests"))
+    assert not is_range_too_large(ValueError("invalid block range params"))
+
+
+def test_range_shrinks_when_provider_rejects_it():
+    client = FakeLogClient(dict.fromkeys(range(1, 200), "a"), max_range=10)
+    stream = LogStream(range_size=40, target_results=1000, confirmations=0)
+
+    logs = stream.logs_for(client, header(1), head=199)
+
+    assert [log["blockNumber"] for log in logs] == [1]
+    assert client.calls[:3] == [(1, 40), (1, 20), (1, 10)]
+
+    # Sparse results grow the range, but not back to a rejected size
+    for number in range(2, 60):
+        stream.logs_for(client, header(number), head=199)
+    assert stream.range_size == 10
+    assert len(client.calls) == 3 + 5
+
+
+def test_range_grows_back_after_successes():
+    client = FakeLogClient(dict.fromkeys(range(1, 400), "a"))
+    client.max_range = 10
+    stream = LogStream(range_size=20, target_results=1000, regrow=3, confirmations=0)
+    stream.logs_for(client, header(1), head=399)
+    assert stream.range_cap == 10
+
+    # The provider lifts its limit; three good calls let the range double
+    client.max_range = None
+    for number in range(2, 100):
+        stream.logs_for(client, header(number), head=399)
+
+    assert stream.range_cap == 40
+    assert stream.range_size == 40
+
+
+def test_range_grows_while_results_are_sparse_and_stays_under_head():
+    client = FakeLogClient(dict.fromkeys(range(1, 1000), "a"))
+    stream = LogStream(range_size=4, max_range=16, target_results=1000, confirmations=5)
+
+    for number in range(1, 40):
+        stream.logs_for(client, header(number), head=44)
+
+    assert client.calls[:3] == [(1, 4), (5, 12), (13, 28)]
+    assert stream.range_size == 16
+    assert max(end for _, end in client.calls if end != "hash") == 39
+
+
+def test_blocks_near_the_head_are_fetched_by_hash():
+    chain = dict.fromkeys(range(1, 30), "a")
+    client = FakeLogClient(chain)
+    stream = LogStream(range_size=100, confirmations=5)
+
+    for number in range(1, 24):
+        stream.logs_for(client, header(number), head=25)
+
+    # A range answered before #22 was replaced would have missed its logs
+    chain[22] = "b"
+    assert client.calls[0] == (1, 20)
+    assert client.calls[1:] == [("hash", "0xa21"), ("hash", "0xa22"), ("hash", "0xa23")]
+
+
+def test_logs_from_a_stale_branch_are_refetched_by_hash():
+    chain = dict.fromkeys(range(1, 10), "a")
+    client = FakeLogClient(chain)
+    stream = LogStream(range_size=5, confirmations=0)
+    stream.logs_for(client, header(1), head=9)
+
+    # The range was fetched before #3 was replaced
+    chain[3] = "b"
+    logs = stream.logs_for(client, header(2), head=9)
+    logs = stream.logs_for(client, header(3, "b", "a"), head=9)
+
+    assert logs == [{"blockNumber": 3, "blockHash": "0xb3"}]
+    assert ("hash", "0xb3") in client.calls
+
+
+def test_reorg_reverts_blocks_and_re_emits_canonical_logs():
+    chain = dict.fromkeys(range(1, 7), "a")
+    client = FakeLogClient(chain)
+    streamer = BlockStreamer(Mock(), logs=LogStream(range_size=100))
+    streamer.head = 6
+    for number in range(1, 6):
+        streamer._emit(client, header(number))
+
+    # Fork after #3: #4 onwards is on branch b
+    chain.update({4: "b", 5: "b", 6: "b"})
+    client.events.clear()
+    streamer._emit(client, header(6, "b"))
+
+    assert client.events == [
+        ("revert", 5, "0xa5"),
+        ("revert", 4, "0xa4"),
+        ("log", 4, "0xb4"),
+        ("block", 4, "0xb4"),
+        ("log", 5, "0xb5"),
+        ("block", 5, "0xb5"),
+        ("log", 6, "0xb6"),
+        ("block", 6, "0xb6"),
+    ]
+
+
+def test_logs_go_through_the_pipeline_with_their_blocks():
+    chain = dict.fromkeys(range(1, 4), "a")
+    client = FakeLogClient(chain)
+    events = []
+    sink = Mock()
+    sink.write_logs.side_effect = lambda block, logs: events.extend(
+        ("log", block.number, log["blockHash"]) for log in logs
+    )
+    sink.write.side_effect = lambda blocks: events.extend(
+        ("block", b.number, b.hash) for b in blocks
+    )
+    sink.revert.side_effect = lambda n, h: events.append(("revert", n, h))
+    pipeline = SinkPipeline([sink], batch_size=1)
+    streamer = BlockStreamer(Mock(), pipeline=pipeline, logs=LogStream())
+    streamer.head = 3
+    for number in range(1, 3):
+        streamer._emit(client, header(number))
+
+    # Fork after #1: #2's logs are withdrawn along with the block
+    chain.update({2: "b", 3: "b"})
+    streamer._emit(client, header(3, "b"))
+    pipeline.close()
+
+    assert client.events == []
+    assert events == [
+        ("log", 1, "0xa1"),
+        ("block", 1, "0xa1"),
+        ("log", 2, "0xa2"),
+        ("block", 2, "0xa2"),
+        ("revert", 2, "0xa2"),
+        ("log", 2, "0xb2"),
+        ("block", 2, "0xb2"),
+        ("log", 3, "0xb3"),
+        ("block", 3, "0xb3"),
+    ]
@@ -0,0 +1,19 @@
+import pytest
+
+import config
+from main import parse_args
+
+
+def test_async_engine_rejects_sync_only_settings(monkeypatch, capsys):
+    monkeypatch.setattr(config, "SINKS", ["jsonl"])
+    monkeypatch.setattr(config, "FULL_TRANSACTIONS", True)
+    monkeypatch.setattr("sys.argv", ["main.py", "--engine", "async"])
+
+    with pytest.raises(SystemExit):
+        parse_args()
+    assert "SINKS, FULL_TRANSACTIONS run on the sync engine" in capsys.readouterr().err
+
+
+def test_async_engine_runs_without_them(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["main.py", "--engine", "async"])
+    assert parse_args().engine == "async"
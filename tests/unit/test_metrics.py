@@ -0,0 +1,134 @@
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+
+import pytest
+
+from core.health import measure_time
+from core.metrics import (
+    REGISTRY,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    rate_of,
+    rpc_series,
+    start_metrics_server,
+)
+
+
+def test_counter_sums_thread_shards():
+    counter = Counter()
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.value == 8000
+
+
+def test_exited_threads_shards_are_folded():
+    counter = Counter()
+    for _ in range(1000):
+        thread = threading.Thread(target=counter.inc)
+        thread.start()
+        thread.join()
+
+    # Registering each new thread folded the shards of the exited ones
+    assert len(counter._shards) <= 1
+    assert counter.value == 1000
+    assert counter._shards == []
+
+
+def test_histogram_snapshot_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+
+    cumulative, count, total = histogram.snapshot()
+    assert cumulative == [1, 3]
+    assert count == 4
+    assert total == pytest.approx(6.05)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", provider="a").inc(3)
+    registry.histogram("latency_seconds", "Latency", provider="a").observe(0.02)
+    registry.gauge("depth", "Queue depth", fn=lambda: 7)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{provider="a"} 3' in text
+    assert 'latency_seconds_bucket{provider="a",le="0.025"} 1' in text
+    assert 'latency_seconds_bucket{provider="a",le="+Inf"} 1' in text
+    assert 'latency_seconds_count{provider="a"} 1' in text
+    assert "depth 7" in text
+
+
+def test_registry_returns_same_series_for_same_labels():
+    registry = MetricsRegistry()
+    assert registry.counter("c", a="1") is registry.counter("c", a="1")
+    assert registry.counter("c", a="1") is not registry.counter("c", a="2")
+
+
+def test_rate_of_reports_increase_per_second(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("core.metrics.time.monotonic", lambda: clock[0])
+    counter = Counter()
+    rate = rate_of(counter)
+
+    counter.inc(20)
+    clock[0] += 2
+    assert rate() == 10
+    clock[0] += 1
+    assert rate() == 0
+
+
+def test_measure_time_records_rpc_series():
+    client = Mock()
+    client.provider.name = "metrics-test"
+    client.provider.chain = "testnet"
+    client.budget = None
+
+    @measure_time
+    def _get_block_timed(client, number):
+        if number < 0:
+            raise ValueError("bad block")
+        return number
+
+    ok, error, latency = rpc_series("testnet", "metrics-test", "get_block")
+    _get_block_timed(client, 1)
+    with pytest.raises(ValueError):
+        _get_block_timed(client, -1)
+
+    assert ok.value == 1
+    assert error.value == 1
+    assert latency.snapshot()[1] == 1
+    assert (
+        'rpc_requests_total{chain="testnet",method="get_block",'
+        'provider="metrics-test",status="ok"} 1' in REGISTRY.render()
+    )
+
+
+def test_metrics_server_serves_metrics_and_health():
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served").inc()
+    server = start_metrics_server("127.0.0.1", 0, registry)
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert "served_total 1" in response.read().decode()
+        with urllib.request.urlopen(f"{base}/health") as response:
+            assert response.read() == b"ok\n"
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/missing")
+    finally:
+        server.shutdown()
+        server.server_close()
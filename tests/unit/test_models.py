@@ -1,7 +1,7 @@
 import pytest
 from pydantic import ValidationError
 
-from models.block import Block
+from models.block import Block, BlockHeader
 from models.provider import Provider
 
 
@@ -52,3 +52,47 @@ def test_block_model_invalid():
 
     with pytest.raises((ValidationError, KeyError)):
         Block.from_raw(raw_block)
+
+
+def test_block_header_from_raw():
+    raw_block = {
+        "number": 123456,
+        "timestamp": 1678901234,
+        "transactions": ["tx1", "tx2"],
+        "hash": b"\x12\x34",
+        "parentHash": "0xABCD",
+    }
+
+    header = BlockHeader.from_raw(raw_block)
+    assert header.number == raw_block["number"]
+    assert header.timestamp == raw_block["timestamp"]
+    assert header.tx_count == 2
+    assert header.hash == "0x1234"
+    assert header.parent_hash == "0xabcd"
+    assert header.raw is None
+    assert not hasattr(header, "__dict__")
+
+    assert BlockHeader.from_raw(raw_block, keep_raw=True).raw is raw_block
+
+
+def test_block_header_invalid():
+    with pytest.raises(KeyError):
+        BlockHeader.from_raw({"number": 1, "transactions": []})
+
+    with pytest.raises(TypeError):
+        BlockHeader.from_raw({"number": "0x1", "timestamp": 0})
+
+
+def test_provider_pool_settings():
+    provider = Provider(
+        url="https://eth-mainnet.test.com",
+        name="Test Provider",
+        pool={"pool_size": 4, "keep_alive": False, "read_timeout": 10},
+    )
+    assert provider.pool.pool_size == 4
+    assert not provider.pool.keep_alive
+    assert provider.pool.connect_timeout == 5
+    assert provider.pool.read_timeout == 10
+
+    with pytest.raises(ValidationError):
+        Provider(url="https://x.test.com", name="X", pool={"pool_size": 0})
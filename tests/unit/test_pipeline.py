@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from core.pipeline import PipelineFailed, SinkPipeline
+from core.sinks import JsonLinesSink, LocalTopic, Sink, TopicSink, create_sinks
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+def header(number):
+    return BlockHeader(number, 1000 + number, 0, f"0x{number}", f"0x{number - 1}")
+
+
+class RecordingSink(Sink):
+    def __init__(self, gate=None, fail_times=0):
+        self.batches = []
+        self.events = []
+        self.gate = gate
+        self.fail_times = fail_times
+
+    def write(self, blocks):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise IOError("sink unavailable")
+        self.batches.append([b.number for b in blocks])
+        self.events.extend(("block", b.number) for b in blocks)
+
+    def revert(self, number, block_hash):
+        self.events.append(("revert", number))
+
+    def write_transactions(self, block, transactions):
+        self.events.extend(("tx", block.number) for _ in transactions)
+
+    def write_logs(self, block, logs):
+        self.events.extend(("log", block.number) for _ in logs)
+
+
+def test_pipeline_batches_by_size():
+    sink = RecordingSink()
+    flushed = []
+    pipeline = SinkPipeline(
+        [sink],
+        on_flushed=lambda number, count: flushed.append((number, count)),
+        batch_size=3,
+        batch_interval_ms=60_000,
+    )
+    for number in range(7):
+        pipeline.submit(header(number))
+    pipeline.close()
+
+    assert sink.batches == [[0, 1, 2], [3, 4, 5], [6]]
+    # The checkpoint counts blocks, not batches
+    assert flushed == [(2, 3), (5, 3), (6, 1)]
+
+
+def test_pipeline_batches_by_time():
+    sink = RecordingSink()
+    pipeline = SinkPipeline([sink], batch_size=1000, batch_interval_ms=20)
+    pipeline.submit(header(1))
+
+    deadline = time.time() + 2
+    while not sink.batches and time.time() < deadline:
+        time.sleep(0.005)
+
+    assert sink.batches == [[1]]
+    pipeline.close()
+
+
+def test_pipeline_applies_backpressure():
+    gate = threading.Event()
+    pipeline = SinkPipeline(
+        [RecordingSink(gate=gate)], max_queue=2, batch_size=1, batch_interval_ms=0
+    )
+    # The worker holds one block in the blocked sink; two more fill the queue
+    for number in range(3):
+        pipeline.submit(header(number))
+
+    producer = threading.Thread(target=pipeline.submit, args=(header(3),))
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+
+    gate.set()
+    producer.join(timeout=2)
+    assert not producer.is_alive()
+    pipeline.close()
+
+
+def test_pipeline_orders_reverts_and_retries(monkeypatch):
+    monkeypatch.setattr("config.SINK_RETRY_DELAY", 0)
+    sink = RecordingSink(fail_times=2)
+    pipeline = SinkPipeline([sink], batch_size=10, batch_interval_ms=60_000)
+    pipeline.submit(header(1))
+    pipeline.submit(header(2))
+    pipeline.revert(2, "0x2")
+    pipeline.submit(header(2))
+    pipeline.close()
+
+    assert sink.events == [("block", 1), ("block", 2), ("revert", 2), ("block", 2)]
+
+
+def test_pipeline_survives_a_failed_commit():
+    sink = RecordingSink()
+    on_flushed = Mock(side_effect=[OSError("disk full"), None])
+    pipeline = SinkPipeline(
+        [sink], on_flushed=on_flushed, batch_size=1, batch_interval_ms=0
+    )
+    pipeline.submit(header(1))
+    pipeline.submit(header(2))
+    pipeline.close()
+
+    assert sink.batches == [[1], [2]]
+    assert on_flushed.call_count == 2
+
+
+def test_pipeline_fails_after_max_attempts(monkeypatch):
+    monkeypatch.setattr("config.SINK_RETRY_DELAY", 0)
+    monkeypatch.setattr("config.SINK_MAX_ATTEMPTS", 3)
+    sink = RecordingSink(fail_times=3)
+    pipeline = SinkPipeline([sink], max_queue=1, batch_size=1, batch_interval_ms=0)
+    pipeline.submit(header(1))
+
+    deadline = time.time() + 2
+    while pipeline.error is None and time.time() < deadline:
+        time.sleep(0.005)
+
+    with pytest.raises(PipelineFailed):
+        pipeline.submit(header(2))
+    pipeline.close()
+    assert sink.batches == []
+
+
+def test_pipeline_writes_transactions_ahead_of_their_block():
+    sink = RecordingSink()
+    pipeline = SinkPipeline([sink], batch_size=2, batch_interval_ms=60_000)
+    block = header(1)
+    pipeline.submit_transaction(block, {"hash": "0xa"})
+    pipeline.submit_transaction(block, {"hash": "0xb"})
+    pipeline.submit(block)
+    pipeline.submit(header(2))
+    pipeline.close()
+
+    assert sink.events == [("tx", 1), ("tx", 1), ("block", 1), ("block", 2)]
+
+
+def test_pipeline_writes_logs_ahead_of_their_transactions():
+    sink = RecordingSink()
+    pipeline = SinkPipeline([sink], batch_size=10, batch_interval_ms=60_000)
+    for number in (1, 2):
+        block = header(number)
+        pipeline.submit_log(block, {"logIndex": 0})
+        pipeline.submit_transaction(block, {"hash": "0xa"})
+        pipeline.submit(block)
+    pipeline.close()
+
+    assert sink.events == [
+        ("log", 1),
+        ("tx", 1),
+        ("log", 2),
+        ("tx", 2),
+        ("block", 1),
+        ("block", 2),
+    ]
+
+
+def test_jsonl_sink_writes_web3_logs(tmp_path):
+    path = tmp_path / "blocks.jsonl"
+    sink = JsonLinesSink(str(path))
+    log = AttributeDict({"blockHash": HexBytes("0x12"), "logIndex": 0})
+    sink.write_logs(header(3), [log])
+    sink.close()
+
+    assert json.loads(path.read_text()) == {
+        "block": 3,
+        "log": {"blockHash": "0x12", "logIndex": 0},
+    }
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "blocks.jsonl"
+    sink = JsonLinesSink(str(path))
+    sink.write([header(1), header(2)])
+    sink.revert(2, "0x2")
+    sink.write_transactions(header(3), [{"hash": "0xa"}])
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line.get("number") for line in lines[:2]] == [1, 2]
+    assert lines[2] == {"revert": 2, "hash": "0x2"}
+    assert lines[3] == {"block": 3, "transaction": {"hash": "0xa"}}
+
+
+def test_local_topic_offsets_and_retention():
+    topic = LocalTopic(retention=3)
+    sink = TopicSink(topic)
+    sink.write([header(n) for n in range(5)])
+
+    assert (topic.start_offset, topic.end_offset) == (2, 5)
+
+    records, next_offset = topic.consume(0, max_records=2)
+    assert [json.loads(r)["number"] for r in records] == [2, 3]
+    assert next_offset == 4
+    assert topic.consume(next_offset)[1] == 5
+
+
+def test_create_sinks_rejects_unknown():
+    assert create_sinks([]) == []
+    with pytest.raises(ValueError):
+        create_sinks(["s3"])
+
+
+def test_streamer_hands_blocks_to_pipeline():
+    sink = RecordingSink()
+    checkpoint = Mock()
+    pipeline = SinkPipeline(
+        [sink], on_flushed=checkpoint.commit, batch_size=2, batch_interval_ms=60_000
+    )
+    client = Mock()
+    streamer = BlockStreamer(Mock(), checkpoint=checkpoint, pipeline=pipeline)
+
+    for number in range(1, 5):
+        streamer._emit(client, header(number))
+    pipeline.close()
+
+    client.process_block.assert_not_called()
+    assert sink.batches == [[1, 2], [3, 4]]
+    assert [c.args[0] for c in checkpoint.commit.call_args_list] == [2, 4]
@@ -0,0 +1,131 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.health import measure_batch_time
+from core.hotswap import HotswapManager
+from core.ratelimit import ComputeBudget, TokenBucket
+from models.provider import Provider, RateLimitConfig
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.ratelimit.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_then_paces_at_rate(clock):
+    bucket = TokenBucket(rate=10, burst=5)
+
+    assert [bucket.reserve(1) for _ in range(5)] == [0] * 5
+    assert bucket.reserve(1) == pytest.approx(0.1)
+    assert bucket.reserve(1) == pytest.approx(0.2)
+
+    clock[0] += 0.2
+    assert bucket.fill == pytest.approx(0)
+    clock[0] += 1
+    assert bucket.fill == pytest.approx(1)
+
+
+def test_budget_prices_methods(clock):
+    budget = ComputeBudget(
+        RateLimitConfig(
+            units_per_second=100,
+            default_cost=2,
+            method_costs={"eth_getBlockByNumber": 16, "eth_getLogs": 75},
+        )
+    )
+
+    assert budget.cost("get_blocks", count=3) == 48
+    assert budget.cost("get_logs") == 75
+    assert budget.cost("get_latest_block_number") == 2
+    assert budget.reserve("get_logs") == 0
+    assert budget.reserve("get_logs") == pytest.approx(0.5)
+
+
+def test_batch_waits_for_budget_before_timing(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("core.health.time.sleep", sleeps.append)
+    client = Mock()
+    client.budget.reserve.return_value = 0.25
+
+    @measure_batch_time
+    def _get_blocks_timed(client, numbers):
+        return numbers
+
+    _get_blocks_timed(client, [1, 2, 3])
+
+    client.budget.reserve.assert_called_once_with("get_blocks", 3)
+    assert sleeps == [0.25]
+
+
+def test_provider_rate_limit_is_optional():
+    provider = Provider(url="https://p.test", name="P")
+    assert provider.rate_limit is None
+
+    provider = Provider(
+        url="https://p.test", name="P", rate_limit={"units_per_second": 330}
+    )
+    assert provider.rate_limit.units_per_second == 330
+    assert provider.rate_limit.burst is None
+
+
+@pytest.fixture
+def manager():
+    providers = [
+        Provider(
+            url=f"https://p{i}.test", name=f"P{i}", rate_limit={"units_per_second": 10}
+        )
+        for i in range(2)
+    ]
+    with patch("core.hotswap.W3Client") as mock:
+
+        def create(provider, **kwargs):
+            client = Mock()
+            client.provider = provider
+            client.health.is_healthy = True
+            client.health.probe_due = False
+            client.health.score = 0.1
+            client.budget = ComputeBudget(provider.rate_limit)
+            return client
+
+        mock.side_effect = create
+        manager = HotswapManager(providers)
+        manager.wait_for_providers()
+        yield manager
+
+
+def test_manager_routes_around_a_nearly_exhausted_budget(manager):
+    manager.clients["P0"].budget.reserve("get_block", 10)
+
+    assert manager.get_client().provider.name == "P1"
+    assert manager.clients["P0"].health.is_healthy
+
+
+def test_manager_stays_when_every_budget_is_exhausted(manager, caplog):
+    for client in manager.clients.values():
+        client.budget.reserve("get_block", 10)
+    manager.clients["P1"].health.score = 0.05
+    swaps = manager.swaps.value
+
+    # Nobody has headroom: no swap until the routing timer compares latencies
+    for _ in range(3):
+        assert manager.get_client().provider.name == "P0"
+    assert manager.swaps.value == swaps
+    assert "Swapped to" not in caplog.text
+
+
+def test_headroom_returns_only_after_the_budget_refills(manager, monkeypatch):
+    monkeypatch.setattr("config.RATE_LIMIT_RESERVE", 0.1)
+    monkeypatch.setattr("config.RATE_LIMIT_RESUME", 0.3)
+    client = manager.clients["P0"]
+    client.budget = Mock(headroom=0.05)
+    assert not manager._has_headroom(client)
+
+    client.budget.headroom = 0.2
+    assert not manager._has_headroom(client)
+    client.budget.headroom = 0.3
+    assert manager._has_headroom(client)
+    client.budget.headroom = 0.2
+    assert manager._has_headroom(client)
@@ -0,0 +1,152 @@
+from unittest.mock import Mock
+
+import pytest
+
+from core.reorg import BlockHistory, ReorgTooDeep
+from core.streamer import BlockStreamer
+from models.block import BlockHeader
+
+
+def make_block(number, branch="a", parent_branch=None):
+    parent_branch = parent_branch or branch
+    return BlockHeader.from_raw(
+        {
+            "number": number,
+            "timestamp": number,
+            "transactions": [],
+            "hash": f"0x{branch}{number}",
+            "parentHash": f"0x{parent_branch}{number - 1}",
+        },
+        keep_raw=True,
+    )
+
+
+def make_client(canonical):
+    """Client whose chain is `canonical` (number -> Block)."""
+    client = Mock()
+    client.get_block.side_effect = lambda n, use_cache=True: canonical[n].raw
+    client.validate_block.side_effect = BlockHeader.from_raw
+    client.events = []
+    client.process_block.side_effect = lambda b: client.events.append(
+        ("process", b.number, b.hash)
+    )
+    client.revert_block.side_effect = lambda n, h: client.events.append(
+        ("revert", n, h)
+    )
+    return client
+
+
+def test_history_ring_buffer_wraps():
+    history = BlockHistory(size=4)
+    for number in range(1, 10):
+        history.push(make_block(number))
+
+    assert history.get(9).hash == "0xa9"
+    assert history.get(6).number == 6
+    assert history.get(5) is None
+    assert history.links(make_block(10))
+    assert not history.links(make_block(10, "b"))
+
+
+def test_streamer_rewinds_to_fork_point():
+    # a-branch was emitted up to #5; the canonical chain forked after #3
+    canonical = {n: make_block(n) for n in range(1, 4)}
+    canonical[4] = make_block(4, "b", "a")
+    canonical.update({n: make_block(n, "b") for n in range(5, 7)})
+    client = make_client(canonical)
+
+    streamer = BlockStreamer(hotswap_manager=Mock())
+    for number in range(1, 6):
+        streamer._emit(client, make_block(number))
+    client.events.clear()
+
+    streamer._emit(client, canonical[6])
+
+    assert client.events == [
+        ("revert", 5, "0xa5"),
+        ("revert", 4, "0xa4"),
+        ("process", 4, "0xb4"),
+        ("process", 5, "0xb5"),
+        ("process", 6, "0xb6"),
+    ]
+    # Only the two canonical blocks below #6 were fetched
+    assert client.get_block.call_count == 2
+    assert streamer.last_block == 6
+    assert streamer.history.get(4).hash == "0xb4"
+
+
+def test_full_transaction_rewind_re_emits_transactions():
+    canonical = {n: make_block(n) for n in range(1, 4)}
+    canonical[4] = make_block(4, "b", "a")
+    canonical[5] = make_block(5, "b")
+    client = make_client(canonical)
+    client.get_full_block.side_effect = lambda n: Mock(
+        header=canonical[n], transactions=lambda: iter([{"hash": f"0x{n}"}])
+    )
+    client.process_transaction.side_effect = lambda b, tx: client.events.append(
+        ("tx", b.number, tx["hash"])
+    )
+
+    streamer = BlockStreamer(hotswap_manager=Mock(), full_transactions=True)
+    for number in range(1, 5):
+        streamer._emit(client, make_block(number))
+    client.events.clear()
+
+    streamer._emit_full(client, 5)
+
+    assert client.events == [
+        ("revert", 4, "0xa4"),
+        ("tx", 4, "0x4"),
+        ("process", 4, "0xb4"),
+        ("tx", 5, "0x5"),
+        ("process", 5, "0xb5"),
+    ]
+
+
+def test_streamer_single_block_reorg_needs_no_extra_calls():
+    canonical = {n: make_block(n) for n in range(1, 4)}
+    canonical[4] = make_block(4, "b", "a")
+    client = make_client(canonical)
+
+    streamer = BlockStreamer(hotswap_manager=Mock())
+    for number in range(1, 5):
+        streamer._emit(client, make_block(number))
+
+    streamer._emit(client, make_block(5, "b"))
+    streamer_events = [e[0] for e in client.events[-3:]]
+
+    assert streamer_events == ["revert", "process", "process"]
+    assert client.get_block.call_count == 1
+
+
+def test_streamer_reorg_deeper_than_history():
+    client = make_client({n: make_block(n, "b") for n in range(1, 10)})
+    streamer = BlockStreamer(hotswap_manager=Mock())
+    streamer.history = BlockHistory(size=3)
+    for number in range(1, 6):
+        streamer._emit(client, make_block(number))
+
+    with pytest.raises(RuntimeError, match="deeper than 3"):
+        streamer._emit(client, make_block(6, "b"))
+
+
+def test_stream_stops_on_reorg_deeper_than_history():
+    client = make_client({n: make_block(n, "b") for n in range(1, 10)})
+    client.get_latest_block_number.return_value = 6
+    client.get_blocks.side_effect = lambda numbers: [
+        make_block(n, "b").raw for n in numbers
+    ]
+    client.subscription = None
+    manager = Mock()
+    manager.get_client.return_value = client
+
+    streamer = BlockStreamer(hotswap_manager=manager)
+    streamer.history = BlockHistory(size=3)
+    for number in range(1, 6):
+        streamer._emit(client, make_block(number))
+
+    # Retrying cannot repair the cursor, so stream() gives up instead of looping
+    with pytest.raises(ReorgTooDeep):
+        streamer.stream()
+    assert streamer._stopped.is_set()
+    assert streamer.last_block == 5
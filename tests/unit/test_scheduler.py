@@ -0,0 +1,67 @@
+from unittest.mock import Mock
+
+import config
+from core.scheduler import PollScheduler
+from core.streamer import BlockStreamer
+
+
+def test_scheduler_defaults_to_poll_interval():
+    assert PollScheduler().poll_delay() == config.POLL_INTERVAL
+
+
+def test_scheduler_learns_block_time():
+    scheduler = PollScheduler()
+    for number in range(10):
+        scheduler.observe(number, 1000 + number * 12)
+
+    assert scheduler.block_time == 12
+
+    # Block #9 landed at t=1108; #10 is due at t=1120
+    assert scheduler.poll_delay(now=1110) == config.POLL_MAX_INTERVAL
+    assert scheduler.poll_delay(now=1117) == 3
+    assert scheduler.poll_delay(now=1125) == config.POLL_MIN_INTERVAL
+
+
+def test_scheduler_ignores_gaps():
+    scheduler = PollScheduler()
+    scheduler.observe(1, 100)
+    scheduler.observe(2, 112)
+    scheduler.observe(50, 9000)
+
+    assert scheduler.block_time == 12
+
+
+def test_scheduler_error_backoff(monkeypatch):
+    monkeypatch.setattr("core.scheduler.random.uniform", lambda a, b: 1.0)
+    scheduler = PollScheduler()
+
+    delays = [scheduler.error_delay() for _ in range(10)]
+
+    assert delays[:3] == [
+        config.ERROR_BACKOFF_BASE,
+        config.ERROR_BACKOFF_BASE * 2,
+        config.ERROR_BACKOFF_BASE * 4,
+    ]
+    assert delays[-1] == config.ERROR_BACKOFF_MAX
+
+    scheduler.success()
+    assert scheduler.error_delay() == config.ERROR_BACKOFF_BASE
+
+
+def test_streamer_resets_backoff_without_polling(monkeypatch):
+    monkeypatch.setattr("core.scheduler.random.uniform", lambda a, b: 1.0)
+    client = Mock()
+    manager = Mock()
+    manager.get_client.return_value = client
+    streamer = BlockStreamer(hotswap_manager=manager)
+    streamer.last_block = 100
+    streamer._stopped = Mock()
+    streamer._stopped.is_set.side_effect = [False, False, True]
+
+    # Subscribed: the head is pushed, so poll_delay() is never consulted
+    client.subscription.is_connected = True
+    client.subscription.wait_for_head.side_effect = [ConnectionError("down"), 100]
+    streamer.stream()
+
+    assert streamer.scheduler.errors == 0
+    assert streamer.scheduler.error_delay() == config.ERROR_BACKOFF_BASE
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from websockets.sync.server import serve
+
+import config
+from core.streamer import BlockStreamer
+from core.subscription import HeadSubscription
+
+
+@pytest.fixture
+def ws_node():
+    """Local websocket JSON-RPC stand-in that answers eth_subscribe."""
+    heads = []
+    release = threading.Event()
+
+    def handler(websocket):
+        request = json.loads(websocket.recv())
+        assert request["method"] == "eth_subscribe"
+        websocket.send(json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0xsub"}))
+        for number in heads:
+            websocket.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "eth_subscription",
+                        "params": {
+                            "subscription": "0xsub",
+                            "result": {"number": hex(number)},
+                        },
+                    }
+                )
+            )
+        # Hold the socket open until the test drops it
+        release.wait(timeout=5)
+
+    with serve(handler, "127.0.0.1", 0) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.socket.getsockname()[1]
+        yield f"ws://127.0.0.1:{port}", heads, release
+        release.set()
+        server.shutdown()
+
+
+def test_subscription_pushes_heads(ws_node):
+    url, heads, release = ws_node
+    heads.extend([100, 101, 102])
+
+    subscription = HeadSubscription(url, "Local")
+    subscription.start()
+    try:
+        head = subscription.wait_for_head(after=99, timeout=2)
+        while head is not None and head < 102:
+            head = subscription.wait_for_head(after=head, timeout=2)
+
+        assert head == 102
+        assert subscription.is_connected
+        assert subscription.wait_for_head(after=102, timeout=0.05) is None
+    finally:
+        subscription.stop()
+
+
+def test_subscription_marks_disconnected_on_drop(ws_node, monkeypatch):
+    monkeypatch.setattr(config, "WS_RECONNECT_INTERVAL", 60)
+    url, heads, release = ws_node
+    heads.append(7)
+
+    subscription = HeadSubscription(url, "Local")
+    subscription.start()
+    try:
+        assert subscription.wait_for_head(after=0, timeout=2) == 7
+        release.set()
+
+        deadline = time.time() + 2
+        while subscription.is_connected and time.time() < deadline:
+            time.sleep(0.01)
+        assert not subscription.is_connected
+    finally:
+        subscription.stop()
+
+
+def test_streamer_polls_when_subscription_is_down():
+    client = Mock()
+    client.subscription.is_connected = False
+    client.get_latest_block_number.return_value = 500
+
+    streamer = BlockStreamer(hotswap_manager=Mock())
+    streamer.last_block = 499
+
+    assert streamer._next_head(client) == 500
+    client.subscription.wait_for_head.assert_not_called()
+
+
+def test_streamer_uses_pushed_heads_when_subscribed():
+    client = Mock()
+    client.subscription.is_connected = True
+    client.subscription.wait_for_head.return_value = 501
+
+    streamer = BlockStreamer(hotswap_manager=Mock())
+    streamer.last_block = 499
+
+    assert streamer._next_head(client) == 501
+    client.get_latest_block_number.assert_not_called()
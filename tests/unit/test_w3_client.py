@@ -1,7 +1,12 @@
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
 
+import config
+from core.cache import BlockCache
+from core.decode import decode_batch
 from core.w3_client import W3Client
 from models.provider import Provider
 
@@ -15,7 +20,7 @@ def mock_provider():
 
 @pytest.fixture
 def mock_w3():
-    with patch("core.w3_client.Web3") as mock:
+    with patch("web3.Web3") as mock:
         # Mock the Web3 instance
         w3_instance = Mock()
         mock.return_value = w3_instance
@@ -102,3 +107,142 @@ def test_validate_block_success(mock_provider, mock_w3):
     assert block.timestamp == raw_block["timestamp"]
     assert block.tx_count == len(raw_block["transactions"])
     assert client.health.block_failures == 0
+
+
+def test_get_blocks_batch(mock_provider, mock_w3):
+    # Setup
+    mock_w3.return_value.is_connected.return_value = True
+    mock_blocks = [
+        {"number": n, "timestamp": 1678901234, "transactions": []}
+        for n in (100, 101, 102)
+    ]
+    batch = MagicMock()
+    batch.__enter__.return_value.execute.return_value = mock_blocks
+    mock_w3.return_value.batch_requests.return_value = batch
+
+    # Execute
+    client = W3Client(mock_provider)
+    client.connect()
+    blocks = client.get_blocks([100, 101, 102])
+
+    # Assert
+    assert blocks == mock_blocks
+    assert client.batch_supported
+    assert len(client.health.batch_latency) == 1
+    assert batch.__enter__.return_value.add.call_count == 3
+
+
+def test_get_blocks_falls_back_when_batch_rejected(mock_provider, mock_w3):
+    # Setup
+    mock_w3.return_value.is_connected.return_value = True
+    batch = MagicMock()
+    batch.__enter__.return_value.execute.side_effect = ValueError("batch disabled")
+    mock_w3.return_value.batch_requests.return_value = batch
+    mock_w3.return_value.eth.get_block.side_effect = lambda n, **_: {"number": n}
+
+    # Execute
+    client = W3Client(mock_provider)
+    client.connect()
+    blocks = client.get_blocks([100, 101])
+
+    # Assert
+    assert [b["number"] for b in blocks] == [100, 101]
+    assert not client.batch_supported
+    assert client._batch_retry_at is None  # rejected outright: no retry
+    assert client.health.block_failures == 0
+
+
+def test_transient_batch_failure_disables_batching_for_a_cooldown(
+    mock_provider, mock_w3, monkeypatch
+):
+    now = [1000.0]
+    monkeypatch.setattr("core.w3_client.time.monotonic", lambda: now[0])
+    mock_w3.return_value.is_connected.return_value = True
+    batch = MagicMock()
+    batch.__enter__.return_value.execute.side_effect = ConnectionError("reset")
+    mock_w3.return_value.batch_requests.return_value = batch
+    mock_w3.return_value.eth.get_block.side_effect = lambda n, **_: {"number": n}
+
+    client = W3Client(mock_provider)
+    client.connect()
+    client.get_blocks([100, 101])
+    assert not client.batch_supported
+
+    batch.__enter__.return_value.execute.side_effect = None
+    batch.__enter__.return_value.execute.return_value = [{"number": 102}, {"n": 1}]
+    assert client.get_blocks([102, 103]) == [{"number": 102}, {"number": 103}]
+
+    now[0] += config.BATCH_RETRY_COOLDOWN
+    assert client.get_blocks([102, 103]) == [{"number": 102}, {"n": 1}]
+    assert client.batch_supported
+
+
+def web3_block(number):
+    # As web3 returns it: an AttributeDict of ints and HexBytes
+    return AttributeDict(
+        {
+            "number": number,
+            "timestamp": 1678901234,
+            "hash": HexBytes(number.to_bytes(32, "big")),
+            "parentHash": HexBytes((number - 1).to_bytes(32, "big")),
+            "transactions": [HexBytes(bytes(32))],
+            "withdrawals": [AttributeDict({"index": 1, "amount": 2})],
+        }
+    )
+
+
+def test_raw_blocks_fall_back_to_get_blocks_without_batching(mock_provider, mock_w3):
+    mock_w3.return_value.is_connected.return_value = True
+    mock_w3.return_value.eth.get_block.side_effect = lambda n, **_: web3_block(n)
+
+    client = W3Client(mock_provider)
+    client.connect()
+    client.batch_supported = False
+    client.session = Mock()
+    payload = client.get_raw_blocks([100, 101])
+
+    client.session.post.assert_not_called()
+    headers = decode_batch(payload, [100, 101])
+    assert [h.hash for h in headers] == [f"0x{n:064x}" for n in (100, 101)]
+    assert headers[1].tx_count == 1
+
+
+def test_raw_blocks_serve_cached_blocks(mock_provider, mock_w3):
+    client = W3Client(mock_provider)
+    client.cache = BlockCache()
+    client.cache.put(web3_block(100))
+    client.session = Mock()
+    client.session.post.return_value.content = (
+        b'[{"jsonrpc": "2.0", "id": 1, "result": {"number": "0x65", '
+        b'"timestamp": "0x0", "hash": "0x' + b"%064x" % 101 + b'", '
+        b'"parentHash": "0x' + b"%064x" % 100 + b'"}}]\n'
+    )
+
+    payload = client.get_raw_blocks([100, 101])
+
+    requests = client.session.post.call_args.kwargs["json"]
+    assert [(r["id"], r["params"][0]) for r in requests] == [(1, "0x65")]
+    assert [h.number for h in decode_batch(payload, [100, 101])] == [100, 101]
+
+
+def test_reconnect_reuses_pooled_session(mock_provider, mock_w3):
+    # Setup
+    mock_w3.return_value.is_connected.return_value = True
+
+    # Execute
+    client = W3Client(mock_provider)
+    client.connect()
+    client.connect()
+
+    # Assert
+    sessions = [c.kwargs["session"] for c in mock_w3.HTTPProvider.call_args_list]
+    assert sessions == [client.session, client.session]
+    timeouts = [
+        c.kwargs["request_kwargs"]["timeout"]
+        for c in mock_w3.HTTPProvider.call_args_list
+    ]
+    assert timeouts[0] == (
+        mock_provider.pool.connect_timeout,
+        mock_provider.pool.read_timeout,
+    )
+    assert client.session.get_adapter("https://x")._pool_maxsize == 10